@@ -0,0 +1,515 @@
+# Copyright [2025] [ecki]
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Content-addressed store for uploaded attachments.
+
+Large uploads are stored once per content under their SHA-256 hash, outside
+the git history. The project only tracks a small pointer file in the format of
+Git LFS, which the viewer resolves to the stored content.
+
+The store is not pushed or pulled with the project. New pointers are only
+written when a store directory shared by all machines is configured,
+otherwise other clones would get pointers without content.
+
+Uploads are streamed in chunks by a worker thread, hashing and copying in a
+single pass over the source file.
+"""
+import hashlib
+import logging
+import os
+import pathlib
+import re
+import shutil
+import tempfile
+from typing import Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+import PyQt6.QtCore
+
+# Configuration
+STORE_DIR_NAME = "thanote-attachments"  # Inside .git unless configured per project
+MIN_STORE_KB = 32  # Smaller uploads are copied into the project as before
+OPEN_DIR_NAME = "thanote-open"  # Inside the temp directory, copies opened by external programs
+MAX_POINTER_SIZE = 1024
+CHUNK_SIZE = 1024 * 1024
+POINTER_VERSION = "https://git-lfs.github.com/spec/v1"
+
+POINTER_PATTERN = re.compile(
+    r"version (\S+)\noid sha256:([0-9a-f]{64})\nsize (\d+)\n"
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Pointer(NamedTuple):
+    """Reference to stored content."""
+    oid: str
+    size: int
+
+
+def format_pointer(pointer: Pointer) -> str:
+    """
+    Format a pointer file.
+
+    Args:
+        pointer: Pointer to write
+
+    Returns:
+        Pointer file content
+    """
+    return f"version {POINTER_VERSION}\noid sha256:{pointer.oid}\nsize {pointer.size}\n"
+
+
+def parse_pointer(data: bytes) -> Optional[Pointer]:
+    """
+    Parse the content of a pointer file.
+
+    Args:
+        data: File content
+
+    Returns:
+        Pointer or None if the content is not a pointer
+    """
+    if len(data) > MAX_POINTER_SIZE or not data.startswith(b"version "):
+        return None
+
+    match = POINTER_PATTERN.match(data.decode("ascii", errors="replace"))
+    if not match or match.group(1) != POINTER_VERSION:
+        return None
+    return Pointer(match.group(2), int(match.group(3)))
+
+
+def read_pointer(path: Union[str, pathlib.Path]) -> Optional[Pointer]:
+    """
+    Read a pointer file, only small files are opened.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Pointer or None if the file is no pointer
+    """
+    try:
+        if os.path.getsize(path) > MAX_POINTER_SIZE:
+            return None
+        with open(path, "rb") as pointer_file:
+            return parse_pointer(pointer_file.read())
+    except OSError:
+        return None
+
+
+def _stream_to_temp(
+        source_path: Union[str, pathlib.Path],
+        target_dir: Union[str, pathlib.Path],
+        progress: Optional[Callable[[int, int], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+) -> Optional[Tuple[str, Pointer]]:
+    """
+    Copy a file in chunks to a temporary file, hashing it in the same pass.
+
+    The temporary file gets the permission bits of the source like shutil.copy,
+    not the owner-only mode of mkstemp.
+
+    Args:
+        source_path: File to copy
+        target_dir: Directory of the temporary file, on the target file system
+        progress: Optional callback receiving (bytes copied, total bytes)
+        should_stop: Optional callback, copying is cancelled when it returns True
+
+    Returns:
+        Tuple of (temporary file path, pointer to the content), None if cancelled
+
+    Raises:
+        OSError: If reading or writing fails
+    """
+    total = os.path.getsize(source_path)
+    digest = hashlib.sha256()
+    done = 0
+    complete = False
+
+    fd, tmp_path = tempfile.mkstemp(dir=target_dir, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file, open(source_path, "rb") as source_file:
+            for chunk in iter(lambda: source_file.read(CHUNK_SIZE), b""):
+                if should_stop and should_stop():
+                    logger.info(f"Copying {source_path} cancelled")
+                    return None
+                digest.update(chunk)
+                tmp_file.write(chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+        shutil.copymode(source_path, tmp_path)
+        complete = True
+    finally:
+        if not complete:
+            os.unlink(tmp_path)
+
+    return tmp_path, Pointer(digest.hexdigest(), done)
+
+
+def copy_hashed(
+        source_path: Union[str, pathlib.Path],
+        target_path: Union[str, pathlib.Path],
+        progress: Optional[Callable[[int, int], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        tmp_dir: Optional[Union[str, pathlib.Path]] = None
+) -> Optional[Pointer]:
+    """
+    Copy a file in chunks, computing its SHA-256 hash in the same pass.
+
+    The copy is renamed into place when complete, so the target is never
+    left half written.
+
+    Args:
+        source_path: File to copy
+        target_path: Destination
+        progress: Optional callback receiving (bytes copied, total bytes)
+        should_stop: Optional callback, copying is cancelled when it returns True
+        tmp_dir: Directory of the temporary file on the target's file system,
+            defaults to the target's directory
+
+    Returns:
+        Hash and size of the content, None if cancelled
+
+    Raises:
+        OSError: If reading or writing fails
+    """
+    target_path = pathlib.Path(target_path)
+    copied = _stream_to_temp(source_path, tmp_dir or target_path.parent, progress, should_stop)
+    if copied is None:
+        return None
+
+    tmp_path, pointer = copied
+    os.replace(tmp_path, target_path)
+    return pointer
+
+
+def pointers_enabled(project: Optional[Dict]) -> bool:
+    """
+    Check whether uploads of a project go to the attachment store.
+
+    Args:
+        project: Project configuration
+
+    Returns:
+        True if "attachment_store" is enabled and "attachment_store_dir" is set
+    """
+    project = project or {}
+    if not project.get("attachment_store", False):
+        return False
+    if not project.get("attachment_store_dir"):
+        logger.warning(
+            "attachment_store is enabled without attachment_store_dir, uploads are "
+            "copied into the project: a store inside .git is not shared with other clones"
+        )
+        return False
+    return True
+
+
+class AttachmentStore:
+    """
+    Directory of attachments named by their SHA-256 hash.
+
+    Objects are written to a temporary file and renamed into place, so a
+    stored object is always complete.
+    """
+
+    def __init__(self, store_dir: Union[str, pathlib.Path]):
+        """
+        Initialize store.
+
+        Args:
+            store_dir: Directory holding the objects
+        """
+        self.store_dir = pathlib.Path(store_dir)
+
+    @classmethod
+    def for_project(cls, project_path: str, project: Optional[Dict] = None) -> "AttachmentStore":
+        """
+        Get the store of a project.
+
+        Args:
+            project_path: Path to the project directory
+            project: Project configuration, "attachment_store_dir" overrides the
+                default location inside .git, which only serves existing pointers
+
+        Returns:
+            Attachment store
+        """
+        store_dir = (project or {}).get("attachment_store_dir")
+        if not store_dir:
+            store_dir = os.path.join(project_path, ".git", STORE_DIR_NAME)
+        return cls(store_dir)
+
+    def object_path(self, oid: str) -> pathlib.Path:
+        """
+        Get the path of a stored object.
+
+        Args:
+            oid: SHA-256 hex digest of the content
+
+        Returns:
+            Path, fanned out by the first two characters
+        """
+        return self.store_dir / oid[:2] / oid
+
+    def contains(self, pointer: Pointer) -> bool:
+        """
+        Check whether the content of a pointer is stored.
+
+        Args:
+            pointer: Pointer to check
+
+        Returns:
+            True if the object exists with the expected size
+        """
+        try:
+            return self.object_path(pointer.oid).stat().st_size == pointer.size
+        except OSError:
+            return False
+
+    def add(
+            self,
+            source_path: Union[str, pathlib.Path],
+            progress: Optional[Callable[[int, int], None]] = None,
+            should_stop: Optional[Callable[[], bool]] = None
+    ) -> Optional[Pointer]:
+        """
+        Store a file, content that is stored already is kept only once.
+
+        The file is read once: it is copied into the store while hashing and
+        renamed to its hash afterwards.
+
+        Args:
+            source_path: File to store
+            progress: Optional callback receiving (bytes copied, total bytes)
+            should_stop: Optional callback, storing is cancelled when it returns True
+
+        Returns:
+            Pointer to the stored content, None if cancelled
+
+        Raises:
+            OSError: If the file cannot be read or stored
+        """
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        copied = _stream_to_temp(source_path, self.store_dir, progress, should_stop)
+        if copied is None:
+            return None
+
+        tmp_path, pointer = copied
+        if self.contains(pointer):
+            os.unlink(tmp_path)
+            logger.info(f"Attachment {pointer.oid} already stored")
+            return pointer
+
+        object_path = self.object_path(pointer.oid)
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, object_path)
+        logger.info(f"Stored attachment {pointer.oid} ({pointer.size} bytes)")
+        return pointer
+
+    def add_with_pointer(
+            self,
+            source_path: Union[str, pathlib.Path],
+            pointer_path: Union[str, pathlib.Path],
+            progress: Optional[Callable[[int, int], None]] = None,
+            should_stop: Optional[Callable[[], bool]] = None
+    ) -> Optional[Pointer]:
+        """
+        Store a file and write a pointer file referencing it.
+
+        Args:
+            source_path: File to store
+            pointer_path: Path of the pointer file in the project
+            progress: Optional callback receiving (bytes copied, total bytes)
+            should_stop: Optional callback, storing is cancelled when it returns True
+
+        Returns:
+            Pointer to the stored content, None if cancelled
+        """
+        pointer = self.add(source_path, progress, should_stop)
+        if pointer is not None:
+            pathlib.Path(pointer_path).write_text(format_pointer(pointer), encoding="ascii")
+        return pointer
+
+    def resolve(self, path: Union[str, pathlib.Path]) -> pathlib.Path:
+        """
+        Map a project file to the file holding its content.
+
+        Args:
+            path: File in the project
+
+        Returns:
+            Stored object if the file is a pointer to available content, else the file itself
+        """
+        path = pathlib.Path(path)
+        pointer = read_pointer(path)
+        if pointer is None:
+            return path
+        if not self.contains(pointer):
+            logger.warning(f"Attachment {pointer.oid} of {path} is not in the store")
+            return path
+        return self.object_path(pointer.oid)
+
+    def external_path(self, path: Union[str, pathlib.Path]) -> Optional[pathlib.Path]:
+        """
+        Map a project file to a file an external program can open.
+
+        Stored objects have no file name extension, so the content of a pointer
+        is copied to a temporary file named like the project file. The store
+        itself is never handed out, a program writing to the file cannot
+        damage it.
+
+        Args:
+            path: File in the project
+
+        Returns:
+            The file itself if it is no pointer, a copy of the stored content,
+            or None if the content is not in the store
+
+        Raises:
+            OSError: If the copy cannot be written
+        """
+        path = pathlib.Path(path)
+        pointer = read_pointer(path)
+        if pointer is None:
+            return path
+        if not self.contains(pointer):
+            logger.warning(f"Attachment {pointer.oid} of {path} is not in the store")
+            return None
+
+        copy_path = pathlib.Path(tempfile.gettempdir()) / OPEN_DIR_NAME / pointer.oid / path.name
+        try:
+            if copy_path.stat().st_size == pointer.size:
+                return copy_path
+        except OSError:
+            pass
+
+        copy_path.parent.mkdir(parents=True, exist_ok=True)
+        copy_hashed(self.object_path(pointer.oid), copy_path)
+        return copy_path
+
+
+class UploadWorker(PyQt6.QtCore.QObject):
+    """
+    Worker that copies an upload into a project in a separate thread.
+
+    Signals:
+        progress: Emitted while copying (int: percentage done)
+        upload_finished: Emitted when the file is in place (str: target path)
+        upload_cancelled: Emitted when the upload was cancelled, nothing was written
+        upload_failed: Emitted when copying failed (str: error)
+    """
+    progress = PyQt6.QtCore.pyqtSignal(int)
+    upload_finished = PyQt6.QtCore.pyqtSignal(str)
+    upload_cancelled = PyQt6.QtCore.pyqtSignal()
+    upload_failed = PyQt6.QtCore.pyqtSignal(str)
+
+    def __init__(
+            self,
+            source_path: str,
+            target_path: str,
+            store: Optional[AttachmentStore] = None,
+            tmp_dir: Optional[str] = None
+    ):
+        """
+        Initialize worker.
+
+        Args:
+            source_path: File to upload
+            target_path: Destination in the project
+            store: Attachment store, the target becomes a pointer if given
+            tmp_dir: Directory for the partial copy, outside the work tree so a crash
+                leaves nothing a reconcile would commit, defaults to the target's directory
+        """
+        super().__init__()
+        self.source_path = source_path
+        self.target_path = target_path
+        self.store = store
+        self.tmp_dir = tmp_dir
+        self.cancel_requested = False
+        self.last_percent = -1
+
+    def _on_progress(self, done: int, total: int) -> None:
+        """Report progress, once per percent."""
+        percent = 100 * done // total if total else 100
+        if percent != self.last_percent:
+            self.last_percent = percent
+            self.progress.emit(percent)
+
+    @PyQt6.QtCore.pyqtSlot()
+    def run(self) -> None:
+        """Copy the file and report the result."""
+        def should_stop() -> bool:
+            return self.cancel_requested
+
+        try:
+            if self.store:
+                pointer = self.store.add_with_pointer(
+                    self.source_path, self.target_path, self._on_progress, should_stop
+                )
+            else:
+                pointer = copy_hashed(
+                    self.source_path, self.target_path, self._on_progress, should_stop,
+                    self.tmp_dir
+                )
+        except Exception as e:
+            logger.error(f"Upload of {self.source_path} failed: {e}")
+            self.upload_failed.emit(str(e))
+            return
+
+        if pointer is None:
+            self.upload_cancelled.emit()
+            return
+
+        logger.info(f"Uploaded {self.source_path} ({pointer.size} bytes, sha256 {pointer.oid})")
+        self.upload_finished.emit(self.target_path)
+
+    def cancel(self) -> None:
+        """
+        Ask a running upload to stop, may be called from another thread.
+
+        A copy that is already complete is not undone, upload_finished is emitted
+        instead of upload_cancelled.
+        """
+        self.cancel_requested = True
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    logger.info("Testing cancelling an upload...")
+
+    test_dir = tempfile.mkdtemp(prefix="thanote-upload-")
+    test_source = os.path.join(test_dir, "source.bin")
+    test_target = os.path.join(test_dir, "target.bin")
+    with open(test_source, "wb") as source:
+        test_chunk = os.urandom(CHUNK_SIZE)
+        for _ in range(256):
+            source.write(test_chunk)
+
+    app = PyQt6.QtCore.QCoreApplication([])
+    thread = PyQt6.QtCore.QThread()
+    worker = UploadWorker(test_source, test_target)
+    worker.moveToThread(thread)
+    results = []
+
+    # Cancel from this thread like the progress dialog does, while run() is busy. A lambda,
+    # the bound slot would be queued to the worker thread and run after the copy.
+    PyQt6.QtCore.QTimer.singleShot(10, lambda: worker.cancel())
+    worker.upload_cancelled.connect(lambda: results.append("cancelled"))
+    worker.upload_finished.connect(lambda _path: results.append("finished"))
+    worker.upload_failed.connect(lambda error: results.append(error))
+    for signal in (worker.upload_cancelled, worker.upload_finished, worker.upload_failed):
+        signal.connect(app.quit)
+    thread.started.connect(worker.run)
+    thread.start()
+    app.exec()
+    thread.quit()
+    thread.wait()
+
+    print(f"Result: {results}, target exists: {os.path.exists(test_target)}, "
+          f"leftover files: {sorted(os.listdir(test_dir))}")
+    for test_file in os.listdir(test_dir):
+        os.unlink(os.path.join(test_dir, test_file))
+    os.rmdir(test_dir)
@@ -4,51 +4,270 @@
 """
 Commit browser dialog for displaying Git commit history.
 """
+import logging
+from typing import List, Optional, Tuple
+
 import PyQt6.QtWidgets
 import PyQt6.QtCore
 import PyQt6.QtGui
 
+import notegit
+
+# Configuration
+PAGE_SIZE = 200
+FILTER_DELAY_MS = 300
+
+logger = logging.getLogger(__name__)
+
+
+class CommitTableModel(PyQt6.QtCore.QAbstractTableModel):
+    """
+    Table model of the commit history, filled page by page while scrolling.
+
+    Signals:
+        request_start: Asks the loader to start reading with new filters
+            (int: generation, str: author, str: path, str: message)
+        request_page: Asks the loader for the next page (int: generation, int: count)
+    """
+    request_start = PyQt6.QtCore.pyqtSignal(int, str, str, str)
+    request_page = PyQt6.QtCore.pyqtSignal(int, int)
+
+    HEADERS = ("Commit", "Date", "Author", "Message")
+
+    def __init__(self, parent: Optional[PyQt6.QtCore.QObject] = None):
+        """
+        Initialize model.
+
+        Args:
+            parent: Parent object
+        """
+        super().__init__(parent)
+        self.rows: List[Tuple[str, str, str, str]] = []
+        self.generation = 0
+        self.has_more = False
+        self.loading = False
+
+    def rowCount(self, parent: PyQt6.QtCore.QModelIndex = PyQt6.QtCore.QModelIndex()) -> int:
+        """Number of loaded commits."""
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent: PyQt6.QtCore.QModelIndex = PyQt6.QtCore.QModelIndex()) -> int:
+        """Number of columns."""
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(
+            self,
+            index: PyQt6.QtCore.QModelIndex,
+            role: int = PyQt6.QtCore.Qt.ItemDataRole.DisplayRole
+    ):
+        """Cell content, the commit column shows the abbreviated SHA."""
+        if not index.isValid():
+            return None
+
+        row = self.rows[index.row()]
+        if role == PyQt6.QtCore.Qt.ItemDataRole.DisplayRole:
+            return row[0][:7] if index.column() == 0 else row[index.column()]
+        if role == PyQt6.QtCore.Qt.ItemDataRole.ToolTipRole and index.column() == 0:
+            return row[0]
+        return None
+
+    def headerData(
+            self,
+            section: int,
+            orientation: PyQt6.QtCore.Qt.Orientation,
+            role: int = PyQt6.QtCore.Qt.ItemDataRole.DisplayRole
+    ):
+        """Column titles."""
+        if (orientation == PyQt6.QtCore.Qt.Orientation.Horizontal
+                and role == PyQt6.QtCore.Qt.ItemDataRole.DisplayRole):
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent: PyQt6.QtCore.QModelIndex = PyQt6.QtCore.QModelIndex()) -> bool:
+        """Whether the view may request another page."""
+        return not parent.isValid() and self.has_more and not self.loading
+
+    def fetchMore(self, parent: PyQt6.QtCore.QModelIndex = PyQt6.QtCore.QModelIndex()) -> None:
+        """Request the next page from the loader."""
+        if not self.canFetchMore(parent):
+            return
+        self.loading = True
+        self.request_page.emit(self.generation, PAGE_SIZE)
+
+    def set_filters(self, author: str, path: str, message: str) -> None:
+        """
+        Restart loading with new filters.
+
+        Args:
+            author: Author filter, empty for all
+            path: Path filter, empty for all
+            message: Message filter, empty for all
+        """
+        self.beginResetModel()
+        self.rows = []
+        self.generation += 1
+        self.has_more = True
+        self.loading = False
+        self.endResetModel()
+
+        self.request_start.emit(self.generation, author, path, message)
+        self.fetchMore()
+
+    def commit_sha(self, row: int) -> Optional[str]:
+        """
+        Get the full SHA of a loaded commit.
+
+        Args:
+            row: Row in the model
+
+        Returns:
+            Commit SHA or None
+        """
+        return self.rows[row][0] if 0 <= row < len(self.rows) else None
+
+    def on_page_loaded(self, generation: int, rows: list, has_more: bool) -> None:
+        """
+        Append a page delivered by the loader.
+
+        Args:
+            generation: Filter generation the page belongs to
+            rows: Tuples of (sha, date, author, summary)
+            has_more: Whether more commits are available
+        """
+        if generation != self.generation:
+            return
+
+        self.loading = False
+        self.has_more = has_more
+        if rows:
+            self.beginInsertRows(
+                PyQt6.QtCore.QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1
+            )
+            self.rows.extend(rows)
+            self.endInsertRows()
+
+    def on_load_failed(self, generation: int, error: str) -> None:
+        """
+        Stop loading after an error.
+
+        Args:
+            generation: Filter generation the error belongs to
+            error: Error message
+        """
+        if generation == self.generation:
+            logger.error(f"Loading commits failed: {error}")
+            self.loading = False
+            self.has_more = False
+
 
 class CommitBrowserDialog(PyQt6.QtWidgets.QDialog):
     """
-    Simple non-modal dialog that displays Git commit log.
+    Non-modal dialog that displays the Git commit history.
+
+    Commits are read in a background thread and loaded in pages while scrolling.
     """
 
-    def __init__(self, log_text: str, parent=None):
+    def __init__(self, project_path: str, parent=None):
         """
         Initialize commit browser dialog.
 
         Args:
-            log_text: Formatted commit log text
+            project_path: Path to the git repository
             parent: Parent widget
         """
         super().__init__(parent)
-        self.setWindowTitle("Commit History (Last 50)")
-        self.setMinimumSize(600, 400)
+        self.setWindowTitle("Commit History")
+        self.setMinimumSize(700, 450)
 
         main_layout = PyQt6.QtWidgets.QVBoxLayout(self)
 
-        # Text field for commit log
-        text_field = PyQt6.QtWidgets.QPlainTextEdit()
-        text_field.setReadOnly(True)
+        # Filter fields
+        self.author_filter = PyQt6.QtWidgets.QLineEdit()
+        self.author_filter.setPlaceholderText("Author")
+        self.path_filter = PyQt6.QtWidgets.QLineEdit()
+        self.path_filter.setPlaceholderText("Path")
+        self.message_filter = PyQt6.QtWidgets.QLineEdit()
+        self.message_filter.setPlaceholderText("Message")
 
-        # Use monospace font for clean alignment
+        filter_layout = PyQt6.QtWidgets.QHBoxLayout()
+        for line_edit in (self.author_filter, self.path_filter, self.message_filter):
+            line_edit.setClearButtonEnabled(True)
+            line_edit.textChanged.connect(self.on_filter_changed)
+            filter_layout.addWidget(line_edit)
+        main_layout.addLayout(filter_layout)
+
+        # Apply filters once typing paused
+        self.filter_timer = PyQt6.QtCore.QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_DELAY_MS)
+        self.filter_timer.timeout.connect(self.apply_filters)
+
+        # Commit table
+        self.model = CommitTableModel(self)
+        self.table_view = PyQt6.QtWidgets.QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setSelectionBehavior(
+            PyQt6.QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows
+        )
+        self.table_view.setEditTriggers(
+            PyQt6.QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers
+        )
+        self.table_view.verticalHeader().setVisible(False)
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+
+        # Use monospace font for the commit column
         font = PyQt6.QtGui.QFontDatabase.systemFont(
             PyQt6.QtGui.QFontDatabase.SystemFont.FixedFont
         )
-        text_field.setFont(font)
-        text_field.setPlainText(log_text)
-
-        main_layout.addWidget(text_field)
+        self.table_view.setFont(font)
+        main_layout.addWidget(self.table_view)
 
         # Close button
         close_button = PyQt6.QtWidgets.QPushButton("Close")
         close_button.clicked.connect(self.accept)
 
-        button_layout = PyQt6.QtWidgets.QHBoxLayout()
-        button_layout.addStretch()
-        button_layout.addWidget(close_button)
-        main_layout.addLayout(button_layout)
+        self.button_layout = PyQt6.QtWidgets.QHBoxLayout()
+        self.button_layout.addStretch()
+        self.button_layout.addWidget(close_button)
+        main_layout.addLayout(self.button_layout)
+
+        # Background loader
+        self.loader_thread = PyQt6.QtCore.QThread()
+        self.loader = notegit.CommitLogLoader(project_path)
+        self.loader.moveToThread(self.loader_thread)
+        self.model.request_start.connect(self.loader.start)
+        self.model.request_page.connect(self.loader.fetch)
+        self.loader.page_loaded.connect(self.model.on_page_loaded)
+        self.loader.load_failed.connect(self.model.on_load_failed)
+        self.loader_thread.start()
+
+        self.finished.connect(self._stop_loader)
 
         # Important: Delete dialog instance when closed
         self.setAttribute(PyQt6.QtCore.Qt.WidgetAttribute.WA_DeleteOnClose)
+
+        self.apply_filters()
+
+    def on_filter_changed(self) -> None:
+        """Restart the filter delay."""
+        self.filter_timer.start()
+
+    def apply_filters(self) -> None:
+        """Reload the history with the current filters."""
+        self.filter_timer.stop()
+        self.model.set_filters(
+            self.author_filter.text().strip(),
+            self.path_filter.text().strip(),
+            self.message_filter.text().strip()
+        )
+
+    def _stop_loader(self) -> None:
+        """Stop the loader thread."""
+        if not self.loader_thread.isRunning():
+            return
+
+        PyQt6.QtCore.QMetaObject.invokeMethod(
+            self.loader, "stop", PyQt6.QtCore.Qt.ConnectionType.BlockingQueuedConnection
+        )
+        self.loader_thread.quit()
+        self.loader_thread.wait()
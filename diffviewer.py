@@ -0,0 +1,447 @@
+# Copyright [2025] [ecki]
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Side-by-side diff viewer for two versions of a page.
+"""
+import collections
+import difflib
+import hashlib
+import html.parser
+import logging
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import PyQt6.QtWidgets
+import PyQt6.QtCore
+import PyQt6.QtGui
+
+# Configuration
+DIFF_CACHE_ENTRIES = 32
+CHUNK_ROWS = 500  # Rows added to the view per fetch
+
+MODE_SOURCE = "source"
+MODE_RENDERED = "rendered"
+
+BLOCK_TAGS = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "dt", "dd"}
+
+logger = logging.getLogger(__name__)
+
+# Row of a side-by-side diff: (tag, old line number, old text, new line number, new text)
+DiffRow = Tuple[str, Optional[int], str, Optional[int], str]
+
+# Computed diffs by (old SHA, new SHA, mode). Source diffs are keyed by the blobs,
+# rendered diffs by the hashes of the rendered text, which also covers included files
+_diff_cache: "collections.OrderedDict[Tuple[str, str, str], List[DiffRow]]" = (
+    collections.OrderedDict()
+)
+
+
+class DiffVersion(NamedTuple):
+    """
+    One side of a diff.
+
+    Attributes:
+        label: Title shown above the side
+        blob_sha: SHA of the git blob, identifies the content for caching
+        read_source: Function returning the AsciiDoc source
+        read_rendered: Function returning the rendered HTML
+    """
+    label: str
+    blob_sha: str
+    read_source: Callable[[], str]
+    read_rendered: Callable[[], str]
+
+
+def blob_sha(data: bytes) -> str:
+    """
+    Compute the git blob SHA of content, e.g. of a file in the work tree.
+
+    Args:
+        data: File content
+
+    Returns:
+        Hex SHA as git hash-object would report it
+    """
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class _TextExtractor(html.parser.HTMLParser):
+    """Collects the visible text of an HTML page, one line per block element."""
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style", "head"):
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style", "head"):
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html_text: str) -> str:
+    """
+    Reduce rendered HTML to its visible text for diffing.
+
+    Args:
+        html_text: Rendered HTML
+
+    Returns:
+        Text with one line per block element, empty lines removed
+    """
+    extractor = _TextExtractor()
+    extractor.feed(html_text)
+    lines = (line.strip() for line in "".join(extractor.parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def side_by_side(old_text: str, new_text: str) -> List[DiffRow]:
+    """
+    Compute a side-by-side diff.
+
+    Args:
+        old_text: Old version
+        new_text: New version
+
+    Returns:
+        List of rows, replaced blocks are paired line by line
+    """
+    old_lines = old_text.splitlines()
+    new_lines = new_text.splitlines()
+    rows: List[DiffRow] = []
+
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            rows.extend(
+                ("equal", i1 + k + 1, old_lines[i1 + k], j1 + k + 1, new_lines[j1 + k])
+                for k in range(i2 - i1)
+            )
+            continue
+
+        for k in range(max(i2 - i1, j2 - j1)):
+            old_no = i1 + k + 1 if i1 + k < i2 else None
+            new_no = j1 + k + 1 if j1 + k < j2 else None
+            rows.append((
+                tag,
+                old_no, old_lines[i1 + k] if old_no else "",
+                new_no, new_lines[j1 + k] if new_no else ""
+            ))
+    return rows
+
+
+class DiffWorker(PyQt6.QtCore.QObject):
+    """
+    Worker that computes diffs in a separate thread.
+    """
+    diff_ready = PyQt6.QtCore.pyqtSignal(tuple, list)
+    diff_failed = PyQt6.QtCore.pyqtSignal(tuple, str)
+
+    @PyQt6.QtCore.pyqtSlot(tuple, str, str)
+    def compute(self, key: tuple, old_text: str, new_text: str) -> None:
+        """
+        Compute a diff and report it.
+
+        Args:
+            key: Cache key of the diff
+            old_text: Old version
+            new_text: New version
+        """
+        try:
+            rows = side_by_side(old_text, new_text)
+        except Exception as e:
+            logger.error(f"Could not compute diff: {e}")
+            self.diff_failed.emit(key, str(e))
+            return
+        self.diff_ready.emit(key, rows)
+
+
+class DiffTableModel(PyQt6.QtCore.QAbstractTableModel):
+    """
+    Table model of a side-by-side diff, rows are added to the view in chunks.
+    """
+    COLORS = {
+        "insert": PyQt6.QtGui.QColor("#e6ffec"),
+        "delete": PyQt6.QtGui.QColor("#ffebe9"),
+        "replace": PyQt6.QtGui.QColor("#fff8c5"),
+    }
+
+    def __init__(self, parent: Optional[PyQt6.QtCore.QObject] = None):
+        """
+        Initialize model.
+
+        Args:
+            parent: Parent object
+        """
+        super().__init__(parent)
+        self.all_rows: List[DiffRow] = []
+        self.shown = 0
+        self.headers = ["", "", "", ""]
+
+    def set_rows(self, rows: List[DiffRow]) -> None:
+        """
+        Show a new diff, starting with the first chunk.
+
+        Args:
+            rows: Diff rows
+        """
+        self.beginResetModel()
+        self.all_rows = rows
+        self.shown = min(len(rows), CHUNK_ROWS)
+        self.endResetModel()
+
+    def set_labels(self, old_label: str, new_label: str) -> None:
+        """
+        Set the column titles.
+
+        Args:
+            old_label: Title of the old version
+            new_label: Title of the new version
+        """
+        self.headers = ["", old_label, "", new_label]
+        self.headerDataChanged.emit(PyQt6.QtCore.Qt.Orientation.Horizontal, 0, 3)
+
+    def rowCount(self, parent: PyQt6.QtCore.QModelIndex = PyQt6.QtCore.QModelIndex()) -> int:
+        """Number of rows added to the view so far."""
+        return 0 if parent.isValid() else self.shown
+
+    def columnCount(self, parent: PyQt6.QtCore.QModelIndex = PyQt6.QtCore.QModelIndex()) -> int:
+        """Line number and text for both versions."""
+        return 0 if parent.isValid() else 4
+
+    def data(
+            self,
+            index: PyQt6.QtCore.QModelIndex,
+            role: int = PyQt6.QtCore.Qt.ItemDataRole.DisplayRole
+    ):
+        """Cell content and background color of changed lines."""
+        if not index.isValid():
+            return None
+
+        tag, old_no, old_text, new_no, new_text = self.all_rows[index.row()]
+        column = index.column()
+        if role == PyQt6.QtCore.Qt.ItemDataRole.DisplayRole:
+            value = (old_no, old_text, new_no, new_text)[column]
+            return "" if value is None else value
+        if role == PyQt6.QtCore.Qt.ItemDataRole.BackgroundRole and tag != "equal":
+            side_empty = (old_no if column < 2 else new_no) is None
+            return None if side_empty else self.COLORS.get(tag)
+        return None
+
+    def headerData(
+            self,
+            section: int,
+            orientation: PyQt6.QtCore.Qt.Orientation,
+            role: int = PyQt6.QtCore.Qt.ItemDataRole.DisplayRole
+    ):
+        """Column titles."""
+        if (orientation == PyQt6.QtCore.Qt.Orientation.Horizontal
+                and role == PyQt6.QtCore.Qt.ItemDataRole.DisplayRole):
+            return self.headers[section]
+        return None
+
+    def canFetchMore(self, parent: PyQt6.QtCore.QModelIndex = PyQt6.QtCore.QModelIndex()) -> bool:
+        """Whether rows are left to add."""
+        return not parent.isValid() and self.shown < len(self.all_rows)
+
+    def fetchMore(self, parent: PyQt6.QtCore.QModelIndex = PyQt6.QtCore.QModelIndex()) -> None:
+        """Add the next chunk of rows."""
+        if not self.canFetchMore(parent):
+            return
+        count = min(CHUNK_ROWS, len(self.all_rows) - self.shown)
+        self.beginInsertRows(PyQt6.QtCore.QModelIndex(), self.shown, self.shown + count - 1)
+        self.shown += count
+        self.endInsertRows()
+
+
+class DiffViewerDialog(PyQt6.QtWidgets.QDialog):
+    """
+    Non-modal dialog comparing two versions of a page side by side.
+
+    Diffs are computed in a background thread and cached per pair of versions.
+    """
+    request_diff = PyQt6.QtCore.pyqtSignal(tuple, str, str)
+
+    def __init__(self, old: DiffVersion, new: DiffVersion, parent=None):
+        """
+        Initialize diff viewer dialog.
+
+        Args:
+            old: Old version
+            new: New version
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.old = old
+        self.new = new
+        self.pending_key: Optional[tuple] = None
+        self.setWindowTitle(f"Diff: {old.label} → {new.label}")
+        self.setMinimumSize(900, 500)
+
+        main_layout = PyQt6.QtWidgets.QVBoxLayout(self)
+
+        # Mode selection
+        self.mode_box = PyQt6.QtWidgets.QComboBox()
+        self.mode_box.addItem("Source", MODE_SOURCE)
+        self.mode_box.addItem("Rendered", MODE_RENDERED)
+        self.mode_box.currentIndexChanged.connect(self.show_diff)
+        self.status_label = PyQt6.QtWidgets.QLabel()
+
+        mode_layout = PyQt6.QtWidgets.QHBoxLayout()
+        mode_layout.addWidget(self.mode_box)
+        mode_layout.addWidget(self.status_label)
+        mode_layout.addStretch()
+        main_layout.addLayout(mode_layout)
+
+        # Diff table
+        self.model = DiffTableModel(self)
+        self.model.set_labels(old.label, new.label)
+        self.table_view = PyQt6.QtWidgets.QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setEditTriggers(
+            PyQt6.QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers
+        )
+        self.table_view.setWordWrap(False)
+        self.table_view.setShowGrid(False)
+        self.table_view.verticalHeader().setVisible(False)
+        header = self.table_view.horizontalHeader()
+        for column, mode in enumerate((
+                PyQt6.QtWidgets.QHeaderView.ResizeMode.ResizeToContents,
+                PyQt6.QtWidgets.QHeaderView.ResizeMode.Stretch,
+                PyQt6.QtWidgets.QHeaderView.ResizeMode.ResizeToContents,
+                PyQt6.QtWidgets.QHeaderView.ResizeMode.Stretch)):
+            header.setSectionResizeMode(column, mode)
+
+        font = PyQt6.QtGui.QFontDatabase.systemFont(
+            PyQt6.QtGui.QFontDatabase.SystemFont.FixedFont
+        )
+        self.table_view.setFont(font)
+        main_layout.addWidget(self.table_view)
+
+        # Close button
+        close_button = PyQt6.QtWidgets.QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+
+        button_layout = PyQt6.QtWidgets.QHBoxLayout()
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        main_layout.addLayout(button_layout)
+
+        # Background diff computation
+        self.diff_thread = PyQt6.QtCore.QThread()
+        self.diff_worker = DiffWorker()
+        self.diff_worker.moveToThread(self.diff_thread)
+        self.request_diff.connect(self.diff_worker.compute)
+        self.diff_worker.diff_ready.connect(self.on_diff_ready)
+        self.diff_worker.diff_failed.connect(self.on_diff_failed)
+        self.diff_thread.start()
+
+        self.finished.connect(self._stop_worker)
+
+        # Important: Delete dialog instance when closed
+        self.setAttribute(PyQt6.QtCore.Qt.WidgetAttribute.WA_DeleteOnClose)
+
+        self.show_diff()
+
+    def show_diff(self) -> None:
+        """Show the diff in the selected mode, computing it if not cached."""
+        mode = self.mode_box.currentData()
+        if mode == MODE_SOURCE and self._show_cached((self.old.blob_sha, self.new.blob_sha, mode)):
+            return
+
+        try:
+            if mode == MODE_RENDERED:
+                old_text = html_to_text(self.old.read_rendered())
+                new_text = html_to_text(self.new.read_rendered())
+                # Included files change the rendering without changing the blob
+                key = (
+                    blob_sha(old_text.encode("utf-8")), blob_sha(new_text.encode("utf-8")), mode
+                )
+                if self._show_cached(key):
+                    return
+            else:
+                old_text = self.old.read_source()
+                new_text = self.new.read_source()
+                key = (self.old.blob_sha, self.new.blob_sha, mode)
+        except Exception as e:
+            logger.error(f"Could not read versions for diff: {e}")
+            self.status_label.setText(f"Error: {e}")
+            return
+
+        self.pending_key = key
+        self.status_label.setText("Computing diff...")
+        self.model.set_rows([])
+        self.request_diff.emit(key, old_text, new_text)
+
+    def _show_cached(self, key: tuple) -> bool:
+        """
+        Show a cached diff.
+
+        Args:
+            key: Cache key of the diff
+
+        Returns:
+            True if the diff was cached
+        """
+        rows = _diff_cache.get(key)
+        if rows is None:
+            return False
+        _diff_cache.move_to_end(key)
+        self.pending_key = None
+        self._show_rows(rows)
+        return True
+
+    def on_diff_ready(self, key: tuple, rows: list) -> None:
+        """
+        Cache a computed diff and show it if it is still wanted.
+
+        Args:
+            key: Cache key of the diff
+            rows: Diff rows
+        """
+        _diff_cache[key] = rows
+        while len(_diff_cache) > DIFF_CACHE_ENTRIES:
+            _diff_cache.popitem(last=False)
+
+        if key == self.pending_key:
+            self.pending_key = None
+            self._show_rows(rows)
+
+    def on_diff_failed(self, key: tuple, error: str) -> None:
+        """
+        Show a diff error, nothing is cached so the next attempt computes it again.
+
+        Args:
+            key: Cache key of the diff
+            error: Error message
+        """
+        if key == self.pending_key:
+            self.pending_key = None
+            self.status_label.setText(f"Error: {error}")
+
+    def _show_rows(self, rows: List[DiffRow]) -> None:
+        """
+        Put diff rows into the view.
+
+        Args:
+            rows: Diff rows
+        """
+        changed = sum(1 for row in rows if row[0] != "equal")
+        self.status_label.setText(f"{changed} changed lines" if changed else "No differences")
+        self.model.set_rows(rows)
+
+    def _stop_worker(self) -> None:
+        """Stop the diff thread."""
+        self.diff_thread.quit()
+        self.diff_thread.wait()
@@ -4,13 +4,13 @@
 """
 Edit page for AsciiDoc documents with syntax checking and file management.
 """
+import attachments
 import logging
 import notehelper
 import commitbrowser
 import docbrowser
 import os
 import pathlib
-import shutil
 import sys
 from typing import Optional, Dict, List
 
@@ -28,12 +28,14 @@ class EditPage(PyQt6.QtWidgets.QWidget):
 
     Signals:
         ascii_file_changed: Emitted when file is saved (str: filename)
+        ascii_file_rendered: Emitted when file is saved with its validated HTML (str, str)
         project_data_changed: Emitted when project data changes (dict)
         project_new_file: Emitted when new file is added (str: filename)
         geometry_update: Emitted when window geometry changes (tuple)
         show_commits_requested: Emitted when user wants to see commits
     """
     ascii_file_changed = PyQt6.QtCore.pyqtSignal(str)
+    ascii_file_rendered = PyQt6.QtCore.pyqtSignal(str, str)
     project_data_changed = PyQt6.QtCore.pyqtSignal(dict)
     project_new_file = PyQt6.QtCore.pyqtSignal(str)
     geometry_update = PyQt6.QtCore.pyqtSignal(tuple)
@@ -48,6 +50,10 @@ class EditPage(PyQt6.QtWidgets.QWidget):
         self.file_name: Optional[str] = None
         self.file_list: List[str] = []
         self.changed = False
+        self.upload_thread: Optional[PyQt6.QtCore.QThread] = None
+        self.upload_worker: Optional[attachments.UploadWorker] = None
+        self.upload_progress: Optional[PyQt6.QtWidgets.QProgressDialog] = None
+        self.upload_file_name: Optional[str] = None
 
         # UI
         main_layout = PyQt6.QtWidgets.QVBoxLayout()
@@ -183,6 +189,12 @@ class EditPage(PyQt6.QtWidgets.QWidget):
         """Upload a file to the project directory."""
         logger.info("Upload clicked")
 
+        if self.upload_thread is not None:
+            PyQt6.QtWidgets.QMessageBox.information(
+                self, "Hinweis", "Es wird bereits eine Datei hochgeladen"
+            )
+            return
+
         # Determine import directory
         import_dir = os.path.expanduser("~")
         if os.name in ["nt", "windows"]:
@@ -241,12 +253,13 @@ class EditPage(PyQt6.QtWidgets.QWidget):
             # Create target directory if needed
             target_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Copy file
-            shutil.copy(import_file, target_path)
-            logger.info(f"File {import_file} copied to {target_path}")
+            # Large files go to the attachment store, the project gets a pointer
+            store = None
+            if (attachments.pointers_enabled(self.project_data)
+                    and os.path.getsize(import_file) >= attachments.MIN_STORE_KB * 1024):
+                store = attachments.AttachmentStore.for_project(copy_dir, self.project_data)
 
-            # Notify about new file
-            self.project_new_file.emit(file_name_for_git)
+            self._start_upload(import_file, str(target_path), file_name_for_git, store)
 
         except ValueError:
             logger.error(f"Error: Target file {copy_file} not in project path {copy_dir}")
@@ -261,6 +274,101 @@ class EditPage(PyQt6.QtWidgets.QWidget):
                 self, "Fehler", f"Fehler beim Datei-Upload: {e}"
             )
 
+    def _start_upload(
+            self,
+            import_file: str,
+            target_path: str,
+            file_name_for_git: str,
+            store: Optional[attachments.AttachmentStore]
+    ) -> None:
+        """
+        Copy a file into the project in the background, showing a cancellable progress.
+
+        Args:
+            import_file: File to upload
+            target_path: Absolute destination in the project
+            file_name_for_git: Destination relative to the project
+            store: Attachment store, the destination becomes a pointer if given
+        """
+        self.upload_file_name = file_name_for_git
+        self.upload_progress = PyQt6.QtWidgets.QProgressDialog(
+            f"Lade {os.path.basename(import_file)} hoch...", "Abbrechen", 0, 100, self
+        )
+        self.upload_progress.setWindowTitle("Upload File")
+        self.upload_progress.setAutoClose(False)
+        self.upload_progress.setAutoReset(False)
+        self.upload_progress.show()
+
+        self.upload_thread = PyQt6.QtCore.QThread()
+        # Partial copies go to .git, where a crash leaves nothing to commit
+        git_dir = os.path.join(self.project_data.get("path", ""), ".git")
+        self.upload_worker = attachments.UploadWorker(
+            import_file, target_path, store, git_dir if os.path.isdir(git_dir) else None
+        )
+        self.upload_worker.moveToThread(self.upload_thread)
+        self.upload_thread.started.connect(self.upload_worker.run)
+        self.upload_worker.progress.connect(self.upload_progress.setValue)
+        self.upload_worker.upload_finished.connect(self.on_upload_finished)
+        self.upload_worker.upload_cancelled.connect(self._stop_upload)
+        self.upload_worker.upload_failed.connect(self.on_upload_failed)
+        # Not a queued slot call: the worker's event loop is blocked until the copy is done
+        self.upload_progress.canceled.connect(self.cancel_upload)
+        self.upload_thread.start()
+
+    def on_upload_finished(self, target_path: str) -> None:
+        """
+        Add a completely copied upload to git.
+
+        Args:
+            target_path: Absolute path of the uploaded file
+        """
+        file_name_for_git = self.upload_file_name
+        self._stop_upload()
+        logger.info(f"File uploaded to {target_path}")
+
+        # Notify about new file
+        if file_name_for_git:
+            self.project_new_file.emit(file_name_for_git)
+
+    def on_upload_failed(self, error: str) -> None:
+        """
+        Report a failed upload.
+
+        Args:
+            error: Error message
+        """
+        self._stop_upload()
+        PyQt6.QtWidgets.QMessageBox.critical(
+            self, "Fehler", f"Fehler beim Datei-Upload: {error}"
+        )
+
+    def cancel_upload(self) -> None:
+        """
+        Cancel a running upload, a partial copy is removed.
+
+        The upload is shut down when the worker reports the outcome: a copy that
+        completed before the cancel arrived is still added to git.
+        """
+        if self.upload_worker:
+            try:
+                self.upload_worker.progress.disconnect()
+            except TypeError:
+                pass  # Already cancelled
+            self.upload_worker.cancel()
+
+    def _stop_upload(self) -> None:
+        """Shut down the upload thread."""
+        if self.upload_progress:
+            self.upload_progress.close()
+            self.upload_progress = None
+
+        if self.upload_thread:
+            self.upload_thread.quit()
+            self.upload_thread.wait()
+            self.upload_thread = None
+            self.upload_worker = None
+        self.upload_file_name = None
+
     def on_click_info(self) -> None:
         """Open AsciiDoc syntax reference in browser."""
         logger.info("Info clicked")
@@ -309,7 +417,7 @@ class EditPage(PyQt6.QtWidgets.QWidget):
 
         # Validate AsciiDoc syntax
         try:
-            html_text = notehelper.text_2_html(text)
+            html_text = notehelper.render_text(text, text_file_path)
             logger.debug("AsciiDoc syntax validation successful")
         except Exception as e:
             logger.error(f"AsciiDoc syntax error: {e}")
@@ -333,6 +441,8 @@ class EditPage(PyQt6.QtWidgets.QWidget):
             return
 
         self.changed = False
+        # Hand the validated HTML to the viewer, so it doesn't render the file again
+        self.ascii_file_rendered.emit(self.file_name, html_text)
         self.ascii_file_changed.emit(self.file_name)
 
     def load_document(
@@ -0,0 +1,206 @@
+# Copyright [2025] [ecki]
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Watches a project directory for files changed outside the application.
+"""
+import logging
+import os
+from typing import Dict, List, Optional, Set
+
+import PyQt6.QtCore
+
+# Configuration
+COALESCE_MS = 300  # Events within this window are reported together
+MAX_WATCHED_FILES = 4000  # Stay well below the inotify watch limit
+WATCHED_EXTENSIONS = (".adoc", ".asciidoc", ".txt", ".md")
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectWatcher(PyQt6.QtCore.QObject):
+    """
+    Reports changed, added and removed files of a project tree.
+
+    Directories are watched to notice added and removed files, text files are
+    watched individually to notice modifications. Events are coalesced, so a
+    burst of changes (e.g. a checkout) is reported once.
+
+    Signals:
+        paths_changed: Emitted with absolute paths of changed files (list: paths,
+            bool: whether files were added or removed)
+        complete_changed: Emitted when it changes whether every text file is
+            watched (bool: complete)
+    """
+    paths_changed = PyQt6.QtCore.pyqtSignal(list, bool)
+    complete_changed = PyQt6.QtCore.pyqtSignal(bool)
+
+    def __init__(self, parent: Optional[PyQt6.QtCore.QObject] = None):
+        """
+        Initialize watcher.
+
+        Args:
+            parent: Parent object
+        """
+        super().__init__(parent)
+        self.project_path: Optional[str] = None
+        # Whether every text file is watched. Edits of other files and anything in
+        # hidden directories are never reported.
+        self.complete = False
+        self.watcher = PyQt6.QtCore.QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._on_directory_changed)
+        self.watcher.fileChanged.connect(self._on_file_changed)
+
+        # Directory -> file names seen in it, used to find added and removed files
+        self.listings: Dict[str, Set[str]] = {}
+        self.changed_paths: Set[str] = set()
+        self.changed_dirs: Set[str] = set()
+        self.files_added_or_removed = False
+
+        self.coalesce_timer = PyQt6.QtCore.QTimer(self)
+        self.coalesce_timer.setSingleShot(True)
+        self.coalesce_timer.setInterval(COALESCE_MS)
+        self.coalesce_timer.timeout.connect(self._flush)
+
+    def set_project(self, project_path: Optional[str]) -> None:
+        """
+        Watch another project, stops watching the previous one.
+
+        Args:
+            project_path: Path to the project directory, None to stop watching
+        """
+        self.stop()
+        if not project_path:
+            return
+
+        self.project_path = os.path.normpath(os.path.abspath(project_path))
+        directories: List[str] = []
+        files: List[str] = []
+        for dir_path, dir_names, file_names in os.walk(self.project_path):
+            dir_names[:] = [name for name in dir_names if not name.startswith(".")]
+            directories.append(dir_path)
+            self.listings[dir_path] = set(file_names)
+            files.extend(
+                os.path.join(dir_path, name)
+                for name in file_names
+                if name.lower().endswith(WATCHED_EXTENSIONS)
+            )
+
+        self.watcher.addPaths(directories)
+        self._set_complete(len(files) <= MAX_WATCHED_FILES)
+        if not self.complete:
+            logger.warning(f"Watching only {MAX_WATCHED_FILES} of {len(files)} files")
+        if files:
+            self.watcher.addPaths(files[:MAX_WATCHED_FILES])
+        logger.info(f"Watching {len(directories)} directories in {self.project_path}")
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self.coalesce_timer.stop()
+        for paths in (self.watcher.files(), self.watcher.directories()):
+            if paths:
+                self.watcher.removePaths(paths)
+        self.listings.clear()
+        self.changed_paths.clear()
+        self.changed_dirs.clear()
+        self.files_added_or_removed = False
+        self.project_path = None
+        self._set_complete(False)
+
+    def _set_complete(self, complete: bool) -> None:
+        """
+        Record whether every text file is watched and report changes.
+
+        Args:
+            complete: True if no text file is left unwatched
+        """
+        if complete != self.complete:
+            self.complete = complete
+            self.complete_changed.emit(complete)
+
+    def _on_file_changed(self, path: str) -> None:
+        """
+        Record a modified file.
+
+        Args:
+            path: Path of the file
+        """
+        self.changed_paths.add(path)
+        # Editors saving through a rename replace the file, the watch is lost
+        if os.path.exists(path) and path not in self.watcher.files():
+            self.watcher.addPath(path)
+        self.coalesce_timer.start()
+
+    def _on_directory_changed(self, path: str) -> None:
+        """
+        Record a directory whose entries changed, it is rescanned when flushing.
+
+        Args:
+            path: Path of the directory
+        """
+        self.changed_dirs.add(path)
+        self.coalesce_timer.start()
+
+    def _rescan_directory(self, dir_path: str) -> None:
+        """
+        Compare a directory with its last listing and watch new entries.
+
+        Args:
+            dir_path: Path of the directory
+        """
+        old_names = self.listings.get(dir_path, set())
+        try:
+            entries = list(os.scandir(dir_path))
+        except OSError:
+            # Directory was removed, report everything that was in it
+            self.changed_paths.update(os.path.join(dir_path, name) for name in old_names)
+            self.files_added_or_removed = self.files_added_or_removed or bool(old_names)
+            self.listings.pop(dir_path, None)
+            return
+
+        new_names = {entry.name for entry in entries if entry.is_file()}
+        added = new_names - old_names
+        removed = old_names - new_names
+        self.listings[dir_path] = new_names
+
+        if added or removed:
+            self.files_added_or_removed = True
+            self.changed_paths.update(os.path.join(dir_path, name) for name in added | removed)
+
+        new_files = [
+            os.path.join(dir_path, name)
+            for name in added
+            if name.lower().endswith(WATCHED_EXTENSIONS)
+        ]
+        if new_files:
+            if len(self.watcher.files()) + len(new_files) <= MAX_WATCHED_FILES:
+                self.watcher.addPaths(new_files)
+            else:
+                if self.complete:
+                    logger.warning(f"Watch limit of {MAX_WATCHED_FILES} files reached")
+                self._set_complete(False)
+
+        for entry in entries:
+            if (entry.is_dir() and not entry.name.startswith(".")
+                    and entry.path not in self.listings):
+                # New subdirectory, pick up its content as well
+                self.watcher.addPath(entry.path)
+                self.listings[entry.path] = set()
+                self._rescan_directory(entry.path)
+
+    def _flush(self) -> None:
+        """Report all changes collected during the coalescing window."""
+        for dir_path in self.changed_dirs:
+            self._rescan_directory(dir_path)
+        self.changed_dirs.clear()
+
+        if not self.changed_paths:
+            return
+
+        paths = sorted(self.changed_paths)
+        added_or_removed = self.files_added_or_removed
+        self.changed_paths.clear()
+        self.files_added_or_removed = False
+
+        logger.debug(f"{len(paths)} files changed on disk")
+        self.paths_changed.emit(paths, added_or_removed)
@@ -0,0 +1,196 @@
+# Copyright [2025] [ecki]
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+On-disk journal of git write operations that are not finished yet.
+
+Saved files are recorded before they are committed, push requests before
+they are pushed. A commit is recorded before it runs together with the push
+of its result, so a commit that completes just before a crash is still
+pushed at the next start. Every entry is synced to disk when it is appended, so after
+a crash or a forced thread shutdown the next start knows which files still
+need a commit and whether the remotes are behind.
+"""
+import json
+import logging
+import os
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+# Configuration
+JOURNAL_FILE_NAME = "thanote-journal.jsonl"  # Inside .git
+COMMIT_HEAD = "HEAD"  # Requested push of whatever HEAD a running commit leaves
+
+logger = logging.getLogger(__name__)
+
+
+class JournalState(NamedTuple):
+    """Operations still to do according to the journal."""
+    changes: Dict[str, str]  # File name -> action, not committed yet
+    unpushed_head: Optional[str]  # HEAD requested to be pushed or COMMIT_HEAD, None if pushed
+
+
+class GitJournal:
+    """
+    Append-only log of saves, commits and pushes, one JSON object per line.
+    """
+
+    def __init__(self, git_dir: str):
+        """
+        Initialize journal.
+
+        Args:
+            git_dir: Path to the git directory, holds the journal file
+        """
+        self.journal_path = os.path.join(git_dir, JOURNAL_FILE_NAME)
+
+    def _append(self, entry: Dict) -> None:
+        """
+        Append an entry and wait until it is on disk.
+
+        Args:
+            entry: Entry to write
+
+        Raises:
+            OSError: If the journal cannot be written
+        """
+        with open(self.journal_path, "a", encoding="utf-8") as journal_file:
+            journal_file.write(json.dumps(entry) + "\n")
+            journal_file.flush()
+            os.fsync(journal_file.fileno())
+
+    def record_change(self, file_name: str, action: str) -> None:
+        """
+        Record a saved file that still has to be committed.
+
+        Args:
+            file_name: Path relative to the project
+            action: "Add" or "Update", used in the commit message
+        """
+        self._append({"op": "change", "file": file_name, "action": action})
+
+    def record_commit_start(self, file_names: Iterable[str]) -> None:
+        """
+        Record a commit about to run, which requests a push of its result.
+
+        Until the commit is recorded as done, the next start pushes the current HEAD.
+
+        Args:
+            file_names: Files to be committed, empty for a reconcile of external changes
+        """
+        self._append({"op": "committing", "files": list(file_names)})
+
+    def record_commit(self, head: Optional[str], file_names: Iterable[str]) -> None:
+        """
+        Record that files were committed, or did not need a commit.
+
+        Args:
+            head: New HEAD, None if nothing was committed
+            file_names: Files no longer waiting for a commit
+        """
+        self._append({"op": "commit", "head": head, "files": list(file_names)})
+
+    def record_push(self, head: Optional[str]) -> None:
+        """
+        Record a push request.
+
+        Args:
+            head: HEAD at the time of the request
+        """
+        self._append({"op": "push", "head": head})
+
+    def record_pushed(self, head: Optional[str]) -> None:
+        """
+        Record a finished push.
+
+        Args:
+            head: HEAD that was pushed
+        """
+        self._append({"op": "pushed", "head": head})
+
+    def state(self) -> JournalState:
+        """
+        Replay the journal.
+
+        A last line cut off by a crash is ignored, it was never acknowledged.
+
+        Returns:
+            Pending changes and the HEAD still to be pushed
+        """
+        changes: Dict[str, str] = {}
+        requested: Optional[str] = None
+        pushed: Optional[str] = None
+        push_pending = False
+        # Push request before a running commit, restored if the commit made no new HEAD
+        before_commit: Optional[Tuple[Optional[str], bool]] = None
+
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as journal_file:
+                lines = journal_file.readlines()
+        except FileNotFoundError:
+            return JournalState({}, None)
+        except OSError as e:
+            logger.warning(f"Git journal unreadable, ignoring it: {e}")
+            return JournalState({}, None)
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                op = entry["op"]
+                if op == "change":
+                    # A file added and then updated is still an addition
+                    changes.setdefault(entry["file"], entry["action"])
+                elif op == "committing":
+                    if before_commit is None:
+                        before_commit = (requested, push_pending)
+                    requested = COMMIT_HEAD
+                    push_pending = True
+                elif op == "commit":
+                    for file_name in entry["files"]:
+                        changes.pop(file_name, None)
+                    if before_commit is not None:
+                        if entry["head"]:
+                            requested = entry["head"]
+                        else:
+                            requested, push_pending = before_commit
+                        before_commit = None
+                elif op == "push":
+                    if before_commit is not None:
+                        # Keep waiting for the commit, its HEAD is pushed as well
+                        before_commit = (entry["head"], True)
+                    else:
+                        requested = entry["head"]
+                        push_pending = True
+                elif op == "pushed":
+                    pushed = entry["head"]
+                    push_pending = push_pending and requested != pushed
+                    if before_commit is not None and before_commit[0] == pushed:
+                        before_commit = (pushed, False)
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping damaged git journal entry: {e}")
+
+        return JournalState(changes, requested if push_pending else None)
+
+    def compact(self) -> None:
+        """Rewrite the journal to the operations still pending, removing it if there are none."""
+        state = self.state()
+        try:
+            if not state.changes and state.unpushed_head is None:
+                if os.path.exists(self.journal_path):
+                    os.unlink(self.journal_path)
+                return
+
+            tmp_path = self.journal_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as journal_file:
+                for file_name, action in state.changes.items():
+                    journal_file.write(
+                        json.dumps({"op": "change", "file": file_name, "action": action}) + "\n"
+                    )
+                if state.unpushed_head is not None:
+                    journal_file.write(
+                        json.dumps({"op": "push", "head": state.unpushed_head}) + "\n"
+                    )
+                journal_file.flush()
+                os.fsync(journal_file.fileno())
+            os.replace(tmp_path, self.journal_path)
+        except OSError as e:
+            logger.warning(f"Could not compact git journal: {e}")
@@ -0,0 +1,400 @@
+# Copyright [2025] [ecki]
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Full-text search over the git history of a project.
+
+Historical contents are indexed per blob in an SQLite FTS5 table, so every
+version git stores only once is indexed only once. A table of changes records
+the old and new blob of every changed file per commit, which turns "in which
+commit was this text added or removed" into a single query.
+
+In partial clones only blobs already downloaded are indexed, changes to the
+others are recorded without their text.
+
+Merge commits are recorded without changes: git log --raw shows no diff for
+them, so text introduced by resolving a merge conflict is not found. Diffing
+merges against their first parent would attribute every change of the merged
+branch to the merge as well.
+"""
+import logging
+import os
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+import git
+import PyQt6.QtCore
+
+import notegit
+import notehelper
+
+# Configuration
+INDEX_FILE_NAME = "thanote-history.sqlite"  # Inside .git
+BATCH_COMMITS = 200  # Commits per transaction
+MIN_QUERY_LENGTH = 3  # Trigram tokenizer needs at least three characters
+TEXT_EXTENSIONS = (".adoc", ".asciidoc", ".txt", ".md")
+NULL_SHA = "0" * 40
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS blobs (id INTEGER PRIMARY KEY, sha TEXT UNIQUE NOT NULL);
+CREATE VIRTUAL TABLE IF NOT EXISTS blob_text USING fts5(content, tokenize='trigram');
+CREATE TABLE IF NOT EXISTS commits (
+    sha TEXT PRIMARY KEY, parent TEXT, time INTEGER, author TEXT, summary TEXT
+);
+CREATE TABLE IF NOT EXISTS changes (
+    commit_sha TEXT NOT NULL, path TEXT NOT NULL, old_blob TEXT, new_blob TEXT
+);
+CREATE INDEX IF NOT EXISTS changes_old ON changes(old_blob);
+CREATE INDEX IF NOT EXISTS changes_new ON changes(new_blob);
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def index_path(repo: git.Repo) -> str:
+    """
+    Get the path of the history index of a repository.
+
+    Args:
+        repo: Repository
+
+    Returns:
+        Path inside the git directory
+    """
+    return os.path.join(repo.git_dir, INDEX_FILE_NAME)
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """
+    Open the index database and create missing tables.
+
+    Args:
+        db_path: Path to the database file
+
+    Returns:
+        Connection
+    """
+    connection = sqlite3.connect(db_path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _fts_phrase(text: str) -> str:
+    """
+    Quote search text as an FTS5 phrase.
+
+    Args:
+        text: Search text
+
+    Returns:
+        Phrase matching the text literally
+    """
+    return '"' + text.replace('"', '""') + '"'
+
+
+class HistoryIndexer:
+    """
+    Adds commits not yet seen to the history index of a repository.
+    """
+
+    def __init__(self, project_path: str):
+        """
+        Initialize indexer.
+
+        Args:
+            project_path: Path to the git repository
+        """
+        self.project_path = project_path
+        self.stop_requested = False
+
+    def update(self, progress=None) -> int:
+        """
+        Index all commits reachable from HEAD that are not in the index yet.
+
+        Args:
+            progress: Optional callback receiving the number of commits indexed so far
+
+        Returns:
+            Number of newly indexed commits
+        """
+        repo = git.Repo(self.project_path)
+        connection = _connect(index_path(repo))
+        try:
+            if not repo.head.is_valid():
+                return 0
+            return self._index_new_commits(repo, connection, progress)
+        finally:
+            connection.close()
+            repo.close()
+
+    def _index_new_commits(
+            self,
+            repo: git.Repo,
+            connection: sqlite3.Connection,
+            progress
+    ) -> int:
+        """
+        Walk new commits oldest first and record their changes.
+
+        Args:
+            repo: Repository
+            connection: Index database
+            progress: Optional progress callback
+
+        Returns:
+            Number of newly indexed commits
+        """
+        head = repo.head.commit.hexsha
+        row = connection.execute("SELECT value FROM meta WHERE key = 'head'").fetchone()
+        if row and row[0] == head:
+            return 0
+
+        # Only commits not reachable from the last indexed HEAD, if it still exists
+        revisions = [head]
+        if row:
+            try:
+                repo.commit(row[0])
+                revisions.append(f"^{row[0]}")
+            except (ValueError, git.BadName):
+                logger.info("Indexed history was rewritten, checking all commits")
+
+        # Merges show no raw diff, see the module docstring
+        process = repo.git.log(
+            "--reverse", "--raw", "--no-abbrev", "--no-renames",
+            "--format=%x1e%H%x1f%P%x1f%at%x1f%an%x1f%s",
+            *revisions,
+            as_process=True
+        )
+
+        # Reading blobs missing in a partial clone would download them one by one
+        known_blobs: Dict[str, bool] = {}
+        if notegit.is_partial_clone(repo):
+            known_blobs.update(dict.fromkeys(self._missing_objects(repo, revisions), True))
+            logger.info(f"Partial clone, not indexing {len(known_blobs)} missing objects")
+
+        count = 0
+        commit: Optional[Tuple[str, str, int, str, str]] = None
+        changes: List[Tuple[str, str, str]] = []
+
+        def flush() -> None:
+            nonlocal count
+            if commit is None:
+                return
+            if connection.execute(
+                    "SELECT 1 FROM commits WHERE sha = ?", (commit[0],)).fetchone():
+                return
+            connection.execute("INSERT INTO commits VALUES (?, ?, ?, ?, ?)", commit)
+            for path, old_blob, new_blob in changes:
+                for blob in (old_blob, new_blob):
+                    self._index_blob(repo, connection, blob, known_blobs)
+                connection.execute(
+                    "INSERT INTO changes VALUES (?, ?, ?, ?)",
+                    (commit[0], path, old_blob, new_blob)
+                )
+            count += 1
+            if count % BATCH_COMMITS == 0:
+                connection.commit()
+                if progress:
+                    progress(count)
+
+        try:
+            for raw_line in process.stdout:
+                if self.stop_requested:
+                    logger.info("History indexing stopped")
+                    break
+
+                line = raw_line.decode("utf-8", errors="replace").rstrip("\n")
+                if line.startswith("\x1e"):
+                    flush()
+                    sha, parents, timestamp, author, summary = line[1:].split("\x1f", 4)
+                    parent = parents.split(" ")[0] if parents else ""
+                    commit = (sha, parent, int(timestamp), author, summary)
+                    changes = []
+                elif line.startswith(":"):
+                    meta, _, path = line.partition("\t")
+                    fields = meta.split(" ")
+                    if fields[1] == "160000" or not path.lower().endswith(TEXT_EXTENSIONS):
+                        continue
+                    old_blob = None if fields[2] == NULL_SHA else fields[2]
+                    new_blob = None if fields[3] == NULL_SHA else fields[3]
+                    changes.append((path, old_blob, new_blob))
+            else:
+                flush()
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('head', ?)", (head,)
+                )
+        finally:
+            connection.commit()
+            process.stdout.close()
+            try:
+                process.wait()
+            except git.exc.GitCommandError:
+                # git log fails with a broken pipe if indexing was stopped early
+                if not self.stop_requested:
+                    raise
+
+        logger.info(f"Indexed {count} commits of {self.project_path}")
+        return count
+
+    @staticmethod
+    def _missing_objects(repo: git.Repo, revisions: List[str]) -> List[str]:
+        """
+        List objects of a partial clone that are not downloaded, without fetching them.
+
+        Args:
+            repo: Repository
+            revisions: Revisions to walk
+
+        Returns:
+            SHAs of missing objects
+        """
+        output = repo.git.rev_list("--objects", "--missing=print", *revisions)
+        return [line[1:] for line in output.splitlines() if line.startswith("?")]
+
+    @staticmethod
+    def _index_blob(
+            repo: git.Repo,
+            connection: sqlite3.Connection,
+            blob_sha: Optional[str],
+            known_blobs: Dict[str, bool]
+    ) -> None:
+        """
+        Add the content of a blob to the full-text index unless it is indexed already.
+
+        Args:
+            repo: Repository to read the blob from
+            connection: Index database
+            blob_sha: SHA of the blob, None for a missing side of a change
+            known_blobs: Blobs checked during this run
+        """
+        if not blob_sha or blob_sha in known_blobs:
+            return
+        known_blobs[blob_sha] = True
+
+        if connection.execute("SELECT 1 FROM blobs WHERE sha = ?", (blob_sha,)).fetchone():
+            return
+
+        binary_sha = bytes.fromhex(blob_sha)
+        try:
+            if repo.odb.info(binary_sha).size > notehelper.MAX_FILE_KB * 1024:
+                return
+            content = repo.odb.stream(binary_sha).read().decode("utf-8", errors="replace")
+        except (ValueError, OSError, git.exc.GitCommandError) as e:
+            logger.debug(f"Blob {blob_sha} not readable: {e}")
+            return
+
+        cursor = connection.execute("INSERT INTO blobs (sha) VALUES (?)", (blob_sha,))
+        connection.execute(
+            "INSERT INTO blob_text (rowid, content) VALUES (?, ?)", (cursor.lastrowid, content)
+        )
+
+
+def search_history(repo: git.Repo, search_text: str, max_results: int = 50) -> List[Tuple]:
+    """
+    Find the commits that added or removed a text.
+
+    Args:
+        repo: Repository
+        search_text: Text to search for, at least three characters
+        max_results: Maximum number of results
+
+    Returns:
+        List of (commit SHA, parent SHA, time, author, summary, path, "added" or "removed"),
+        newest first
+    """
+    if len(search_text) < MIN_QUERY_LENGTH:
+        return []
+
+    connection = _connect(index_path(repo))
+    try:
+        connection.execute("CREATE TEMP TABLE hits (sha TEXT PRIMARY KEY)")
+        connection.execute(
+            "INSERT INTO hits SELECT blobs.sha FROM blob_text "
+            "JOIN blobs ON blobs.id = blob_text.rowid WHERE blob_text MATCH ?",
+            (_fts_phrase(search_text),)
+        )
+        return connection.execute(
+            """
+            SELECT commits.sha, commits.parent, commits.time, commits.author,
+                   commits.summary, changes.path,
+                   CASE WHEN changes.old_blob IN hits THEN 'removed' ELSE 'added' END
+            FROM changes JOIN commits ON commits.sha = changes.commit_sha
+            WHERE IFNULL(changes.old_blob IN hits, 0) != IFNULL(changes.new_blob IN hits, 0)
+            ORDER BY commits.time DESC
+            LIMIT ?
+            """,
+            (max_results,)
+        ).fetchall()
+    finally:
+        connection.close()
+
+
+def format_history_results(search_text: str, results: List[Tuple], indexing: bool) -> str:
+    """
+    Format history search results as AsciiDoc.
+
+    Args:
+        search_text: Original search query
+        results: Results of search_history
+        indexing: Whether the index is still being built
+
+    Returns:
+        AsciiDoc formatted results
+    """
+    result_text = f"== History results for \"{search_text}\"\n\n"
+    if indexing:
+        result_text += "_The history is still being indexed, results may be incomplete._\n\n"
+
+    if len(search_text) < MIN_QUERY_LENGTH:
+        return result_text + f"_Enter at least {MIN_QUERY_LENGTH} characters._\n"
+    if not results:
+        return result_text + "_No results found._\n"
+
+    for sha, parent, timestamp, author, summary, path, kind in results:
+        # Link to the version that still contains the text
+        revision = parent if kind == "removed" and parent else sha
+        date = PyQt6.QtCore.QDateTime.fromSecsSinceEpoch(timestamp).toString("yyyy-MM-dd HH:mm")
+        result_text += (
+            f"* link:{path}?rev={revision}[{path}] {kind} in `{sha[:7]}` "
+            f"({date}, {author}): {summary}\n"
+        )
+    return result_text
+
+
+class HistoryIndexWorker(PyQt6.QtCore.QObject):
+    """
+    Worker that updates history indexes in a separate thread.
+    """
+    progress = PyQt6.QtCore.pyqtSignal(str, int)
+    index_updated = PyQt6.QtCore.pyqtSignal(str, int)
+    index_failed = PyQt6.QtCore.pyqtSignal(str, str)
+
+    def __init__(self):
+        super().__init__()
+        self.indexer: Optional[HistoryIndexer] = None
+
+    @PyQt6.QtCore.pyqtSlot(str)
+    def update(self, project_path: str) -> None:
+        """
+        Index new commits of a project.
+
+        Args:
+            project_path: Path to the git repository
+        """
+        self.indexer = HistoryIndexer(project_path)
+        try:
+            count = self.indexer.update(lambda done: self.progress.emit(project_path, done))
+            self.index_updated.emit(project_path, count)
+        except Exception as e:
+            logger.error(f"History indexing failed: {e}")
+            self.index_failed.emit(project_path, str(e))
+        finally:
+            self.indexer = None
+
+    def stop(self) -> None:
+        """Ask a running update to stop, may be called from another thread."""
+        indexer = self.indexer
+        if indexer:
+            indexer.stop_requested = True
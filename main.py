@@ -1,883 +1,1832 @@
-# Copyright [2025] [ecki]
-# SPDX-License-Identifier: Apache-2.0
-
-"""
-Main application file for Notebook application.
-Handles project management, file viewing, and Git integration.
-"""
-import datetime
-import json
-import logging
-import os
-import pathlib
-import sys
-import time
-from typing import Optional, Dict
-
-import PyQt6
-import PyQt6.QtCore
-import PyQt6.QtGui
-import PyQt6.QtWidgets
-import PyQt6.QtWebEngineCore
-import PyQt6.QtWebEngineWidgets
-
-import editpage
-import notegit
-import notehelper
-import commitbrowser
-
-logger = logging.getLogger(__name__)
-
-
-class NotebookPage(PyQt6.QtWebEngineCore.QWebEnginePage):
-    """
-    Custom WebEnginePage to customize link navigation handling.
-
-    Signals:
-        nav_link_clicked_internal_signal: Emitted for internal file links
-        nav_link_clicked_external_signal: Emitted for external URLs
-    """
-    nav_link_clicked_internal_signal = PyQt6.QtCore.pyqtSignal(PyQt6.QtCore.QUrl)
-    nav_link_clicked_external_signal = PyQt6.QtCore.pyqtSignal(PyQt6.QtCore.QUrl)
-
-    def acceptNavigationRequest(
-            self,
-            url: PyQt6.QtCore.QUrl,
-            _type: PyQt6.QtWebEngineCore.QWebEnginePage.NavigationType,
-            isMainFrame: bool
-    ) -> bool:
-        """
-        Handle navigation requests and emit appropriate signals.
-
-        Args:
-            url: Target URL
-            _type: Type of navigation
-            isMainFrame: Whether this is the main frame
-
-        Returns:
-            True to allow navigation, False to block it
-        """
-        if _type == PyQt6.QtWebEngineCore.QWebEnginePage.NavigationType.NavigationTypeLinkClicked:
-            logger.debug(f"URL clicked: {url.toString()}")
-
-            if not url.isValid() or url.isEmpty():
-                logger.warning("Invalid URL")
-                return False
-
-            if url.isLocalFile():
-                logger.debug("Emitting signal to handle local file")
-                self.nav_link_clicked_internal_signal.emit(url)
-                return False
-
-            logger.debug("Emitting signal for external URL")
-            self.nav_link_clicked_external_signal.emit(url)
-            return False
-
-        return super().acceptNavigationRequest(url, _type, isMainFrame)
-
-
-class Notebook(PyQt6.QtWidgets.QMainWindow):
-    """
-    Main notebook application window.
-    Manages projects, files, and provides AsciiDoc viewing and editing.
-    """
-
-    def __init__(self):
-        super().__init__()
-
-        # Initialize variables
-        self.config_filename: Optional[pathlib.Path] = None
-        self.data: Dict = {}
-        self.current_file_name: Optional[str] = None
-        self.commit_browser: Optional[commitbrowser.CommitBrowserDialog] = None
-        self.repo: Optional[notegit.NoteGit] = None
-
-        # Initialize UI elements
-        self.project_drop_down = PyQt6.QtWidgets.QComboBox()
-        self.search_box = PyQt6.QtWidgets.QComboBox()
-        self.setWindowTitle('Notebook')
-
-        # Read configuration
-        self.read_config()
-
-        # Initialize web view
-        self.web_engine_view = PyQt6.QtWebEngineWidgets.QWebEngineView()
-        self.web_page = NotebookPage(self)
-        self.web_page.nav_link_clicked_internal_signal.connect(self.on_internal_url)
-        self.web_page.nav_link_clicked_external_signal.connect(self.on_external_url)
-        self.web_engine_view.setPage(self.web_page)
-
-        # Initialize UI
-        self.init_ui()
-
-        # Initialize repository
-        self._initialize_repository()
-
-        # Initialize edit window
-        self.edit_page_window = editpage.EditPage()
-        self._connect_edit_window_signals()
-
-        # Load start page
-        project_name = self.data.get("last_project", self.project_drop_down.currentText())
-        last_file = self.data.get("projects", {}).get(project_name, {}).get("last_ascii_file", "")
-        self.load_page(last_file)
-
-    def _initialize_repository(self) -> None:
-        """Initialize Git repository for current project."""
-        # Ensure projects exist
-        while not self.data.get("projects", {}):
-            result = PyQt6.QtWidgets.QMessageBox.question(
-                self,
-                "Kein Projekt",
-                "Kein Projekt gefunden. Möchten Sie ein neues Projekt erstellen?",
-                PyQt6.QtWidgets.QMessageBox.StandardButton.Yes |
-                PyQt6.QtWidgets.QMessageBox.StandardButton.No
-            )
-            if result == PyQt6.QtWidgets.QMessageBox.StandardButton.Yes:
-                self.create_new_project()
-            else:
-                logger.error("No projects available, exiting")
-                sys.exit(1)
-
-        # Set last project
-        if not self.data.get("last_project"):
-            first_project = list(self.data.get("projects").keys())[0]
-            self.data.update({"last_project": first_project})
-
-        project_name = self.data.get("last_project", self.project_drop_down.currentText())
-        project_path = self.data.get("projects", {}).get(project_name, {}).get("path", "")
-
-        if not project_path:
-            logger.error(f"No path found for project {project_name}")
-            PyQt6.QtWidgets.QMessageBox.critical(
-                self,
-                "Fehler",
-                f"Kein Pfad für Projekt {project_name} gefunden"
-            )
-            return
-
-        try:
-            self.repo = notegit.NoteGit(project_path)
-        except Exception as e:
-            logger.error(f"Failed to initialize repository: {e}")
-            PyQt6.QtWidgets.QMessageBox.critical(
-                self,
-                "Fehler",
-                f"Projekt {project_name} konnte nicht geladen werden:\n{e}\n\n"
-                "Das Projekt wird aus der Konfiguration entfernt."
-            )
-            self.data.get("projects", {}).pop(project_name, None)
-            self.write_config()
-            # Try to initialize another project
-            self._initialize_repository()
-
-    def _connect_edit_window_signals(self) -> None:
-        """Connect edit window signals to main window handlers."""
-        self.edit_page_window.ascii_file_changed.connect(self.load_page)
-        self.edit_page_window.ascii_file_changed.connect(self.on_file_edited)
-        self.edit_page_window.project_new_file.connect(self.on_upload_file)
-        self.edit_page_window.geometry_update.connect(self.edit_page_window_geometry)
-        self.edit_page_window.project_data_changed.connect(self.project_data_update)
-        self.edit_page_window.show_commits_requested.connect(self.on_show_commits)
-
-    def on_external_url(self, url: PyQt6.QtCore.QUrl) -> None:
-        """
-        Handle external URL click with user confirmation.
-
-        Args:
-            url: External URL to open
-        """
-        reply = PyQt6.QtWidgets.QMessageBox.question(
-            self,
-            "Proceed",
-            f"Are you sure you want to open the URL '{url.toString()}' in an external browser?",
-            PyQt6.QtWidgets.QMessageBox.StandardButton.Yes |
-            PyQt6.QtWidgets.QMessageBox.StandardButton.No,
-            PyQt6.QtWidgets.QMessageBox.StandardButton.No
-        )
-
-        if reply == PyQt6.QtWidgets.QMessageBox.StandardButton.Yes:
-            logger.debug(f"Opening link {url.toString()} in external browser")
-            PyQt6.QtGui.QDesktopServices.openUrl(url)
-
-    def open_editor_window(
-            self,
-            project_data: Dict,
-            project_name: str,
-            file_name: str
-    ) -> None:
-        """
-        Load data into editor window and show it.
-
-        Args:
-            project_data: Project configuration
-            project_name: Name of the project
-            file_name: Relative path to file
-        """
-        try:
-            if not self.repo:
-                raise ValueError("No repository initialized")
-
-            file_list = self.repo.list_all_files()
-
-            self.edit_page_window.load_document(
-                project_data=project_data,
-                project_name=project_name,
-                file_name=file_name,
-                file_list=file_list
-            )
-
-            geometry = self.data.get("edit_window_geometry", [300, 300, 600, 600])
-            self.edit_page_window.set_geometry(geometry)
-            self.edit_page_window.show()
-
-        except Exception as e:
-            logger.error(f"Failed to load document into editor: {e}")
-            PyQt6.QtWidgets.QMessageBox.warning(
-                self,
-                "Fehler",
-                f"Konnte Editor nicht laden:\n{e}"
-            )
-
-    def read_config(self) -> None:
-        """Read configuration from JSON file."""
-        home_dir = pathlib.Path.home()
-
-        if os.name in ["nt", "windows"]:
-            config_dir = home_dir / "AppData" / "Local" / "ThaNote"
-        else:
-            config_dir = home_dir / ".config" / "ThaNote"
-
-        # Create config directory if it doesn't exist
-        config_dir.mkdir(parents=True, exist_ok=True)
-
-        self.config_filename = config_dir / "config.json"
-        logger.debug(f"Reading config from {self.config_filename}")
-
-        try:
-            if self.config_filename.exists():
-                data = json.loads(self.config_filename.read_text(encoding="utf-8"))
-            else:
-                logger.info("Config file doesn't exist, creating new one")
-                data = {}
-        except json.JSONDecodeError as e:
-            logger.error(f"Config file corrupted: {e}")
-            data = {}
-        except Exception as e:
-            logger.warning(f"Error reading config: {e}")
-            data = {}
-
-        self.data = data
-
-    def write_config(self) -> None:
-        """Write configuration to JSON file."""
-        logger.info("Writing config")
-
-        if not self.config_filename:
-            logger.error("No config filename set")
-            return
-
-        try:
-            with open(self.config_filename, "w", encoding="utf-8") as config_file:
-                json.dump(self.data, config_file, indent=4)
-            logger.debug("Config written successfully")
-        except Exception as e:
-            logger.error(f"Error writing config: {e}")
-
-    def create_new_project(self) -> None:
-        """Create or add a new project."""
-        logger.debug("Creating new project")
-
-        project_path_str = PyQt6.QtWidgets.QFileDialog.getExistingDirectory(
-            self, "Select Directory"
-        )
-
-        if not project_path_str:
-            logger.warning("No directory selected")
-            return
-
-        project_path = pathlib.Path(project_path_str)
-        project_name = project_path.name
-
-        # Check if project already exists
-        if self.data.get("projects", {}).get(project_name, False):
-            PyQt6.QtWidgets.QMessageBox.information(
-                self,
-                "Add Project",
-                "Das Projekt ist bereits in der Liste"
-            )
-            logger.error("Project already in list")
-            return
-
-        index_file = self.data.get("index_file", "index.asciidoc")
-        self.data.update({"index_file": index_file})
-
-        filepath = project_path / index_file
-
-        # Create index file if it doesn't exist
-        if not filepath.exists():
-            text_str = (
-                f"== New project {project_name}\n\n"
-                "AsciiDoc format\n\n"
-                "link:https://docs.asciidoctor.org/asciidoc/latest/"
-                "syntax-quick-reference/[Link to Quick Reference Guide]\n"
-            )
-
-            try:
-                filepath.write_text(text_str, encoding="utf-8")
-                logger.info(f"New index file created: {filepath}")
-            except IOError as e:
-                logger.error(f"Could not write index file {filepath}: {e}")
-                PyQt6.QtWidgets.QMessageBox.critical(
-                    self,
-                    "Fehler",
-                    f"Konnte Index-Datei nicht erstellen:\n{e}"
-                )
-                return
-        else:
-            logger.info(f"Index file {filepath} already exists")
-
-        # Add project to config
-        projects = self.data.get("projects", {})
-        projects.update({
-            project_name: {
-                "path": project_path_str,
-                "create_date": time.time(),
-                "last_ascii_file": index_file
-            }
-        })
-        self.data.update({"projects": projects})
-        self.data.update({"last_project": project_name})
-
-        # Update UI
-        self.project_drop_down.addItem(project_name)
-
-        # Initialize repository
-        try:
-            self.repo = notegit.NoteGit(project_path_str)
-            self.repo.add_file(index_file)
-        except Exception as e:
-            logger.error(f"Failed to initialize git: {e}")
-            PyQt6.QtWidgets.QMessageBox.warning(
-                self,
-                "Warnung",
-                f"Git-Repository konnte nicht initialisiert werden:\n{e}"
-            )
-
-        self.load_page()
-
-    def on_project_change(self) -> None:
-        """Handle project dropdown change."""
-        new_project_name = self.project_drop_down.currentText()
-        logger.info(f"Project changed to {new_project_name}")
-
-        self.data.update({"last_project": new_project_name})
-
-        project_path = self.data.get("projects", {}).get(new_project_name, {}).get("path")
-        if not project_path:
-            logger.error(f"No path found for project {new_project_name}")
-            return
-
-        # Cleanup old repository
-        if self.repo:
-            self.repo.cleanup()
-
-        # Initialize new repository
-        try:
-            self.repo = notegit.NoteGit(project_path)
-        except Exception as e:
-            logger.error(f"Failed to load project: {e}")
-            PyQt6.QtWidgets.QMessageBox.critical(
-                self,
-                "Fehler",
-                f"Projekt konnte nicht geladen werden:\n{e}"
-            )
-            return
-
-        self.load_page()
-
-    def init_ui(self) -> None:
-        """Initialize the user interface."""
-        vbox = PyQt6.QtWidgets.QVBoxLayout()
-        hbox = PyQt6.QtWidgets.QHBoxLayout()
-        hbox2 = PyQt6.QtWidgets.QHBoxLayout()
-
-        # Project dropdown
-        self.project_drop_down.setMinimumWidth(130)
-        hbox.addWidget(self.project_drop_down)
-
-        project_highlight = self.data.get("last_project", "")
-        for project_name in list(self.data.get("projects", {}).keys()):
-            if not project_highlight:
-                project_highlight = project_name
-            self.project_drop_down.addItem(project_name)
-
-        if project_highlight:
-            self.project_drop_down.setCurrentText(project_highlight)
-
-        # Disconnect any existing connections before connecting
-        try:
-            self.project_drop_down.currentTextChanged.disconnect()
-        except TypeError:
-            pass
-        self.project_drop_down.currentTextChanged.connect(self.on_project_change)
-
-        # Search box
-        self.search_box.setEditable(True)
-        self.search_box.setInsertPolicy(PyQt6.QtWidgets.QComboBox.InsertPolicy.NoInsert)
-        hbox.addWidget(self.search_box)
-        self.search_box.currentTextChanged.connect(self.on_search_local)
-
-        # Search button
-        search_button = PyQt6.QtWidgets.QPushButton("🔎")
-        hbox.addWidget(search_button)
-        search_button.clicked.connect(self.on_click_search)
-
-        # Commits button
-        open_git_button = PyQt6.QtWidgets.QPushButton("Commits")
-        hbox.addWidget(open_git_button)
-        open_git_button.clicked.connect(self.on_show_commits)
-
-        # Add/New project button
-        add_project_button = PyQt6.QtWidgets.QPushButton('Add/ New Project', self)
-        hbox2.addWidget(add_project_button)
-        add_project_button.clicked.connect(self.create_new_project)
-
-        # Export button
-        export_button = PyQt6.QtWidgets.QPushButton("Export", self)
-        hbox2.addWidget(export_button)
-        export_button.clicked.connect(self.on_export_pdf)
-
-        # Edit button
-        edit_page_button = PyQt6.QtWidgets.QPushButton("Edit Page", self)
-        hbox2.addWidget(edit_page_button)
-        edit_page_button.clicked.connect(self.on_click_edit_page)
-
-        # Back button
-        page_back_btn = PyQt6.QtWidgets.QPushButton("Back", self)
-        hbox2.addWidget(page_back_btn)
-        page_back_btn.clicked.connect(self.on_back_btn)
-
-        # Layout assembly
-        vbox.addLayout(hbox)
-        vbox.addLayout(hbox2)
-        vbox.addWidget(self.web_engine_view)
-
-        main_widget = PyQt6.QtWidgets.QWidget()
-        main_widget.setLayout(vbox)
-        self.setCentralWidget(main_widget)
-
-        # Set window geometry
-        geometry = self.data.get("geometry", [300, 250, 900, 600])
-        self.setGeometry(geometry[0], geometry[1], geometry[2], geometry[3])
-
-        logger.info("Main window widgets created")
-
-    def on_show_commits(self) -> None:
-        """Show git commit browser dialog."""
-        logger.info("Showing commit browser")
-
-        # Prevent multiple windows
-        if self.commit_browser is not None and self.commit_browser.isVisible():
-            self.commit_browser.activateWindow()
-            return
-
-        if not self.repo:
-            PyQt6.QtWidgets.QMessageBox.warning(
-                self, "Fehler", "Kein Repository geladen"
-            )
-            return
-
-        try:
-            log_text = self.repo.get_commit_log()
-        except Exception as e:
-            logger.error(f"Could not get git log: {e}")
-            PyQt6.QtWidgets.QMessageBox.warning(
-                self,
-                "Fehler",
-                f"Git-Log konnte nicht abgerufen werden:\n{e}"
-            )
-            return
-
-        # Create and show dialog (non-modal with .show())
-        self.commit_browser = commitbrowser.CommitBrowserDialog(log_text, self)
-        self.commit_browser.show()
-
-    def on_search_local(self) -> None:
-        """Search in current page."""
-        search_text = self.search_box.currentText()
-        self.web_page.findText(search_text)
-
-    def on_click_search(self) -> None:
-        """Perform semantic search across all files."""
-        search_text = self.search_box.currentText().lower()
-        logger.info(f"Search clicked for text: {search_text}")
-
-        if not search_text:
-            return
-
-        project_name = self.project_drop_down.currentText()
-        project_path = self.data.get("projects", {}).get(project_name, {}).get("path", "")
-
-        if not project_path:
-            logger.warning("No project path found")
-            return
-
-        if not self.repo:
-            logger.warning("No repository initialized")
-            return
-
-        base_url = PyQt6.QtCore.QUrl.fromLocalFile(project_path + os.path.sep)
-
-        # Add to search history
-        if self.search_box.findText(search_text) < 0:
-            self.search_box.addItem(search_text)
-
-        # Perform search
-        try:
-            file_list = self.repo.list_all_files()
-            search_result = notehelper.search_files(search_text, file_list, project_path)
-            html_text = notehelper.text_2_html(search_result)
-            self.web_page.setHtml(html_text, base_url)
-        except Exception as e:
-            logger.error(f"Search error: {e}")
-            PyQt6.QtWidgets.QMessageBox.warning(
-                self, "Fehler", f"Suchfehler:\n{e}"
-            )
-
-    def load_page(self, file_name: Optional[str] = None) -> None:
-        """
-        Load and display a page.
-
-        Args:
-            file_name: Relative path to file, or None for index file
-        """
-        if not file_name:
-            file_name = self.data.get("index_file", "index.asciidoc")
-
-        project_name = self.project_drop_down.currentText()
-        logger.info(f"Loading page {file_name} from project {project_name}")
-
-        project = self.data.get("projects", {}).get(project_name)
-        if not project:
-            logger.error(f"Project {project_name} not found")
-            return
-
-        project_path = project.get("path")
-        if not project_path:
-            logger.error(f"No path for project {project_name}")
-            return
-
-        base_url = PyQt6.QtCore.QUrl.fromLocalFile(project_path + os.path.sep)
-        full_file_path = os.path.join(project_path, file_name)
-        full_file_path = os.path.normpath(full_file_path)
-
-        # Security check: ensure file is within project
-        try:
-            full_file_path_resolved = pathlib.Path(full_file_path).resolve()
-            project_path_resolved = pathlib.Path(project_path).resolve()
-            full_file_path_resolved.relative_to(project_path_resolved)
-        except ValueError:
-            logger.error(f"Security: File {full_file_path} outside project path")
-            PyQt6.QtWidgets.QMessageBox.warning(
-                self,
-                "Sicherheitsfehler",
-                "Die Datei liegt außerhalb des Projektverzeichnisses"
-            )
-            return
-
-        file_extension = file_name.split(".")[-1].lower()
-
-        # Handle different file types
-        if file_extension in ["htm", "html", "txt", "jpg", "png", "jpeg"]:
-            logger.info(f"Opening file in webview: {full_file_path}")
-            self.web_page.load(
-                PyQt6.QtCore.QUrl(pathlib.Path(full_file_path).absolute().as_uri())
-            )
-            return
-
-        if file_extension in ["pdf", "ppt", "doc", "docx"]:
-            logger.info(f"Opening file externally: {full_file_path}")
-            self.on_external_url(
-                PyQt6.QtCore.QUrl(pathlib.Path(full_file_path).absolute().as_uri())
-            )
-            return
-
-        # Handle AsciiDoc files
-        if file_extension in ["adoc", "asciidoc"]:
-            logger.info(f"Loading asciidoc page {full_file_path}")
-            self.current_file_name = file_name
-
-            try:
-                with open(full_file_path, "r", encoding="utf-8") as ascii_file:
-                    text_in = ascii_file.read()
-            except FileNotFoundError:
-                logger.warning(f"File {full_file_path} not found, creating new")
-                text_in = "== Empty page\n"
-
-                os.makedirs(os.path.dirname(full_file_path), exist_ok=True)
-
-                try:
-                    with open(full_file_path, "w", encoding="utf-8") as ascii_file:
-                        ascii_file.write(text_in)
-                    if self.repo:
-                        self.repo.add_file(file_name)
-                except IOError as e:
-                    logger.error(f"Problem writing new file {full_file_path}: {e}")
-                    PyQt6.QtWidgets.QMessageBox.critical(
-                        self, "Fehler", f"Datei konnte nicht erstellt werden:\n{e}"
-                    )
-                    return
-            except Exception as e:
-                logger.error(f"Error reading file {full_file_path}: {e}")
-                PyQt6.QtWidgets.QMessageBox.critical(
-                    self, "Fehler", f"Datei konnte nicht gelesen werden:\n{e}"
-                )
-                return
-
-            try:
-                html_text = notehelper.text_2_html(text_in)
-                self.web_page.setHtml(html_text, base_url)
-            except Exception as e:
-                logger.error(f"Error converting to HTML: {e}")
-                error_html = f"<h1>Conversion Error</h1><pre>{e}</pre>"
-                self.web_page.setHtml(error_html, base_url)
-
-    def on_file_edited(self, file_name: str) -> None:
-        """
-        Handle file edit event.
-
-        Args:
-            file_name: Relative path to edited file
-        """
-        logger.info(f"Git update {file_name}")
-        if self.repo:
-            self.repo.update_file(file_name)
-
-    def on_upload_file(self, file_name: str) -> None:
-        """
-        Handle file upload event.
-
-        Args:
-            file_name: Relative path to uploaded file
-        """
-        logger.info(f"Adding uploaded file {file_name} to git")
-        if self.repo:
-            self.repo.add_file(file_name)
-
-    def on_click_edit_page(self) -> None:
-        """Open editor for current page."""
-        logger.info("Edit clicked")
-
-        project_name = self.project_drop_down.currentText()
-        project = self.data.get("projects", {}).get(project_name)
-
-        if not project:
-            logger.error(f"Project '{project_name}' not found")
-            return
-
-        if not self.current_file_name:
-            logger.warning("No file currently loaded to edit")
-            PyQt6.QtWidgets.QMessageBox.warning(
-                self, "Fehler", "Keine Datei zum Bearbeiten geladen"
-            )
-            return
-
-        file_name = self.current_file_name
-        file_extension = file_name.split(".")[-1].lower()
-
-        if file_extension in ["adoc", "asciidoc"]:
-            logger.info(f"Editing page {file_name}")
-            self.open_editor_window(project, project_name, file_name)
-        else:
-            logger.warning(f"Cannot edit file type: {file_extension}")
-            PyQt6.QtWidgets.QMessageBox.information(
-                self,
-                "Hinweis",
-                f"Dateityp '{file_extension}' kann nicht bearbeitet werden"
-            )
-
-    def edit_page_window_geometry(self, geometry: tuple) -> None:
-        """
-        Save editor window geometry.
-
-        Args:
-            geometry: Tuple of (x, y, width, height)
-        """
-        self.data.update({"edit_window_geometry": geometry})
-
-    def project_data_update(self, project_data: Dict) -> None:
-        """
-        Update project data.
-
-        Args:
-            project_data: Updated project data
-        """
-        project_name = self.project_drop_down.currentText()
-        logger.info(f"Updating project data for {project_name}")
-        self.data.get("projects", {}).update({project_name: project_data})
-
-    def on_internal_url(self, url: PyQt6.QtCore.QUrl) -> None:
-        """
-        Handle internal file URL click.
-
-        Args:
-            url: Internal URL to open
-        """
-        logger.info(f"Opening internal URL: {url.toString()}")
-
-        try:
-            project_name = self.project_drop_down.currentText()
-            project_path_str = self.data.get("projects", {}).get(
-                project_name, {}
-            ).get("path", "")
-
-            if not project_path_str:
-                logger.error("No project path configured")
-                return
-
-            project_path = pathlib.Path(project_path_str).resolve()
-            url_path = pathlib.Path(url.toLocalFile()).resolve()
-
-            # Security check
-            try:
-                relative_path = url_path.relative_to(project_path)
-            except ValueError:
-                logger.error(f"Security: Path {url_path} outside project {project_path}")
-                PyQt6.QtWidgets.QMessageBox.warning(
-                    self,
-                    "Sicherheitsfehler",
-                    "Die Datei liegt außerhalb des Projektverzeichnisses"
-                )
-                return
-
-            if not url_path.is_file():
-                logger.warning(f"File does not exist: {url_path}")
-                PyQt6.QtWidgets.QMessageBox.warning(
-                    self, "Fehler", f"Datei nicht gefunden:\n{url_path}"
-                )
-                return
-
-            file_name = str(relative_path)
-            logger.info(f"Loading relative page: {file_name}")
-            self.load_page(file_name)
-
-        except Exception as e:
-            logger.error(f"Error in on_internal_url: {e}")
-            PyQt6.QtWidgets.QMessageBox.critical(
-                self, "Fehler", f"Fehler beim Öffnen der Datei:\n{e}"
-            )
-
-    def on_back_btn(self) -> None:
-        """Navigate back in browser history."""
-        logger.info("Back button clicked")
-        self.web_page.triggerAction(
-            PyQt6.QtWebEngineCore.QWebEnginePage.WebAction.Back
-        )
-
-    def on_export_pdf(self) -> None:
-        """Export current page to PDF."""
-        logger.info("Export clicked")
-
-        try:
-            export_dir = pathlib.Path.home() / "Downloads"
-            if not export_dir.exists():
-                export_dir = pathlib.Path.home()
-        except Exception:
-            export_dir = pathlib.Path.home()
-
-        export_dir_str = self.data.get("export_dir", str(export_dir))
-        export_dir = pathlib.Path(export_dir_str)
-
-        current_page_name = pathlib.Path(self.web_page.url().fileName())
-        date_str = datetime.datetime.now().strftime("%Y-%m-%d")
-
-        file_name = f"{date_str}_{current_page_name.stem}.pdf"
-        default_pdf_path = export_dir / file_name
-
-        pdf_file_dialog = PyQt6.QtWidgets.QFileDialog.getSaveFileName(
-            self, "Save PDF file", str(default_pdf_path), "PDF (*.pdf)"
-        )
-
-        if pdf_file_dialog and pdf_file_dialog[0]:
-            pdf_file_path_str = pdf_file_dialog[0]
-            export_parent_dir = str(pathlib.Path(pdf_file_path_str).parent)
-            self.data.update({"export_dir": export_parent_dir})
-
-            try:
-                self.web_engine_view.page().printToPdf(pdf_file_path_str)
-                logger.info(f"Page exported to {pdf_file_path_str}")
-            except Exception as e:
-                logger.error(f"PDF export failed: {e}")
-                PyQt6.QtWidgets.QMessageBox.critical(
-                    self, "Fehler", f"PDF-Export fehlgeschlagen:\n{e}"
-                )
-        else:
-            logger.warning("PDF export cancelled")
-
-    @PyQt6.QtCore.pyqtSlot(PyQt6.QtGui.QCloseEvent)
-    def closeEvent(self, event: PyQt6.QtGui.QCloseEvent) -> None:
-        """
-        Handle application close event.
-
-        Args:
-            event: Close event
-        """
-        logger.info("Closing the notebook window")
-
-        # Save geometry
-        geometry = self.geometry().getRect()
-        self.data.update({"geometry": geometry})
-
-        # Write config
-        self.write_config()
-
-        # Cleanup repository
-        if self.repo:
-            self.repo.cleanup()
-
-        # Cleanup web view
-        if self.web_engine_view:
-            self.web_engine_view.setPage(None)
-            self.web_engine_view.deleteLater()
-            self.web_engine_view = None
-
-        if self.web_page:
-            self.web_page.deleteLater()
-            self.web_page = None
-
-        # Cleanup editor window
-        if self.edit_page_window:
-            self.edit_page_window.close()
-            self.edit_page_window.deleteLater()
-            self.edit_page_window = None
-
-        # Cleanup commit browser
-        if self.commit_browser:
-            self.commit_browser.close()
-            self.commit_browser.deleteLater()
-            self.commit_browser = None
-
-
-class NotebookApp:
-    """Main application class."""
-
-    def __init__(self):
-        self.app = PyQt6.QtWidgets.QApplication(sys.argv)
-        self.notes = Notebook()
-
-    def run(self) -> None:
-        """Run the application."""
-        self.notes.show()
-        self.app.exec()
-
-
-if __name__ == "__main__":
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    logger.info("Starting Notebook application")
-
-    app = NotebookApp()
-    app.run()
+# Copyright [2025] [ecki]
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Main application file for Notebook application.
+Handles project management, file viewing, and Git integration.
+"""
+import datetime
+import html
+import json
+import logging
+import os
+import pathlib
+import sys
+import time
+from typing import Optional, Dict, List, Set
+
+import PyQt6
+import PyQt6.QtCore
+import PyQt6.QtGui
+import PyQt6.QtWidgets
+import PyQt6.QtWebEngineCore
+import PyQt6.QtWebEngineWidgets
+
+import attachments
+import editpage
+import filewatcher
+import historysearch
+import notegit
+import navcache
+import notehelper
+import notescheme
+import commitbrowser
+import diffviewer
+import pagehistory
+import pdfexport
+import sitebuilder
+
+logger = logging.getLogger(__name__)
+
+
+class NotebookPage(PyQt6.QtWebEngineCore.QWebEnginePage):
+    """
+    Custom WebEnginePage to customize link navigation handling.
+
+    Signals:
+        nav_link_clicked_internal_signal: Emitted for internal file links
+        nav_link_clicked_external_signal: Emitted for external URLs
+    """
+    nav_link_clicked_internal_signal = PyQt6.QtCore.pyqtSignal(PyQt6.QtCore.QUrl)
+    nav_link_clicked_external_signal = PyQt6.QtCore.pyqtSignal(PyQt6.QtCore.QUrl)
+
+    def acceptNavigationRequest(
+            self,
+            url: PyQt6.QtCore.QUrl,
+            _type: PyQt6.QtWebEngineCore.QWebEnginePage.NavigationType,
+            isMainFrame: bool
+    ) -> bool:
+        """
+        Handle navigation requests and emit appropriate signals.
+
+        Args:
+            url: Target URL
+            _type: Type of navigation
+            isMainFrame: Whether this is the main frame
+
+        Returns:
+            True to allow navigation, False to block it
+        """
+        if _type == PyQt6.QtWebEngineCore.QWebEnginePage.NavigationType.NavigationTypeLinkClicked:
+            logger.debug(f"URL clicked: {url.toString()}")
+
+            if not url.isValid() or url.isEmpty():
+                logger.warning("Invalid URL")
+                return False
+
+            if url.isLocalFile() or url.scheme() == notescheme.SCHEME:
+                logger.debug("Emitting signal to handle local file")
+                self.nav_link_clicked_internal_signal.emit(url)
+                return False
+
+            logger.debug("Emitting signal for external URL")
+            self.nav_link_clicked_external_signal.emit(url)
+            return False
+
+        return super().acceptNavigationRequest(url, _type, isMainFrame)
+
+
+class Notebook(PyQt6.QtWidgets.QMainWindow):
+    """
+    Main notebook application window.
+    Manages projects, files, and provides AsciiDoc viewing and editing.
+    """
+    trigger_history_index = PyQt6.QtCore.pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+
+        # Initialize variables
+        self.config_filename: Optional[pathlib.Path] = None
+        self.data: Dict = {}
+        self.current_file_name: Optional[str] = None
+        self.commit_browser: Optional[commitbrowser.CommitBrowserDialog] = None
+        self.page_history: Optional[pagehistory.PageHistoryDialog] = None
+        self.diff_viewer: Optional[diffviewer.DiffViewerDialog] = None
+        self.repo: Optional[notegit.NoteGit] = None
+        self.site_build_thread: Optional[PyQt6.QtCore.QThread] = None
+        self.site_build_worker: Optional[sitebuilder.SiteBuildWorker] = None
+        self.site_build_progress: Optional[PyQt6.QtWidgets.QProgressDialog] = None
+        self.pdf_export_queue: Optional[pdfexport.PdfExportQueue] = None
+        self.pdf_export_progress: Optional[PyQt6.QtWidgets.QProgressDialog] = None
+        self.clone_thread: Optional[PyQt6.QtCore.QThread] = None
+        self.clone_worker: Optional[notegit.CloneWorker] = None
+        self.clone_progress: Optional[PyQt6.QtWidgets.QProgressDialog] = None
+        self.pending_scroll: Optional[tuple] = None
+        self.reported_attachments: Set[str] = set()
+
+        # Initialize UI elements
+        self.project_drop_down = PyQt6.QtWidgets.QComboBox()
+        self.search_box = PyQt6.QtWidgets.QComboBox()
+        self.setWindowTitle('Notebook')
+
+        # Read configuration
+        self.read_config()
+
+        # Initialize web view
+        self.web_engine_view = PyQt6.QtWebEngineWidgets.QWebEngineView()
+        self.web_page = NotebookPage(self)
+        self.web_page.nav_link_clicked_internal_signal.connect(self.on_internal_url)
+        self.web_page.nav_link_clicked_external_signal.connect(self.on_external_url)
+        self.web_page.urlChanged.connect(self.on_url_changed)
+        self.web_page.scrollPositionChanged.connect(self.on_scroll_position_changed)
+        self.web_page.loadFinished.connect(self.on_load_finished)
+        self.web_engine_view.setPage(self.web_page)
+
+        # Rendered pages reused for viewing and export
+        notehelper.configure_render_cache(
+            self.data.get("render_cache_entries", notehelper.RENDER_CACHE_ENTRIES),
+            self.data.get("render_cache_mb", notehelper.RENDER_CACHE_MB)
+        )
+
+        # Recently viewed pages for instant back/forward navigation
+        self.page_cache = navcache.NavigationCache(
+            self.data.get("nav_cache_entries", navcache.DEFAULT_MAX_ENTRIES),
+            self.data.get("nav_cache_mb", navcache.DEFAULT_MAX_MB)
+        )
+
+        # Serve pages through note:// URLs instead of setHtml()
+        self.scheme_handler = notescheme.NoteSchemeHandler(
+            lambda: self.data.get("projects", {}), self.page_cache, self, self._read_missing_file
+        )
+        self.web_page.profile().installUrlSchemeHandler(
+            notescheme.SCHEME.encode(), self.scheme_handler
+        )
+        self.scheme_handler.attachment_missing.connect(
+            self.on_attachment_missing, PyQt6.QtCore.Qt.ConnectionType.QueuedConnection
+        )
+
+        # Git wrappers of recently used projects, kept alive for fast switching
+        self.repo_pool = notegit.NoteGitPool(
+            self._open_repository,
+            self.data.get("git_pool_size", notegit.POOL_MAX_SIZE),
+            self.data.get("git_pool_idle_minutes", notegit.POOL_IDLE_SECONDS // 60) * 60,
+            self
+        )
+
+        # History search index, updated in the background
+        self.history_indexing: Set[str] = set()
+        self.history_thread = PyQt6.QtCore.QThread()
+        self.history_worker = historysearch.HistoryIndexWorker()
+        self.history_worker.moveToThread(self.history_thread)
+        self.trigger_history_index.connect(self.history_worker.update)
+        self.history_worker.index_updated.connect(self.on_history_indexed)
+        self.history_worker.index_failed.connect(
+            lambda project_path, _error: self.on_history_indexed(project_path, 0)
+        )
+        self.history_thread.start()
+
+        # Notice files changed outside the application
+        self.project_watcher = filewatcher.ProjectWatcher(self)
+        self.project_watcher.paths_changed.connect(self.on_watched_files_changed)
+        self.project_watcher.complete_changed.connect(self.on_watch_complete_changed)
+
+        # Initialize UI
+        self.init_ui()
+
+        # Initialize repository
+        self._initialize_repository()
+
+        # Initialize edit window
+        self.edit_page_window = editpage.EditPage()
+        self._connect_edit_window_signals()
+
+        # Load start page
+        project_name = self.data.get("last_project", self.project_drop_down.currentText())
+        last_file = self.data.get("projects", {}).get(project_name, {}).get("last_ascii_file", "")
+        self.load_page(last_file)
+
+    def _initialize_repository(self) -> None:
+        """Initialize Git repository for current project."""
+        # Ensure projects exist
+        while not self.data.get("projects", {}):
+            result = PyQt6.QtWidgets.QMessageBox.question(
+                self,
+                "Kein Projekt",
+                "Kein Projekt gefunden. Möchten Sie ein neues Projekt erstellen?",
+                PyQt6.QtWidgets.QMessageBox.StandardButton.Yes |
+                PyQt6.QtWidgets.QMessageBox.StandardButton.No
+            )
+            if result == PyQt6.QtWidgets.QMessageBox.StandardButton.Yes:
+                self.create_new_project()
+            else:
+                logger.error("No projects available, exiting")
+                sys.exit(1)
+
+        # Set last project
+        if not self.data.get("last_project"):
+            first_project = list(self.data.get("projects").keys())[0]
+            self.data.update({"last_project": first_project})
+
+        project_name = self.data.get("last_project", self.project_drop_down.currentText())
+        project_path = self.data.get("projects", {}).get(project_name, {}).get("path", "")
+
+        if not project_path:
+            logger.error(f"No path found for project {project_name}")
+            PyQt6.QtWidgets.QMessageBox.critical(
+                self,
+                "Fehler",
+                f"Kein Pfad für Projekt {project_name} gefunden"
+            )
+            return
+
+        try:
+            self._activate_repository(project_path)
+        except Exception as e:
+            logger.error(f"Failed to initialize repository: {e}")
+            PyQt6.QtWidgets.QMessageBox.critical(
+                self,
+                "Fehler",
+                f"Projekt {project_name} konnte nicht geladen werden:\n{e}\n\n"
+                "Das Projekt wird aus der Konfiguration entfernt."
+            )
+            self.data.get("projects", {}).pop(project_name, None)
+            self.write_config()
+            # Try to initialize another project
+            self._initialize_repository()
+
+    def _activate_repository(self, project_path: str) -> None:
+        """
+        Make a project the current one: open its repository, watch its files
+        and bring its history index up to date.
+
+        Args:
+            project_path: Path to the project directory
+
+        Raises:
+            ImportError: If the repository cannot be initialized
+        """
+        if self.repo:
+            self.repo.set_watched(False)
+        self.repo = self.repo_pool.activate(project_path)
+        self.project_watcher.set_project(project_path)
+        self.repo.set_watched(self.project_watcher.complete)
+        self._update_history_index(project_path)
+
+    def _update_history_index(self, project_path: str) -> None:
+        """
+        Index new commits of a project for history search in the background.
+
+        Args:
+            project_path: Path to the project directory
+        """
+        self.history_indexing.add(project_path)
+        self.trigger_history_index.emit(project_path)
+
+    def on_history_indexed(self, project_path: str, _count: int) -> None:
+        """
+        Called when the history index of a project is up to date.
+
+        Args:
+            project_path: Path to the project directory
+        """
+        self.history_indexing.discard(project_path)
+
+    def _read_missing_file(self, project_path: pathlib.Path, file_name: str):
+        """
+        Get the committed version of a file that is not checked out.
+
+        Args:
+            project_path: Resolved project directory
+            file_name: Path relative to the project
+
+        Returns:
+            Git blob of the file, None if it is not tracked in the current project
+        """
+        if not self.repo or pathlib.Path(self.repo.project_path).resolve() != project_path:
+            return None
+        try:
+            return self.repo.read_head_file(file_name)
+        except (KeyError, ValueError):
+            return None
+
+    def _open_repository(self, project_path: str) -> notegit.NoteGit:
+        """
+        Create the git wrapper for a project and connect its signals.
+
+        Args:
+            project_path: Path to the project directory
+
+        Returns:
+            Git wrapper of the project
+        """
+        commit_delay = self.data.get("commit_delay_seconds", notegit.COMMIT_DELAY_SECONDS)
+        sync_interval = self.data.get("sync_interval_seconds", notegit.SYNC_INTERVAL_SECONDS)
+        maintenance_idle = self.data.get(
+            "maintenance_idle_seconds", notegit.MAINTENANCE_IDLE_SECONDS
+        )
+        repo = notegit.NoteGit(
+            project_path,
+            int(commit_delay * 1000),
+            int(sync_interval * 1000),
+            int(maintenance_idle * 1000)
+        )
+        repo.files_changed.connect(self.on_repo_files_changed)
+        return repo
+
+    def _connect_edit_window_signals(self) -> None:
+        """Connect edit window signals to main window handlers."""
+        self.edit_page_window.ascii_file_rendered.connect(self.on_page_rendered)
+        self.edit_page_window.ascii_file_changed.connect(self.on_file_edited)
+        self.edit_page_window.project_new_file.connect(self.on_upload_file)
+        self.edit_page_window.geometry_update.connect(self.edit_page_window_geometry)
+        self.edit_page_window.project_data_changed.connect(self.project_data_update)
+        self.edit_page_window.show_commits_requested.connect(self.on_show_commits)
+
+    def on_external_url(self, url: PyQt6.QtCore.QUrl) -> None:
+        """
+        Handle external URL click with user confirmation.
+
+        Args:
+            url: External URL to open
+        """
+        reply = PyQt6.QtWidgets.QMessageBox.question(
+            self,
+            "Proceed",
+            f"Are you sure you want to open the URL '{url.toString()}' in an external browser?",
+            PyQt6.QtWidgets.QMessageBox.StandardButton.Yes |
+            PyQt6.QtWidgets.QMessageBox.StandardButton.No,
+            PyQt6.QtWidgets.QMessageBox.StandardButton.No
+        )
+
+        if reply == PyQt6.QtWidgets.QMessageBox.StandardButton.Yes:
+            logger.debug(f"Opening link {url.toString()} in external browser")
+            PyQt6.QtGui.QDesktopServices.openUrl(url)
+
+    def open_editor_window(
+            self,
+            project_data: Dict,
+            project_name: str,
+            file_name: str
+    ) -> None:
+        """
+        Load data into editor window and show it.
+
+        Args:
+            project_data: Project configuration
+            project_name: Name of the project
+            file_name: Relative path to file
+        """
+        try:
+            if not self.repo:
+                raise ValueError("No repository initialized")
+
+            file_list = self.repo.list_all_files()
+
+            self.edit_page_window.load_document(
+                project_data=project_data,
+                project_name=project_name,
+                file_name=file_name,
+                file_list=file_list
+            )
+
+            geometry = self.data.get("edit_window_geometry", [300, 300, 600, 600])
+            self.edit_page_window.set_geometry(geometry)
+            self.edit_page_window.show()
+
+        except Exception as e:
+            logger.error(f"Failed to load document into editor: {e}")
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self,
+                "Fehler",
+                f"Konnte Editor nicht laden:\n{e}"
+            )
+
+    def read_config(self) -> None:
+        """Read configuration from JSON file."""
+        home_dir = pathlib.Path.home()
+
+        if os.name in ["nt", "windows"]:
+            config_dir = home_dir / "AppData" / "Local" / "ThaNote"
+        else:
+            config_dir = home_dir / ".config" / "ThaNote"
+
+        # Create config directory if it doesn't exist
+        config_dir.mkdir(parents=True, exist_ok=True)
+
+        self.config_filename = config_dir / "config.json"
+        logger.debug(f"Reading config from {self.config_filename}")
+
+        try:
+            if self.config_filename.exists():
+                data = json.loads(self.config_filename.read_text(encoding="utf-8"))
+            else:
+                logger.info("Config file doesn't exist, creating new one")
+                data = {}
+        except json.JSONDecodeError as e:
+            logger.error(f"Config file corrupted: {e}")
+            data = {}
+        except Exception as e:
+            logger.warning(f"Error reading config: {e}")
+            data = {}
+
+        self.data = data
+
+    def write_config(self) -> None:
+        """Write configuration to JSON file."""
+        logger.info("Writing config")
+
+        if not self.config_filename:
+            logger.error("No config filename set")
+            return
+
+        try:
+            with open(self.config_filename, "w", encoding="utf-8") as config_file:
+                json.dump(self.data, config_file, indent=4)
+            logger.debug("Config written successfully")
+        except Exception as e:
+            logger.error(f"Error writing config: {e}")
+
+    def create_new_project(self) -> None:
+        """Create or add a new project."""
+        logger.debug("Creating new project")
+
+        project_path_str = PyQt6.QtWidgets.QFileDialog.getExistingDirectory(
+            self, "Select Directory"
+        )
+
+        if not project_path_str:
+            logger.warning("No directory selected")
+            return
+
+        project_path = pathlib.Path(project_path_str)
+        project_name = project_path.name
+
+        # Check if project already exists
+        if self.data.get("projects", {}).get(project_name, False):
+            PyQt6.QtWidgets.QMessageBox.information(
+                self,
+                "Add Project",
+                "Das Projekt ist bereits in der Liste"
+            )
+            logger.error("Project already in list")
+            return
+
+        index_file = self.data.get("index_file", "index.asciidoc")
+        self.data.update({"index_file": index_file})
+
+        filepath = project_path / index_file
+
+        # Create index file if it doesn't exist
+        if not filepath.exists():
+            text_str = (
+                f"== New project {project_name}\n\n"
+                "AsciiDoc format\n\n"
+                "link:https://docs.asciidoctor.org/asciidoc/latest/"
+                "syntax-quick-reference/[Link to Quick Reference Guide]\n"
+            )
+
+            try:
+                filepath.write_text(text_str, encoding="utf-8")
+                logger.info(f"New index file created: {filepath}")
+            except IOError as e:
+                logger.error(f"Could not write index file {filepath}: {e}")
+                PyQt6.QtWidgets.QMessageBox.critical(
+                    self,
+                    "Fehler",
+                    f"Konnte Index-Datei nicht erstellen:\n{e}"
+                )
+                return
+        else:
+            logger.info(f"Index file {filepath} already exists")
+
+        # Add project to config
+        projects = self.data.get("projects", {})
+        projects.update({
+            project_name: {
+                "path": project_path_str,
+                "create_date": time.time(),
+                "last_ascii_file": index_file
+            }
+        })
+        self.data.update({"projects": projects})
+        self.data.update({"last_project": project_name})
+
+        # Update UI
+        self.project_drop_down.addItem(project_name)
+
+        # Initialize repository
+        try:
+            self._activate_repository(project_path_str)
+            self.repo.add_file(index_file)
+        except Exception as e:
+            logger.error(f"Failed to initialize git: {e}")
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self,
+                "Warnung",
+                f"Git-Repository konnte nicht initialisiert werden:\n{e}"
+            )
+
+        self.load_page()
+
+    def on_clone_project(self) -> None:
+        """Clone a remote project as partial clone, optionally checking out only some folders."""
+        logger.debug("Cloning project")
+
+        if self.clone_thread is not None:
+            PyQt6.QtWidgets.QMessageBox.information(
+                self, "Hinweis", "Es wird bereits ein Projekt geklont"
+            )
+            return
+
+        url, ok = PyQt6.QtWidgets.QInputDialog.getText(self, "Clone Project", "Repository URL:")
+        url = url.strip()
+        if not ok or not url:
+            return
+
+        parent_dir = PyQt6.QtWidgets.QFileDialog.getExistingDirectory(
+            self, "Select parent directory"
+        )
+        if not parent_dir:
+            logger.warning("No directory selected")
+            return
+
+        project_name = url.rstrip("/").split("/")[-1].split(":")[-1]
+        if project_name.endswith(".git"):
+            project_name = project_name[:-4]
+        project_path = pathlib.Path(parent_dir) / project_name
+
+        if self.data.get("projects", {}).get(project_name, False):
+            PyQt6.QtWidgets.QMessageBox.information(
+                self,
+                "Clone Project",
+                "Das Projekt ist bereits in der Liste"
+            )
+            logger.error("Project already in list")
+            return
+
+        if project_path.exists() and any(project_path.iterdir()):
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self,
+                "Clone Project",
+                f"Das Verzeichnis {project_path} ist nicht leer"
+            )
+            return
+
+        folders_text, ok = PyQt6.QtWidgets.QInputDialog.getText(
+            self,
+            "Clone Project",
+            "Folders to check out (comma separated, empty for all):"
+        )
+        if not ok:
+            return
+        folders = [folder.strip().strip("/") for folder in folders_text.split(",")]
+        folders = [folder for folder in folders if folder]
+
+        self.clone_progress = PyQt6.QtWidgets.QProgressDialog(
+            f"Klone {project_name}...", None, 0, 100, self
+        )
+        self.clone_progress.setWindowTitle("Clone Project")
+        self.clone_progress.show()
+
+        self.clone_thread = PyQt6.QtCore.QThread()
+        self.clone_worker = notegit.CloneWorker(url, str(project_path), folders)
+        self.clone_worker.moveToThread(self.clone_thread)
+        self.clone_thread.started.connect(self.clone_worker.run)
+        self.clone_worker.progress.connect(self.on_clone_progress)
+        self.clone_worker.clone_finished.connect(self.on_clone_finished)
+        self.clone_worker.clone_failed.connect(self.on_clone_failed)
+        self.clone_thread.start()
+
+    def on_clone_progress(self, stage: str, percent: int) -> None:
+        """
+        Update clone progress.
+
+        Args:
+            stage: Description of the current stage
+            percent: Percentage of the stage done
+        """
+        if self.clone_progress:
+            self.clone_progress.setLabelText(stage or "Klone Projekt...")
+            self.clone_progress.setValue(percent)
+
+    def on_clone_finished(self, project_path_str: str) -> None:
+        """
+        Add a cloned project and open it.
+
+        Args:
+            project_path_str: Path of the cloned project
+        """
+        self._stop_clone()
+
+        project_name = pathlib.Path(project_path_str).name
+        index_file = self.data.get("index_file", "index.asciidoc")
+        projects = self.data.get("projects", {})
+        projects.update({
+            project_name: {
+                "path": project_path_str,
+                "create_date": time.time(),
+                "last_ascii_file": index_file
+            }
+        })
+        self.data.update({"projects": projects})
+        self.data.update({"last_project": project_name})
+
+        self.project_drop_down.addItem(project_name)
+        self.project_drop_down.setCurrentText(project_name)
+
+    def on_clone_failed(self, error: str) -> None:
+        """
+        Report a failed clone.
+
+        Args:
+            error: Error message
+        """
+        self._stop_clone()
+        PyQt6.QtWidgets.QMessageBox.critical(
+            self, "Fehler", f"Projekt konnte nicht geklont werden:\n{error}"
+        )
+
+    def _stop_clone(self) -> None:
+        """Shut down the clone thread."""
+        if self.clone_progress:
+            self.clone_progress.close()
+            self.clone_progress = None
+
+        if self.clone_thread:
+            self.clone_thread.quit()
+            self.clone_thread.wait()
+            self.clone_thread = None
+            self.clone_worker = None
+
+    def on_project_change(self) -> None:
+        """Handle project dropdown change."""
+        new_project_name = self.project_drop_down.currentText()
+        logger.info(f"Project changed to {new_project_name}")
+
+        self.data.update({"last_project": new_project_name})
+
+        project_path = self.data.get("projects", {}).get(new_project_name, {}).get("path")
+        if not project_path:
+            logger.error(f"No path found for project {new_project_name}")
+            return
+
+        # Switch repository, the previous one stays open in the pool
+        try:
+            self._activate_repository(project_path)
+        except Exception as e:
+            logger.error(f"Failed to load project: {e}")
+            PyQt6.QtWidgets.QMessageBox.critical(
+                self,
+                "Fehler",
+                f"Projekt konnte nicht geladen werden:\n{e}"
+            )
+            return
+
+        self.load_page()
+
+    def init_ui(self) -> None:
+        """Initialize the user interface."""
+        vbox = PyQt6.QtWidgets.QVBoxLayout()
+        hbox = PyQt6.QtWidgets.QHBoxLayout()
+        hbox2 = PyQt6.QtWidgets.QHBoxLayout()
+
+        # Project dropdown
+        self.project_drop_down.setMinimumWidth(130)
+        hbox.addWidget(self.project_drop_down)
+
+        project_highlight = self.data.get("last_project", "")
+        for project_name in list(self.data.get("projects", {}).keys()):
+            if not project_highlight:
+                project_highlight = project_name
+            self.project_drop_down.addItem(project_name)
+
+        if project_highlight:
+            self.project_drop_down.setCurrentText(project_highlight)
+
+        # Disconnect any existing connections before connecting
+        try:
+            self.project_drop_down.currentTextChanged.disconnect()
+        except TypeError:
+            pass
+        self.project_drop_down.currentTextChanged.connect(self.on_project_change)
+
+        # Search box
+        self.search_box.setEditable(True)
+        self.search_box.setInsertPolicy(PyQt6.QtWidgets.QComboBox.InsertPolicy.NoInsert)
+        hbox.addWidget(self.search_box)
+        self.search_box.currentTextChanged.connect(self.on_search_local)
+
+        # Search button
+        search_button = PyQt6.QtWidgets.QPushButton("🔎")
+        hbox.addWidget(search_button)
+        search_button.clicked.connect(self.on_click_search)
+
+        # Search the history instead of the current files
+        self.history_search_check = PyQt6.QtWidgets.QCheckBox("History")
+        self.history_search_check.setToolTip("Find commits that added or removed the text")
+        hbox.addWidget(self.history_search_check)
+
+        # Commits button
+        open_git_button = PyQt6.QtWidgets.QPushButton("Commits")
+        hbox.addWidget(open_git_button)
+        open_git_button.clicked.connect(self.on_show_commits)
+
+        # Page history button
+        page_history_button = PyQt6.QtWidgets.QPushButton("History")
+        hbox.addWidget(page_history_button)
+        page_history_button.clicked.connect(self.on_show_page_history)
+
+        # Add/New project button
+        add_project_button = PyQt6.QtWidgets.QPushButton('Add/ New Project', self)
+        hbox2.addWidget(add_project_button)
+        add_project_button.clicked.connect(self.create_new_project)
+
+        # Clone project button
+        clone_project_button = PyQt6.QtWidgets.QPushButton("Clone Project", self)
+        hbox2.addWidget(clone_project_button)
+        clone_project_button.clicked.connect(self.on_clone_project)
+
+        # Export button
+        export_button = PyQt6.QtWidgets.QPushButton("Export", self)
+        hbox2.addWidget(export_button)
+        export_button.clicked.connect(self.on_export_pdf)
+
+        # Batch export button
+        batch_export_button = PyQt6.QtWidgets.QPushButton("Batch Export", self)
+        batch_export_button.setToolTip("<b>Export all pages of a folder as PDF</b>")
+        hbox2.addWidget(batch_export_button)
+        batch_export_button.clicked.connect(self.on_batch_export_pdf)
+
+        # Build site button
+        build_site_button = PyQt6.QtWidgets.QPushButton("Build Site", self)
+        build_site_button.setToolTip("<b>Export all pages as static HTML</b>")
+        hbox2.addWidget(build_site_button)
+        build_site_button.clicked.connect(self.on_build_site)
+
+        # Edit button
+        edit_page_button = PyQt6.QtWidgets.QPushButton("Edit Page", self)
+        hbox2.addWidget(edit_page_button)
+        edit_page_button.clicked.connect(self.on_click_edit_page)
+
+        # Back button
+        page_back_btn = PyQt6.QtWidgets.QPushButton("Back", self)
+        hbox2.addWidget(page_back_btn)
+        page_back_btn.clicked.connect(self.on_back_btn)
+
+        # Forward button
+        page_forward_btn = PyQt6.QtWidgets.QPushButton("Forward", self)
+        hbox2.addWidget(page_forward_btn)
+        page_forward_btn.clicked.connect(self.on_forward_btn)
+
+        # Layout assembly
+        vbox.addLayout(hbox)
+        vbox.addLayout(hbox2)
+        vbox.addWidget(self.web_engine_view)
+
+        main_widget = PyQt6.QtWidgets.QWidget()
+        main_widget.setLayout(vbox)
+        self.setCentralWidget(main_widget)
+
+        # Set window geometry
+        geometry = self.data.get("geometry", [300, 250, 900, 600])
+        self.setGeometry(geometry[0], geometry[1], geometry[2], geometry[3])
+
+        logger.info("Main window widgets created")
+
+    def on_show_commits(self) -> None:
+        """Show git commit browser dialog."""
+        logger.info("Showing commit browser")
+
+        # Prevent multiple windows
+        if self.commit_browser is not None and self.commit_browser.isVisible():
+            self.commit_browser.activateWindow()
+            return
+
+        if not self.repo:
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self, "Fehler", "Kein Repository geladen"
+            )
+            return
+
+        # Create and show dialog (non-modal with .show()), commits load in the background
+        self.commit_browser = commitbrowser.CommitBrowserDialog(self.repo.project_path, self)
+        self.commit_browser.show()
+
+    def on_show_page_history(self) -> None:
+        """Show the versions of the current page."""
+        logger.info("Showing page history")
+
+        # The history always belongs to the current page
+        if self.page_history is not None:
+            self.page_history.close()
+
+        if not self.repo or not self.current_file_name:
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self, "Fehler", "Keine Seite geladen"
+            )
+            return
+
+        try:
+            history = self.repo.file_history(self.current_file_name)
+        except Exception as e:
+            logger.error(f"Could not get page history: {e}")
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self,
+                "Fehler",
+                f"Versionen konnten nicht abgerufen werden:\n{e}"
+            )
+            return
+
+        self.page_history = pagehistory.PageHistoryDialog(self.current_file_name, history, self)
+        self.page_history.revision_selected.connect(self.on_revision_selected)
+        self.page_history.finished.connect(self.on_page_history_closed)
+        self.page_history.compare_requested.connect(self.on_compare_versions)
+        self.page_history.show()
+
+    def on_page_history_closed(self) -> None:
+        """Forget the page history dialog, it deletes itself when closed."""
+        if self.sender() is self.page_history:
+            self.page_history = None
+
+    def _diff_version(self, commit_sha: str, file_name: str) -> diffviewer.DiffVersion:
+        """
+        Describe a version of a page for the diff viewer.
+
+        Args:
+            commit_sha: SHA of the commit, empty for the current file
+            file_name: Path of the page in that commit
+
+        Returns:
+            Diff version reading its content on demand
+        """
+        project_name = self.project_drop_down.currentText()
+        project_path = self.data.get("projects", {}).get(project_name, {}).get("path", "")
+        full_path = os.path.join(project_path, file_name)
+
+        if not commit_sha:
+            with open(full_path, "rb") as page_file:
+                data = page_file.read()
+            return diffviewer.DiffVersion(
+                "Current version",
+                diffviewer.blob_sha(data),
+                lambda: data.decode("utf-8", errors="replace"),
+                lambda: notehelper.render_file(full_path)
+            )
+
+        blob = self.repo.read_revision(commit_sha, file_name)
+
+        def read_source() -> str:
+            return blob.data_stream.read().decode("utf-8", errors="replace")
+
+        return diffviewer.DiffVersion(
+            commit_sha[:7],
+            blob.hexsha,
+            read_source,
+            lambda: notehelper.render_revision(
+                blob.hexsha, read_source, os.path.dirname(full_path)
+            )
+        )
+
+    def on_compare_versions(
+            self,
+            old_sha: str,
+            old_file_name: str,
+            new_sha: str,
+            new_file_name: str
+    ) -> None:
+        """
+        Show the differences between two versions of a page.
+
+        Args:
+            old_sha: SHA of the old commit
+            old_file_name: Path of the page in the old commit
+            new_sha: SHA of the new commit, empty for the current file
+            new_file_name: Path of the page in the new commit
+        """
+        if not self.repo:
+            return
+
+        try:
+            old_version = self._diff_version(old_sha, old_file_name)
+            new_version = self._diff_version(new_sha, new_file_name)
+        except Exception as e:
+            logger.error(f"Could not read versions to compare: {e}")
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self,
+                "Fehler",
+                f"Versionen konnten nicht gelesen werden:\n{e}"
+            )
+            return
+
+        if self.diff_viewer is not None:
+            self.diff_viewer.close()
+
+        self.diff_viewer = diffviewer.DiffViewerDialog(old_version, new_version, self)
+        self.diff_viewer.finished.connect(self.on_diff_viewer_closed)
+        self.diff_viewer.show()
+
+    def on_diff_viewer_closed(self) -> None:
+        """Forget the diff viewer, it deletes itself when closed."""
+        if self.sender() is self.diff_viewer:
+            self.diff_viewer = None
+
+    def on_revision_selected(self, commit_sha: str, file_name: str) -> None:
+        """
+        Show a page as it was in a commit.
+
+        Args:
+            commit_sha: SHA of the commit, empty for the current version
+            file_name: Path of the page in that commit
+        """
+        if not commit_sha:
+            self.load_page(file_name)
+            return
+
+        project_name = self.project_drop_down.currentText()
+        project_path = self.data.get("projects", {}).get(project_name, {}).get("path", "")
+        if not project_path or not self.repo:
+            return
+
+        try:
+            blob = self.repo.read_revision(commit_sha, file_name)
+            html_text = notehelper.render_revision(
+                blob.hexsha,
+                lambda: blob.data_stream.read().decode("utf-8", errors="replace"),
+                os.path.dirname(os.path.join(project_path, file_name))
+            )
+        except Exception as e:
+            logger.error(f"Could not render {file_name} at {commit_sha}: {e}")
+            html_text = f"<h1>Conversion Error</h1><pre>{html.escape(str(e))}</pre>"
+
+        revision_query = PyQt6.QtCore.QUrlQuery()
+        revision_query.addQueryItem("rev", commit_sha)
+        revision_url = self.scheme_handler.page_url(
+            project_name,
+            file_name,
+            revision_query.toString(PyQt6.QtCore.QUrl.ComponentFormattingOption.FullyEncoded)
+        )
+        self.scheme_handler.set_virtual_page(revision_url, html_text)
+        self.web_page.load(revision_url)
+
+    def on_search_local(self) -> None:
+        """Search in current page."""
+        search_text = self.search_box.currentText()
+        self.web_page.findText(search_text)
+
+    def on_click_search(self) -> None:
+        """Perform semantic search across all files."""
+        search_text = self.search_box.currentText().lower()
+        logger.info(f"Search clicked for text: {search_text}")
+
+        if not search_text:
+            return
+
+        project_name = self.project_drop_down.currentText()
+        project_path = self.data.get("projects", {}).get(project_name, {}).get("path", "")
+
+        if not project_path:
+            logger.warning("No project path found")
+            return
+
+        if not self.repo:
+            logger.warning("No repository initialized")
+            return
+
+        # Add to search history
+        if self.search_box.findText(search_text) < 0:
+            self.search_box.addItem(search_text)
+
+        if self.history_search_check.isChecked():
+            self._search_history(search_text, project_name, project_path)
+            return
+
+        # Perform search
+        try:
+            file_list = self.repo.list_all_files()
+            search_result = notehelper.search_files(search_text, file_list, project_path)
+            html_text = notehelper.text_2_html(search_result)
+            search_query = PyQt6.QtCore.QUrlQuery()
+            search_query.addQueryItem("q", search_text)
+            search_url = self.scheme_handler.page_url(
+                project_name,
+                ".search",
+                search_query.toString(PyQt6.QtCore.QUrl.ComponentFormattingOption.FullyEncoded)
+            )
+            self.scheme_handler.set_virtual_page(search_url, html_text)
+            self.web_page.load(search_url)
+        except Exception as e:
+            logger.error(f"Search error: {e}")
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self, "Fehler", f"Suchfehler:\n{e}"
+            )
+
+    def _search_history(self, search_text: str, project_name: str, project_path: str) -> None:
+        """
+        Show the commits that added or removed a text.
+
+        Args:
+            search_text: Text to search for
+            project_name: Name of the current project
+            project_path: Path of the current project
+        """
+        try:
+            results = historysearch.search_history(self.repo.repo, search_text)
+            result_text = historysearch.format_history_results(
+                search_text, results, project_path in self.history_indexing
+            )
+            html_text = notehelper.text_2_html(result_text)
+            search_query = PyQt6.QtCore.QUrlQuery()
+            search_query.addQueryItem("q", search_text)
+            search_url = self.scheme_handler.page_url(
+                project_name,
+                ".history-search",
+                search_query.toString(PyQt6.QtCore.QUrl.ComponentFormattingOption.FullyEncoded)
+            )
+            self.scheme_handler.set_virtual_page(search_url, html_text)
+            self.web_page.load(search_url)
+
+            # Pick up commits made since the last update for the next search
+            self._update_history_index(project_path)
+        except Exception as e:
+            logger.error(f"History search error: {e}")
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self, "Fehler", f"Suchfehler:\n{e}"
+            )
+
+    def load_page(self, file_name: Optional[str] = None) -> None:
+        """
+        Load and display a page.
+
+        Args:
+            file_name: Relative path to file, or None for index file
+        """
+        if not file_name:
+            file_name = self.data.get("index_file", "index.asciidoc")
+
+        project_name = self.project_drop_down.currentText()
+        logger.info(f"Loading page {file_name} from project {project_name}")
+
+        project = self.data.get("projects", {}).get(project_name)
+        if not project:
+            logger.error(f"Project {project_name} not found")
+            return
+
+        project_path = project.get("path")
+        if not project_path:
+            logger.error(f"No path for project {project_name}")
+            return
+
+        full_file_path = os.path.join(project_path, file_name)
+        full_file_path = os.path.normpath(full_file_path)
+
+        # Security check: ensure file is within project
+        try:
+            full_file_path_resolved = pathlib.Path(full_file_path).resolve()
+            project_path_resolved = pathlib.Path(project_path).resolve()
+            full_file_path_resolved.relative_to(project_path_resolved)
+        except ValueError:
+            logger.error(f"Security: File {full_file_path} outside project path")
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self,
+                "Sicherheitsfehler",
+                "Die Datei liegt außerhalb des Projektverzeichnisses"
+            )
+            return
+
+        file_extension = file_name.split(".")[-1].lower()
+
+        # Handle different file types
+        if file_extension in ["htm", "html", "txt", "jpg", "png", "jpeg"]:
+            logger.info(f"Opening file in webview: {full_file_path}")
+            self.web_page.load(self.scheme_handler.page_url(project_name, file_name))
+            return
+
+        if file_extension in ["pdf", "ppt", "doc", "docx"]:
+            logger.info(f"Opening file externally: {full_file_path}")
+            # Uploads may be pointers to the attachment store
+            try:
+                store = attachments.AttachmentStore.for_project(project_path, project)
+                open_path = store.external_path(full_file_path)
+            except OSError as e:
+                logger.error(f"Could not copy attachment {full_file_path}: {e}")
+                PyQt6.QtWidgets.QMessageBox.critical(
+                    self, "Fehler", f"Anhang konnte nicht geöffnet werden:\n{e}"
+                )
+                return
+            if open_path is None:
+                # Warn on every click, not only once like for embedded attachments
+                self.reported_attachments.discard(full_file_path)
+                self.on_attachment_missing(full_file_path)
+                return
+
+            self.on_external_url(PyQt6.QtCore.QUrl(open_path.absolute().as_uri()))
+            return
+
+        # Handle AsciiDoc files
+        if file_extension in ["adoc", "asciidoc"]:
+            logger.info(f"Loading asciidoc page {full_file_path}")
+            self.current_file_name = file_name
+
+            # Tracked files outside a sparse checkout are served from git
+            if (not os.path.exists(full_file_path)
+                    and not (self.repo and file_name in self.repo.list_all_files())):
+                logger.warning(f"File {full_file_path} not found, creating new")
+                text_in = "== Empty page\n"
+
+                os.makedirs(os.path.dirname(full_file_path), exist_ok=True)
+
+                try:
+                    with open(full_file_path, "w", encoding="utf-8") as ascii_file:
+                        ascii_file.write(text_in)
+                    if self.repo:
+                        self.repo.add_file(file_name)
+                except IOError as e:
+                    logger.error(f"Problem writing new file {full_file_path}: {e}")
+                    PyQt6.QtWidgets.QMessageBox.critical(
+                        self, "Fehler", f"Datei konnte nicht erstellt werden:\n{e}"
+                    )
+                    return
+
+            # Rendering happens in the scheme handler, served from the render cache
+            self.web_page.load(self.scheme_handler.page_url(project_name, file_name))
+
+    def on_url_changed(self, url: PyQt6.QtCore.QUrl) -> None:
+        """
+        Keep track of the current page when navigating through the history.
+
+        Args:
+            url: New URL of the web page
+        """
+        if url.scheme() != notescheme.SCHEME or url.hasQuery():
+            return
+
+        project_name = self.project_drop_down.currentText()
+        if url.host() != notescheme.project_host(project_name):
+            return
+
+        file_name = url.path(PyQt6.QtCore.QUrl.ComponentFormattingOption.FullyDecoded).lstrip("/")
+        if file_name.lower().endswith((".adoc", ".asciidoc")):
+            self.current_file_name = file_name
+
+    def on_page_rendered(self, file_name: str, html_text: str) -> None:
+        """
+        Show a page saved by the editor using the HTML it already validated.
+
+        Args:
+            file_name: Relative path to saved file
+            html_text: HTML rendered from the saved content
+        """
+        project_name = self.project_drop_down.currentText()
+        project_path = self.data.get("projects", {}).get(project_name, {}).get("path", "")
+
+        if project_path:
+            full_file_path = os.path.normpath(os.path.join(project_path, file_name))
+            invalidated = notehelper.cache_rendered_html(full_file_path, html_text)
+            self.page_cache.invalidate_paths(list(invalidated))
+
+        self.load_page(file_name)
+
+    def on_file_edited(self, file_name: str) -> None:
+        """
+        Handle file edit event.
+
+        Args:
+            file_name: Relative path to edited file
+        """
+        logger.info(f"Git update {file_name}")
+        if self.repo:
+            self.repo.update_file(file_name)
+
+    def on_repo_files_changed(self, project_path: str, file_names: List[str]) -> None:
+        """
+        Invalidate cached pages after files changed in the repository, e.g. by a pull.
+
+        Args:
+            project_path: Path of the repository the files belong to
+            file_names: Relative paths of changed files
+        """
+        changed_paths = [
+            os.path.normpath(os.path.join(project_path, file_name))
+            for file_name in file_names
+        ]
+        invalidated = notehelper.invalidate_paths(changed_paths)
+        self._reload_if_invalidated(project_path, invalidated)
+        self._update_history_index(project_path)
+
+    def on_watched_files_changed(self, paths: List[str], added_or_removed: bool) -> None:
+        """
+        Invalidate caches after files of the current project changed on disk.
+
+        Args:
+            paths: Absolute paths of changed files
+            added_or_removed: Whether files were added or removed
+        """
+        if added_or_removed and self.repo:
+            self.repo.invalidate_file_list()
+
+        # Pages the editor rendered right after saving are still valid
+        invalidated = notehelper.invalidate_paths(paths, only_stale=True)
+
+        project_name = self.project_drop_down.currentText()
+        project_path = self.data.get("projects", {}).get(project_name, {}).get("path", "")
+        self._reload_if_invalidated(project_path, invalidated)
+
+        # Changed files are the candidates for the next uncommitted changes check
+        if self.repo and self.project_watcher.project_path:
+            self.repo.note_changed_paths(
+                os.path.relpath(path, self.project_watcher.project_path) for path in paths
+            )
+
+    def on_watch_complete_changed(self, complete: bool) -> None:
+        """
+        Let the git wrapper fall back to snapshot scans once the watcher misses files.
+
+        Args:
+            complete: Whether the watcher reports every text file change
+        """
+        if self.repo:
+            self.repo.set_watched(complete)
+
+    def _reload_if_invalidated(self, project_path: str, invalidated: Set[str]) -> None:
+        """
+        Drop invalidated pages from the page cache and re-render the current page if needed.
+
+        Args:
+            project_path: Path of the project the pages belong to
+            invalidated: Paths of invalidated rendered pages
+        """
+        self.page_cache.invalidate_paths(list(invalidated))
+
+        # Re-render the current page if it or one of its includes changed
+        project_name = self.project_drop_down.currentText()
+        current_project_path = self.data.get("projects", {}).get(project_name, {}).get("path", "")
+        if not self.current_file_name or current_project_path != project_path:
+            return
+
+        current_path = os.path.normpath(
+            os.path.abspath(os.path.join(project_path, self.current_file_name))
+        )
+        if current_path in invalidated:
+            logger.info(f"Reloading {self.current_file_name} after it changed on disk")
+            self.load_page(self.current_file_name)
+
+    def on_upload_file(self, file_name: str) -> None:
+        """
+        Handle file upload event.
+
+        Args:
+            file_name: Relative path to uploaded file
+        """
+        logger.info(f"Adding uploaded file {file_name} to git")
+        if self.repo:
+            self.repo.add_file(file_name)
+
+    def on_click_edit_page(self) -> None:
+        """Open editor for current page."""
+        logger.info("Edit clicked")
+
+        project_name = self.project_drop_down.currentText()
+        project = self.data.get("projects", {}).get(project_name)
+
+        if not project:
+            logger.error(f"Project '{project_name}' not found")
+            return
+
+        if not self.current_file_name:
+            logger.warning("No file currently loaded to edit")
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self, "Fehler", "Keine Datei zum Bearbeiten geladen"
+            )
+            return
+
+        file_name = self.current_file_name
+        file_extension = file_name.split(".")[-1].lower()
+
+        if file_extension in ["adoc", "asciidoc"]:
+            logger.info(f"Editing page {file_name}")
+            self.open_editor_window(project, project_name, file_name)
+        else:
+            logger.warning(f"Cannot edit file type: {file_extension}")
+            PyQt6.QtWidgets.QMessageBox.information(
+                self,
+                "Hinweis",
+                f"Dateityp '{file_extension}' kann nicht bearbeitet werden"
+            )
+
+    def edit_page_window_geometry(self, geometry: tuple) -> None:
+        """
+        Save editor window geometry.
+
+        Args:
+            geometry: Tuple of (x, y, width, height)
+        """
+        self.data.update({"edit_window_geometry": geometry})
+
+    def project_data_update(self, project_data: Dict) -> None:
+        """
+        Update project data.
+
+        Args:
+            project_data: Updated project data
+        """
+        project_name = self.project_drop_down.currentText()
+        logger.info(f"Updating project data for {project_name}")
+        self.data.get("projects", {}).update({project_name: project_data})
+
+    def on_internal_url(self, url: PyQt6.QtCore.QUrl) -> None:
+        """
+        Handle internal file URL click.
+
+        Args:
+            url: Internal URL to open
+        """
+        logger.info(f"Opening internal URL: {url.toString()}")
+
+        try:
+            project_name = self.project_drop_down.currentText()
+            project_path_str = self.data.get("projects", {}).get(
+                project_name, {}
+            ).get("path", "")
+
+            if not project_path_str:
+                logger.error("No project path configured")
+                return
+
+            project_path = pathlib.Path(project_path_str).resolve()
+            if url.scheme() == notescheme.SCHEME:
+                url_path = self.scheme_handler.url_to_path(url)
+                if url_path is None:
+                    logger.error(f"Security: URL {url.toString()} outside known projects")
+                    return
+            else:
+                url_path = pathlib.Path(url.toLocalFile()).resolve()
+
+            # Security check
+            try:
+                relative_path = url_path.relative_to(project_path)
+            except ValueError:
+                logger.error(f"Security: Path {url_path} outside project {project_path}")
+                PyQt6.QtWidgets.QMessageBox.warning(
+                    self,
+                    "Sicherheitsfehler",
+                    "Die Datei liegt außerhalb des Projektverzeichnisses"
+                )
+                return
+
+            # Earlier version, e.g. from a history search result
+            revision = PyQt6.QtCore.QUrlQuery(url).queryItemValue("rev")
+            if url.scheme() == notescheme.SCHEME and revision:
+                self.on_revision_selected(revision, relative_path.as_posix())
+                return
+
+            if not url_path.is_file():
+                logger.warning(f"File does not exist: {url_path}")
+                PyQt6.QtWidgets.QMessageBox.warning(
+                    self, "Fehler", f"Datei nicht gefunden:\n{url_path}"
+                )
+                return
+
+            file_name = str(relative_path)
+            logger.info(f"Loading relative page: {file_name}")
+            self.load_page(file_name)
+
+        except Exception as e:
+            logger.error(f"Error in on_internal_url: {e}")
+            PyQt6.QtWidgets.QMessageBox.critical(
+                self, "Fehler", f"Fehler beim Öffnen der Datei:\n{e}"
+            )
+
+    def on_back_btn(self) -> None:
+        """Navigate back in browser history."""
+        logger.info("Back button clicked")
+        history = self.web_page.history()
+        if history.canGoBack():
+            self._remember_scroll_target(history.backItem().url())
+        self.web_page.triggerAction(
+            PyQt6.QtWebEngineCore.QWebEnginePage.WebAction.Back
+        )
+
+    def on_forward_btn(self) -> None:
+        """Navigate forward in browser history."""
+        logger.info("Forward button clicked")
+        history = self.web_page.history()
+        if history.canGoForward():
+            self._remember_scroll_target(history.forwardItem().url())
+        self.web_page.triggerAction(
+            PyQt6.QtWebEngineCore.QWebEnginePage.WebAction.Forward
+        )
+
+    def _remember_scroll_target(self, url: PyQt6.QtCore.QUrl) -> None:
+        """
+        Remember the reading position to restore after a history navigation.
+
+        Args:
+            url: URL of the page navigated to
+        """
+        self.pending_scroll = self.page_cache.scroll(
+            url.toString(PyQt6.QtCore.QUrl.UrlFormattingOption.RemoveFragment)
+        )
+
+    def on_scroll_position_changed(self, position: PyQt6.QtCore.QPointF) -> None:
+        """
+        Track the reading position of the current page.
+
+        Args:
+            position: New scroll position
+        """
+        if self.pending_scroll is not None:
+            # Don't overwrite the stored position while it is being restored
+            return
+
+        url = self.web_page.url().toString(
+            PyQt6.QtCore.QUrl.UrlFormattingOption.RemoveFragment
+        )
+        self.page_cache.set_scroll(url, position.x(), position.y())
+
+    def on_load_finished(self, ok: bool) -> None:
+        """
+        Restore the reading position after a history navigation.
+
+        Args:
+            ok: Whether loading succeeded
+        """
+        if self.pending_scroll is None:
+            return
+
+        x, y = self.pending_scroll
+        self.pending_scroll = None
+        if ok:
+            zoom = self.web_page.zoomFactor() or 1.0
+            self.web_page.runJavaScript(f"window.scrollTo({x / zoom}, {y / zoom});")
+
+    def on_attachment_missing(self, path: str) -> None:
+        """
+        Warn once per file that an attachment's content is not available.
+
+        Args:
+            path: Pointer file whose content is not in the attachment store
+        """
+        if path in self.reported_attachments:
+            return
+        self.reported_attachments.add(path)
+
+        PyQt6.QtWidgets.QMessageBox.warning(
+            self,
+            "Anhang fehlt",
+            f"Der Inhalt von {pathlib.Path(path).name} liegt nicht im Anhangspeicher "
+            f"dieses Rechners.\n\nAnhänge werden nicht mit Git übertragen. Auf allen "
+            f"Rechnern muss 'attachment_store_dir' auf denselben gemeinsamen Ordner zeigen."
+        )
+
+    def on_export_pdf(self) -> None:
+        """Export current page to PDF."""
+        logger.info("Export clicked")
+
+        try:
+            export_dir = pathlib.Path.home() / "Downloads"
+            if not export_dir.exists():
+                export_dir = pathlib.Path.home()
+        except Exception:
+            export_dir = pathlib.Path.home()
+
+        export_dir_str = self.data.get("export_dir", str(export_dir))
+        export_dir = pathlib.Path(export_dir_str)
+
+        current_page_name = pathlib.Path(self.web_page.url().fileName())
+        date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+
+        file_name = f"{date_str}_{current_page_name.stem}.pdf"
+        default_pdf_path = export_dir / file_name
+
+        pdf_file_dialog = PyQt6.QtWidgets.QFileDialog.getSaveFileName(
+            self, "Save PDF file", str(default_pdf_path), "PDF (*.pdf)"
+        )
+
+        if pdf_file_dialog and pdf_file_dialog[0]:
+            pdf_file_path_str = pdf_file_dialog[0]
+            export_parent_dir = str(pathlib.Path(pdf_file_path_str).parent)
+            self.data.update({"export_dir": export_parent_dir})
+
+            try:
+                self.web_engine_view.page().printToPdf(pdf_file_path_str)
+                logger.info(f"Page exported to {pdf_file_path_str}")
+            except Exception as e:
+                logger.error(f"PDF export failed: {e}")
+                PyQt6.QtWidgets.QMessageBox.critical(
+                    self, "Fehler", f"PDF-Export fehlgeschlagen:\n{e}"
+                )
+        else:
+            logger.warning("PDF export cancelled")
+
+    def on_batch_export_pdf(self) -> None:
+        """Export all AsciiDoc pages of a project folder to PDF in the background."""
+        logger.info("Batch export clicked")
+
+        if self.pdf_export_queue is not None:
+            PyQt6.QtWidgets.QMessageBox.information(
+                self, "Hinweis", "Es läuft bereits ein PDF-Export"
+            )
+            return
+
+        project_name = self.project_drop_down.currentText()
+        project_path_str = self.data.get("projects", {}).get(project_name, {}).get("path", "")
+        if not project_path_str or not self.repo:
+            logger.warning("No project loaded for batch export")
+            return
+
+        folder_str = PyQt6.QtWidgets.QFileDialog.getExistingDirectory(
+            self, "Select folder to export", project_path_str
+        )
+        if not folder_str:
+            logger.warning("Batch export cancelled")
+            return
+
+        project_path = pathlib.Path(project_path_str).resolve()
+        try:
+            folder = pathlib.Path(folder_str).resolve().relative_to(project_path)
+        except ValueError:
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self,
+                "Pfad-Fehler",
+                "Der Ordner muss innerhalb des Projektverzeichnisses liegen."
+            )
+            return
+
+        pages = sorted(
+            file_name for file_name in self.repo.list_all_files()
+            if file_name.lower().endswith((".adoc", ".asciidoc"))
+            and (folder == pathlib.Path(".") or pathlib.Path(file_name).is_relative_to(folder))
+        )
+        if not pages:
+            PyQt6.QtWidgets.QMessageBox.information(
+                self, "Hinweis", "Keine Seiten im gewählten Ordner gefunden"
+            )
+            return
+
+        merge_reply = PyQt6.QtWidgets.QMessageBox.question(
+            self,
+            "Batch Export",
+            f"{len(pages)} Seiten gefunden. In eine PDF-Datei zusammenfassen?",
+            PyQt6.QtWidgets.QMessageBox.StandardButton.Yes |
+            PyQt6.QtWidgets.QMessageBox.StandardButton.No,
+            PyQt6.QtWidgets.QMessageBox.StandardButton.No
+        )
+        merge = merge_reply == PyQt6.QtWidgets.QMessageBox.StandardButton.Yes
+
+        export_dir = self.data.get("export_dir", str(pathlib.Path.home()))
+        date_str = datetime.datetime.now().strftime("%Y-%m-%d")
+        if merge:
+            folder_name = folder.name or project_name
+            pdf_file_dialog = PyQt6.QtWidgets.QFileDialog.getSaveFileName(
+                self,
+                "Save PDF file",
+                str(pathlib.Path(export_dir) / f"{date_str}_{folder_name}.pdf"),
+                "PDF (*.pdf)"
+            )
+            if not pdf_file_dialog or not pdf_file_dialog[0]:
+                logger.warning("Batch export cancelled")
+                return
+            target_dir = pathlib.Path(pdf_file_dialog[0]).parent
+            jobs = [(str(project_path / page), pdf_file_dialog[0]) for page in pages]
+        else:
+            target_dir_str = PyQt6.QtWidgets.QFileDialog.getExistingDirectory(
+                self, "Select export directory", export_dir
+            )
+            if not target_dir_str:
+                logger.warning("Batch export cancelled")
+                return
+            target_dir = pathlib.Path(target_dir_str)
+            jobs = []
+            for page in pages:
+                page_stem = pathlib.Path(page).with_suffix("").as_posix().replace("/", "_")
+                jobs.append(
+                    (str(project_path / page), str(target_dir / f"{date_str}_{page_stem}.pdf"))
+                )
+
+        self.data.update({"export_dir": str(target_dir)})
+
+        self.pdf_export_queue = pdfexport.PdfExportQueue(
+            jobs, self.data.get("pdf_export_concurrency", pdfexport.DEFAULT_MAX_CONCURRENT),
+            merge, self,
+            attachments.AttachmentStore.for_project(
+                project_path_str, self.data.get("projects", {}).get(project_name)
+            )
+        )
+        self.pdf_export_progress = PyQt6.QtWidgets.QProgressDialog(
+            "Exportiere PDF...", "Abbrechen", 0, self.pdf_export_queue.total, self
+        )
+        self.pdf_export_progress.setWindowTitle("Batch Export")
+        self.pdf_export_progress.setWindowModality(PyQt6.QtCore.Qt.WindowModality.NonModal)
+        self.pdf_export_progress.canceled.connect(self.pdf_export_queue.cancel)
+        self.pdf_export_queue.progress.connect(self.pdf_export_progress.setValue)
+        self.pdf_export_queue.job_failed.connect(
+            lambda source, error: logger.error(f"PDF export of {source} failed: {error}")
+        )
+        self.pdf_export_queue.export_finished.connect(self.on_batch_export_finished)
+        self.pdf_export_progress.show()
+        self.pdf_export_queue.start()
+
+    def on_batch_export_finished(self, written: List[str]) -> None:
+        """
+        Report a finished batch PDF export.
+
+        Args:
+            written: Written PDF files
+        """
+        total = self.pdf_export_queue.pdf_total if self.pdf_export_queue else len(written)
+
+        if self.pdf_export_progress:
+            self.pdf_export_progress.canceled.disconnect()
+            self.pdf_export_progress.close()
+            self.pdf_export_progress = None
+
+        if self.pdf_export_queue:
+            self.pdf_export_queue.deleteLater()
+            self.pdf_export_queue = None
+
+        PyQt6.QtWidgets.QMessageBox.information(
+            self, "Batch Export", f"{len(written)} von {total} PDF-Dateien exportiert"
+        )
+
+    def on_build_site(self) -> None:
+        """Export all AsciiDoc pages of the current project as static HTML site."""
+        logger.info("Build site clicked")
+
+        if self.site_build_thread is not None:
+            PyQt6.QtWidgets.QMessageBox.information(
+                self, "Hinweis", "Die Seite wird bereits erstellt"
+            )
+            return
+
+        project_name = self.project_drop_down.currentText()
+        project = self.data.get("projects", {}).get(project_name)
+        if not project or not project.get("path") or not self.repo:
+            logger.warning("No project loaded for site build")
+            return
+
+        default_dir = project.get("site_dir", str(pathlib.Path.home() / f"{project_name}_site"))
+        output_dir = PyQt6.QtWidgets.QFileDialog.getExistingDirectory(
+            self, "Select output directory", default_dir
+        )
+        if not output_dir:
+            logger.warning("Site build cancelled")
+            return
+
+        try:
+            pathlib.Path(output_dir).resolve().relative_to(pathlib.Path(project["path"]).resolve())
+            PyQt6.QtWidgets.QMessageBox.warning(
+                self,
+                "Pfad-Fehler",
+                "Das Zielverzeichnis darf nicht im Projektverzeichnis liegen."
+            )
+            return
+        except ValueError:
+            pass
+
+        project.update({"site_dir": output_dir})
+
+        self.site_build_progress = PyQt6.QtWidgets.QProgressDialog(
+            "Erstelle statische Seite...", None, 0, 0, self
+        )
+        self.site_build_progress.setWindowTitle("Build Site")
+        self.site_build_progress.show()
+
+        self.site_build_thread = PyQt6.QtCore.QThread()
+        self.site_build_worker = sitebuilder.SiteBuildWorker(
+            project["path"], output_dir, self.repo.list_all_files(),
+            attachments.AttachmentStore.for_project(project["path"], project)
+        )
+        self.site_build_worker.moveToThread(self.site_build_thread)
+        self.site_build_thread.started.connect(self.site_build_worker.run)
+        self.site_build_worker.progress.connect(self.on_site_build_progress)
+        self.site_build_worker.build_finished.connect(self.on_site_build_finished)
+        self.site_build_worker.build_failed.connect(self.on_site_build_failed)
+        self.site_build_thread.start()
+
+    def on_site_build_progress(self, done: int, total: int) -> None:
+        """
+        Update site build progress.
+
+        Args:
+            done: Number of rendered pages
+            total: Number of pages to render
+        """
+        if self.site_build_progress:
+            self.site_build_progress.setMaximum(total)
+            self.site_build_progress.setValue(done)
+
+    def on_site_build_finished(self, result: Dict) -> None:
+        """
+        Report a finished site build.
+
+        Args:
+            result: Build statistics
+        """
+        self._stop_site_build()
+        PyQt6.QtWidgets.QMessageBox.information(
+            self,
+            "Build Site",
+            f"{result['rendered']} Seiten erstellt, {result['copied']} Dateien kopiert, "
+            f"{result['skipped']} unverändert, {result['failed']} Fehler "
+            f"({result['seconds']:.1f} s)"
+        )
+
+    def on_site_build_failed(self, error: str) -> None:
+        """
+        Report a failed site build.
+
+        Args:
+            error: Error message
+        """
+        self._stop_site_build()
+        PyQt6.QtWidgets.QMessageBox.critical(
+            self, "Fehler", f"Export fehlgeschlagen:\n{error}"
+        )
+
+    def _stop_site_build(self) -> None:
+        """Shut down the site build thread."""
+        if self.site_build_progress:
+            self.site_build_progress.close()
+            self.site_build_progress = None
+
+        if self.site_build_thread:
+            self.site_build_thread.quit()
+            self.site_build_thread.wait()
+            self.site_build_thread = None
+            self.site_build_worker = None
+
+    @PyQt6.QtCore.pyqtSlot(PyQt6.QtGui.QCloseEvent)
+    def closeEvent(self, event: PyQt6.QtGui.QCloseEvent) -> None:
+        """
+        Handle application close event.
+
+        Args:
+            event: Close event
+        """
+        logger.info("Closing the notebook window")
+
+        # Save geometry
+        geometry = self.geometry().getRect()
+        self.data.update({"geometry": geometry})
+
+        # Write config
+        self.write_config()
+
+        # Wait for a running clone, an interrupted clone leaves a broken directory
+        self._stop_clone()
+
+        # Stop history indexing
+        self.history_worker.stop()
+        self.history_thread.quit()
+        self.history_thread.wait()
+
+        # Cleanup repositories
+        self.project_watcher.stop()
+        self.repo_pool.cleanup()
+        self.repo = None
+
+        # Cleanup web view
+        if self.web_engine_view:
+            self.web_engine_view.setPage(None)
+            self.web_engine_view.deleteLater()
+            self.web_engine_view = None
+
+        if self.web_page:
+            self.web_page.deleteLater()
+            self.web_page = None
+
+        # Cleanup editor window
+        if self.edit_page_window:
+            self.edit_page_window.cancel_upload()
+            self.edit_page_window.close()
+            self.edit_page_window.deleteLater()
+            self.edit_page_window = None
+
+        # Cleanup commit browser
+        if self.commit_browser:
+            self.commit_browser.close()
+            self.commit_browser.deleteLater()
+            self.commit_browser = None
+
+        if self.page_history:
+            self.page_history.close()
+
+        if self.diff_viewer:
+            self.diff_viewer.close()
+
+
+class NotebookApp:
+    """Main application class."""
+
+    def __init__(self):
+        # Custom schemes must be registered before the application is created
+        notescheme.register_scheme()
+        self.app = PyQt6.QtWidgets.QApplication(sys.argv)
+        self.notes = Notebook()
+
+    def run(self) -> None:
+        """Run the application."""
+        self.notes.show()
+        self.app.exec()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logger.info("Starting Notebook application")
+
+    app = NotebookApp()
+    app.run()
@@ -0,0 +1,177 @@
+# Copyright [2025] [ecki]
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Bounded cache of recently viewed pages for instant back/forward navigation.
+"""
+import collections
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+import notehelper
+
+# Configuration
+DEFAULT_MAX_ENTRIES = 50
+DEFAULT_MAX_MB = 64
+
+logger = logging.getLogger(__name__)
+
+
+class PageCacheEntry:
+    """
+    Rendered HTML of a viewed page.
+    """
+
+    def __init__(self, html: str, size: int, file_path: Optional[str]):
+        """
+        Initialize cache entry.
+
+        Args:
+            html: Rendered HTML
+            size: Size of the HTML in bytes
+            file_path: Source file of the page, None for generated pages
+        """
+        self.html = html
+        self.size = size
+        self.file_path = file_path
+        self.stamp = notehelper.RenderCache.file_stamp(file_path) if file_path else None
+
+
+class NavigationCache:
+    """
+    LRU cache of viewed pages keyed by URL, bounded by entry count and size.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_mb: int = DEFAULT_MAX_MB):
+        """
+        Initialize navigation cache.
+
+        Args:
+            max_entries: Maximum number of cached pages
+            max_mb: Maximum total size of cached HTML in megabytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_mb * 1024 * 1024
+        self.entries: "collections.OrderedDict[str, PageCacheEntry]" = collections.OrderedDict()
+        self.total_bytes = 0
+        # Scroll positions are kept even for pages whose HTML was evicted
+        self.scroll_positions: "collections.OrderedDict[str, Tuple[float, float]]" = (
+            collections.OrderedDict()
+        )
+
+    def store(self, url: str, html: str, size: int, file_path: Optional[str] = None) -> None:
+        """
+        Store a served page.
+
+        Args:
+            url: URL of the page without fragment
+            html: Rendered HTML
+            size: Size of the HTML in bytes
+            file_path: Source file of the page, None for generated pages
+        """
+        if size > self.max_bytes:
+            return
+
+        self._drop(url)
+        self.entries[url] = PageCacheEntry(html, size, file_path)
+        self.total_bytes += size
+
+        while self.entries and (len(self.entries) > self.max_entries
+                                or self.total_bytes > self.max_bytes):
+            oldest_url = next(iter(self.entries))
+            self._drop(oldest_url)
+
+    def get_html(self, url: str) -> Optional[str]:
+        """
+        Get the cached HTML of a page if its source file is unchanged.
+
+        Args:
+            url: URL of the page without fragment
+
+        Returns:
+            Cached HTML or None
+        """
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+
+        if entry.file_path and notehelper.RenderCache.file_stamp(entry.file_path) != entry.stamp:
+            self._drop(url)
+            return None
+
+        self.entries.move_to_end(url)
+        return entry.html
+
+    def set_scroll(self, url: str, x: float, y: float) -> None:
+        """
+        Remember the reading position of a page.
+
+        Args:
+            url: URL of the page without fragment
+            x: Horizontal scroll offset
+            y: Vertical scroll offset
+        """
+        self.scroll_positions[url] = (x, y)
+        self.scroll_positions.move_to_end(url)
+        while len(self.scroll_positions) > self.max_entries:
+            self.scroll_positions.popitem(last=False)
+
+    def scroll(self, url: str) -> Optional[Tuple[float, float]]:
+        """
+        Get the remembered reading position of a page.
+
+        Args:
+            url: URL of the page without fragment
+
+        Returns:
+            Tuple of (x, y) or None
+        """
+        return self.scroll_positions.get(url)
+
+    def invalidate_url(self, url: str) -> None:
+        """
+        Drop the cached HTML of a page.
+
+        Args:
+            url: URL of the page without fragment
+        """
+        self._drop(url)
+
+    def invalidate_paths(self, paths: List[str]) -> None:
+        """
+        Drop cached pages rendered from changed files.
+
+        Args:
+            paths: Absolute paths of changed files
+        """
+        changed = {os.path.realpath(path) for path in paths}
+        stale = [
+            url for url, entry in self.entries.items()
+            if entry.file_path and os.path.realpath(entry.file_path) in changed
+        ]
+        for url in stale:
+            self._drop(url)
+
+        if stale:
+            logger.debug(f"Dropped {len(stale)} pages from navigation cache")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache usage.
+
+        Returns:
+            Dict with number of entries and total bytes
+        """
+        return {"entries": len(self.entries), "bytes": self.total_bytes}
+
+    def _drop(self, url: str) -> None:
+        """
+        Remove a page from the cache.
+
+        Args:
+            url: URL of the page without fragment
+        """
+        entry = self.entries.pop(url, None)
+        if entry:
+            self.total_bytes -= entry.size
@@ -4,30 +4,281 @@
 """
 Git wrapper for notebook application with thread-safe operations.
 """
+import concurrent.futures
 import git
 import logging
+import os
 import pathlib
+import random
 import shutil
-from typing import List, Optional
+import stat
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
 import PyQt6.QtCore
 
+import gitjournal
+import treesnapshot
+
+# Configuration
+COMMIT_DELAY_SECONDS = 10  # Quiet window in which saves are folded into one commit
+PUSH_RETRY_MIN_SECONDS = 15
+PUSH_RETRY_MAX_SECONDS = 30 * 60
+PUSH_PENDING_MARKER = "thanote-push-pending"  # Written by older versions, now in the journal
+MAX_COMMIT_MESSAGE_FILES = 100  # Files listed in a reconcile commit message
+POOL_MAX_SIZE = 3  # Projects kept open for fast switching
+POOL_IDLE_SECONDS = 15 * 60
+POOL_IDLE_CHECK_SECONDS = 60
+SYNC_INTERVAL_SECONDS = 5 * 60
+SYNC_JITTER_FRACTION = 0.2  # Random deviation from the sync interval
+MAX_PARALLEL_REMOTES = 4
+FILE_HISTORY_MAX_COUNT = 500
+CLONE_FILTER = "blob:none"  # Partial clone, file contents are fetched on first access
+MAINTENANCE_IDLE_SECONDS = 5 * 60  # Quiet time after the last commit before maintenance
+MAINTENANCE_LOOSE_OBJECTS = 1000  # Loose objects that trigger a repack
+MAINTENANCE_MAX_PACKS = 30  # Packs that trigger a repack
+MAINTENANCE_PRUNE_EXPIRE = "2.weeks.ago"  # Same grace period as git gc
+MAINTENANCE_CRUFT_DAYS = 30  # Full repack expiring packed unreachable objects
+MAINTENANCE_CRUFT_STAMP = "thanote-cruft-repack"  # Inside .git, time of the last full repack
+MAX_STATUS_CANDIDATES = 1000  # More changed candidates are checked with a full git status
+TREE_RESCAN_SECONDS = 10 * 60  # Snapshot scan for changes the file watcher does not report
+LITERAL_PATHSPECS = {"GIT_LITERAL_PATHSPECS": "1"}  # File names with *, ? or [ match only themselves
+COMMIT_SHUTDOWN_WAIT_SECONDS = 60  # Extra wait at shutdown for a commit in progress
+STALE_INDEX_LOCK_SECONDS = 60  # Age of an unheld index.lock that is removed
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+def is_partial_clone(repo: git.Repo) -> bool:
+    """
+    Check whether a repository is a partial clone that fetches missing objects lazily.
+
+    Args:
+        repo: Repository to inspect
+
+    Returns:
+        True if a promisor remote is configured
+    """
+    reader = repo.config_reader()
+    if reader.has_option("extensions", "partialclone"):
+        return True
+    return any(
+        reader.get_value(section, "promisor", False) is True
+        for section in reader.sections()
+        if section.startswith("remote ")
+    )
+
+
+def clone_project(
+        url: str,
+        target_path: str,
+        folders: Optional[List[str]] = None,
+        progress: Optional[git.RemoteProgress] = None
+) -> git.Repo:
+    """
+    Clone a project as blob-less partial clone, optionally with a sparse checkout.
+
+    Only commits and trees are downloaded, file contents are fetched when they
+    are first read. With folders given only the top level files and these
+    folders are checked out.
+
+    Args:
+        url: URL of the remote repository
+        target_path: Directory to clone into, must not exist or be empty
+        folders: Folders to check out, None or empty for all
+        progress: Optional receiver of clone progress
+
+    Returns:
+        Cloned repository
+
+    Raises:
+        git.exc.GitCommandError: If cloning fails
+    """
+    options = [f"--filter={CLONE_FILTER}"]
+    if folders:
+        options.append("--sparse")
+
+    start_time = time.monotonic()
+    repo = git.Repo.clone_from(url, target_path, progress=progress, multi_options=options)
+    if folders:
+        repo.git.sparse_checkout("set", "--cone", *folders)
+
+    logger.info(f"Cloned {url} to {target_path} in {time.monotonic() - start_time:.1f}s")
+    return repo
+
 
 class GitWorker(PyQt6.QtCore.QObject):
     """
     Worker that runs in a separate thread for slow Git network operations.
+
+    Network operations run concurrently for all remotes, each with its own
+    repository object, merges happen serially afterwards.
+
+    Signals:
+        commit_finished: Emitted after a commit (str: new HEAD, empty if nothing
+            had to be committed, list: files handled)
+        commit_failed: Emitted when staging or committing failed (str: error)
+        push_finished: Emitted when all remotes were pushed (str: HEAD pushed)
+        remote_finished: Emitted per remote and operation (str: operation, str: remote,
+            bool: success, float: duration in seconds)
+        maintenance_finished: Emitted after a maintenance run (dict: object counts
+            before and after, duration of every step in seconds)
+        reconcile_finished: Emitted after checking for changes made outside the
+            application (str: new HEAD, empty if nothing was committed, list: changed files)
+        reconcile_failed: Emitted when the check or its commit failed (str: error)
     """
     # Signals for results
-    push_finished = PyQt6.QtCore.pyqtSignal()
+    commit_finished = PyQt6.QtCore.pyqtSignal(str, list)
+    commit_failed = PyQt6.QtCore.pyqtSignal(str)
+    push_finished = PyQt6.QtCore.pyqtSignal(str)
     push_failed = PyQt6.QtCore.pyqtSignal(str)
     pull_finished = PyQt6.QtCore.pyqtSignal()
     pull_failed = PyQt6.QtCore.pyqtSignal(str)
+    files_updated = PyQt6.QtCore.pyqtSignal(list)
+    sync_finished = PyQt6.QtCore.pyqtSignal(bool)
+    sync_failed = PyQt6.QtCore.pyqtSignal(str)
+    remote_finished = PyQt6.QtCore.pyqtSignal(str, str, bool, float)
+    maintenance_finished = PyQt6.QtCore.pyqtSignal(dict)
+    reconcile_finished = PyQt6.QtCore.pyqtSignal(str, list)
+    reconcile_failed = PyQt6.QtCore.pyqtSignal(str)
+
+    def __init__(self, max_parallel: int = MAX_PARALLEL_REMOTES):
+        """
+        Initialize worker.
+
+        Args:
+            max_parallel: Maximum number of remotes contacted at the same time
+        """
+        super().__init__()
+        self.max_parallel = max(1, max_parallel)
+
+    @staticmethod
+    def _changed_files(repo: git.Repo, old_head: Optional[str]) -> List[str]:
+        """
+        List files changed between an old HEAD and the current HEAD.
+
+        Args:
+            repo: Repository to inspect
+            old_head: Commit SHA of HEAD before the operation
+
+        Returns:
+            List of file paths relative to repository root
+        """
+        if not old_head or not repo.head.is_valid():
+            return []
+
+        new_head = repo.head.commit.hexsha
+        if new_head == old_head:
+            return []
+
+        names = repo.git.diff("--name-only", old_head, new_head).split('\n')
+        return [name for name in names if name]
+
+    def _run_on_remotes(
+            self,
+            project_path: str,
+            operation: str,
+            action: Callable[[git.Repo, git.Remote], T]
+    ) -> Dict[str, Tuple[Optional[T], Optional[str]]]:
+        """
+        Run a network operation on all remotes concurrently.
+
+        Every thread opens its own repository object, GitPython repositories
+        must not be shared between threads.
+
+        Args:
+            project_path: Path to the git repository
+            operation: Name of the operation for logging and signals
+            action: Function run per remote, receiving the thread's repository and remote
+
+        Returns:
+            Dict of remote name -> (result, error message or None)
+        """
+        def run(remote_name: str) -> Tuple[Optional[T], Optional[str], float]:
+            start_time = time.monotonic()
+            repo = git.Repo(project_path)
+            try:
+                logger.debug(f"Running {operation} for {remote_name} in background...")
+                result = action(repo, repo.remote(remote_name))
+                return result, None, time.monotonic() - start_time
+            except git.exc.GitCommandError as e:
+                return None, str(e), time.monotonic() - start_time
+            finally:
+                repo.close()
+
+        repo = git.Repo(project_path)
+        remote_names = [remote.name for remote in repo.remotes]
+        repo.close()
+
+        results: Dict[str, Tuple[Optional[T], Optional[str]]] = {}
+        if not remote_names:
+            return results
+
+        workers = min(self.max_parallel, len(remote_names))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run, name): name for name in remote_names}
+            for future in concurrent.futures.as_completed(futures):
+                remote_name = futures[future]
+                result, error, seconds = future.result()
+                if error:
+                    logger.warning(f"Git {operation} error for remote {remote_name}: {error}")
+                else:
+                    logger.debug(f"Git {operation} for {remote_name} took {seconds:.2f} s")
+                self.remote_finished.emit(operation, remote_name, error is None, seconds)
+                results[remote_name] = (result, error)
+
+        # Report in configuration order
+        return {name: results[name] for name in remote_names}
+
+    @staticmethod
+    def _fetch(repo: git.Repo, remote: git.Remote) -> None:
+        """
+        Fetch from a remote without writing FETCH_HEAD.
+
+        Fetches from several remotes run in parallel in the same repository and
+        would race on FETCH_HEAD, merges use the remote-tracking refs instead.
+        Remote.fetch() cannot be used, it parses FETCH_HEAD.
+
+        Args:
+            repo: Repository to fetch into
+            remote: Remote to fetch from
+        """
+        repo.git.fetch("--no-write-fetch-head", remote.name)
+
+    @staticmethod
+    def _merge_remote(repo: git.Repo, remote_name: str) -> None:
+        """
+        Merge the fetched branch of a remote into the current branch.
+
+        The tracking branch is used for its remote, otherwise the branch of the same name.
+
+        Args:
+            repo: Repository to merge in
+            remote_name: Name of the remote
+        """
+        if not repo.head.is_valid() or repo.head.is_detached:
+            return
+
+        branch = repo.active_branch
+        tracking = branch.tracking_branch()
+        if tracking and tracking.remote_name == remote_name:
+            ref_name = tracking.name
+        else:
+            ref_name = f"{remote_name}/{branch.name}"
+            if ref_name not in [ref.name for ref in repo.remote(remote_name).refs]:
+                return
+
+        try:
+            repo.git.merge("--no-edit", ref_name)
+        except git.exc.GitCommandError as e:
+            logger.warning(f"Git merge error for {ref_name}: {e}")
+            repo.git.merge("--abort")
 
     @PyQt6.QtCore.pyqtSlot(str)
     def do_pull(self, project_path: str) -> None:
         """
-        Executes 'git pull' for all remotes.
+        Fetches from all remotes concurrently, then merges their branches one by one.
 
         Args:
             project_path: Path to the git repository
@@ -39,40 +290,437 @@ class GitWorker(PyQt6.QtCore.QObject):
                 self.pull_finished.emit()
                 return
 
-            for remote in repo.remotes:
-                try:
-                    logger.debug(f"Pulling from {remote.name} in background...")
-                    remote.pull()
-                except git.exc.GitCommandError as e:
-                    logger.warning(f"Git pull error for remote {remote.name}: {e}")
-                    # Error with one remote shouldn't abort the entire pull
+            old_head = repo.head.commit.hexsha if repo.head.is_valid() else None
+
+            # Error with one remote shouldn't abort the entire pull
+            results = self._run_on_remotes(project_path, "fetch", self._fetch)
+            for remote_name, (_result, error) in results.items():
+                if not error:
+                    self._merge_remote(repo, remote_name)
+
+            changed_files = self._changed_files(repo, old_head)
+            if changed_files:
+                logger.info(f"Pull changed {len(changed_files)} files")
+                self.files_updated.emit(changed_files)
             self.pull_finished.emit()
         except Exception as e:
             logger.error(f"Failed to run background pull: {e}")
             self.pull_failed.emit(str(e))
 
+    @staticmethod
+    def _remote_moved(repo: git.Repo, remote: git.Remote) -> bool:
+        """
+        Check with ls-remote whether a remote has branches the last fetch did not see.
+
+        Args:
+            repo: Repository to inspect
+            remote: Remote to check
+
+        Returns:
+            True if a fetch would bring new commits
+        """
+        known = {
+            ref.remote_head: ref.object.hexsha
+            for ref in remote.refs
+            if ref.remote_head != "HEAD"
+        }
+        for line in repo.git.ls_remote("--heads", remote.name).splitlines():
+            sha, _, ref_name = line.partition("\t")
+            if known.get(ref_name.removeprefix("refs/heads/")) != sha:
+                return True
+        return False
+
     @PyQt6.QtCore.pyqtSlot(str)
-    def do_push(self, project_path: str) -> None:
+    def do_sync(self, project_path: str) -> None:
         """
-        Executes 'git push' for all remotes.
+        Fetch from remotes whose branches moved and merge the tracking branch.
 
         Args:
             project_path: Path to the git repository
         """
+        repo = None
         try:
             repo = git.Repo(project_path)
-            if not repo.remotes:
-                logger.info("No remotes configured, skipping push")
-                self.push_finished.emit()
+            if (pathlib.Path(repo.git_dir) / "index.lock").exists():
+                logger.debug("Repository busy, skipping sync")
+                self.sync_finished.emit(False)
+                return
+
+            def fetch_if_moved(thread_repo: git.Repo, remote: git.Remote) -> bool:
+                if not self._remote_moved(thread_repo, remote):
+                    return False
+                self._fetch(thread_repo, remote)
+                return True
+
+            results = self._run_on_remotes(project_path, "sync", fetch_if_moved)
+            fetched = any(result for result, _error in results.values())
+
+            tracking = None
+            if fetched and repo.head.is_valid() and not repo.head.is_detached:
+                tracking = repo.active_branch.tracking_branch()
+
+            if not tracking or tracking.commit == repo.head.commit:
+                self.sync_finished.emit(False)
+                return
+
+            old_head = repo.head.commit.hexsha
+            try:
+                repo.git.merge("--no-edit", tracking.name)
+            except git.exc.GitCommandError as e:
+                repo.git.merge("--abort")
+                raise e
+
+            changed_files = self._changed_files(repo, old_head)
+            if changed_files:
+                logger.info(f"Sync changed {len(changed_files)} files")
+                self.files_updated.emit(changed_files)
+            self.sync_finished.emit(True)
+        except Exception as e:
+            logger.error(f"Failed to run background sync: {e}")
+            self.sync_failed.emit(str(e))
+        finally:
+            if repo:
+                repo.close()
+
+    @staticmethod
+    def _count_objects(repo: git.Repo) -> Dict[str, int]:
+        """
+        Get object statistics of a repository.
+
+        Args:
+            repo: Repository to inspect
+
+        Returns:
+            Numeric fields of git count-objects -v, e.g. count (loose objects) and packs
+        """
+        stats: Dict[str, int] = {}
+        for line in repo.git.count_objects("-v").splitlines():
+            key, _, value = line.partition(":")
+            if value.strip().isdigit():
+                stats[key.strip()] = int(value)
+        return stats
+
+    @staticmethod
+    def _cruft_repack_due(repo: git.Repo) -> bool:
+        """
+        Check whether the periodic full repack into a cruft pack is due.
+
+        Args:
+            repo: Repository to inspect
+
+        Returns:
+            True if git supports cruft packs (2.37) and the last full repack is
+            older than MAINTENANCE_CRUFT_DAYS
+        """
+        if repo.git.version_info < (2, 37):
+            return False
+        try:
+            last_run = (pathlib.Path(repo.git_dir) / MAINTENANCE_CRUFT_STAMP).stat().st_mtime
+        except OSError:
+            return True
+        return time.time() - last_run >= MAINTENANCE_CRUFT_DAYS * 24 * 60 * 60
+
+    @PyQt6.QtCore.pyqtSlot(str)
+    def do_maintenance(self, project_path: str) -> None:
+        """
+        Pack loose objects and update the commit-graph if thresholds are exceeded.
+
+        Packing is incremental: unreachable loose objects older than the gc grace
+        period are pruned first, then loose objects and small packs are rolled up
+        geometrically, so large packs are not rewritten. A geometric repack packs
+        younger unreachable objects too, so every MAINTENANCE_CRUFT_DAYS a full
+        repack moves them into a cruft pack, expiring those past the grace period.
+
+        Args:
+            project_path: Path to the git repository
+        """
+        repo = None
+        try:
+            repo = git.Repo(project_path)
+            if (pathlib.Path(repo.git_dir) / "index.lock").exists():
+                logger.debug("Repository busy, skipping maintenance")
                 return
 
-            for remote in repo.remotes:
+            start_time = time.monotonic()
+            before = self._count_objects(repo)
+            report = {
+                "loose_before": before.get("count", 0),
+                "packs_before": before.get("packs", 0),
+                "steps": {}
+            }
+
+            def run_step(name: str, command: Callable[..., str], *args: str) -> None:
+                step_start = time.monotonic()
+                command(*args)
+                report["steps"][name] = time.monotonic() - step_start
+
+            objects_dir = pathlib.Path(repo.git_dir) / "objects"
+            if (report["loose_before"] >= MAINTENANCE_LOOSE_OBJECTS
+                    or report["packs_before"] >= MAINTENANCE_MAX_PACKS):
+                # Before packing, packed objects are not pruned
+                run_step("prune", repo.git.prune, f"--expire={MAINTENANCE_PRUNE_EXPIRE}")
+                if self._cruft_repack_due(repo):
+                    run_step(
+                        "repack", repo.git.repack, "-d", "-q", "--cruft",
+                        f"--cruft-expiration={MAINTENANCE_PRUNE_EXPIRE}"
+                    )
+                    (pathlib.Path(repo.git_dir) / MAINTENANCE_CRUFT_STAMP).touch()
+                else:
+                    run_step("repack", repo.git.repack, "-d", "-q", "--geometric=2")
+                run_step("commit-graph", repo.git.commit_graph, "write", "--reachable", "--split")
+            elif not ((objects_dir / "info" / "commit-graph").exists()
+                      or (objects_dir / "info" / "commit-graphs").exists()):
+                run_step("commit-graph", repo.git.commit_graph, "write", "--reachable", "--split")
+
+            after = self._count_objects(repo)
+
+            report["loose_after"] = after.get("count", 0)
+            report["packs_after"] = after.get("packs", 0)
+            report["seconds"] = time.monotonic() - start_time
+            self.maintenance_finished.emit(report)
+        except Exception as e:
+            logger.error(f"Repository maintenance failed: {e}")
+        finally:
+            if repo:
+                repo.close()
+
+    @staticmethod
+    def commit_changes(repo: git.Repo, changes: Dict[str, str]) -> Optional[str]:
+        """
+        Stage saved files and commit them as one commit.
+
+        Files deleted since they were saved are staged as deletions if tracked
+        and skipped otherwise.
+
+        Args:
+            repo: Repository
+            changes: File name -> "Add" or "Update", used in the commit message
+
+        Returns:
+            New HEAD, None if the files did not differ from HEAD
+        """
+        GitWorker.remove_stale_index_lock(repo)
+        file_names = sorted(changes)
+        work_tree = pathlib.Path(repo.working_tree_dir)
+        tracked = set(
+            repo.git.ls_files("-z", "--", *file_names, env=LITERAL_PATHSPECS).split("\0")
+        )
+        stage = [
+            file_name for file_name in file_names
+            if file_name in tracked or (work_tree / file_name).exists()
+        ]
+        for start in range(0, len(stage), MAX_STATUS_CANDIDATES):
+            repo.git.add(
+                "-A", "--", *stage[start:start + MAX_STATUS_CANDIDATES], env=LITERAL_PATHSPECS
+            )
+
+        if repo.head.is_valid() and not repo.git.diff("--cached", "--name-only"):
+            return None
+
+        if len(changes) == 1:
+            file_name, action = next(iter(changes.items()))
+            message = f"{action} file {file_name}"
+        else:
+            message = f"Update {len(changes)} files\n\n" + "\n".join(
+                f"- {changes[file_name]} {file_name}" for file_name in file_names
+            )
+        return repo.index.commit(message).hexsha
+
+    @staticmethod
+    def remove_stale_index_lock(repo: git.Repo, max_age: float = STALE_INDEX_LOCK_SECONDS) -> bool:
+        """
+        Remove an index.lock left behind by a git process that was killed.
+
+        Every commit fails while the lock exists. The lock is only removed if
+        no process has it open, or where that cannot be checked, if it is
+        older than max_age.
+
+        Args:
+            repo: Repository
+            max_age: Minimum age in seconds without an open check
+
+        Returns:
+            True if a lock was removed
+        """
+        lock = pathlib.Path(repo.git_dir) / "index.lock"
+        try:
+            age = time.time() - lock.stat().st_mtime
+        except OSError:
+            return False
+
+        proc = pathlib.Path("/proc")
+        if proc.is_dir():
+            # Linux: look for an open file descriptor of any process
+            lock_path = str(lock.resolve())
+            for fd_dir in proc.glob("[0-9]*/fd"):
                 try:
-                    logger.debug(f"Pushing to {remote.name} in background...")
-                    remote.push()
-                except git.exc.GitCommandError as e:
-                    logger.warning(f"Git push error for remote {remote.name}: {e}")
-            self.push_finished.emit()
+                    for fd in fd_dir.iterdir():
+                        if os.readlink(fd) == lock_path:
+                            return False
+                except OSError:
+                    continue  # Process ended or belongs to another user
+        elif age < max_age:
+            return False
+
+        try:
+            lock.unlink()
+        except OSError as e:
+            logger.error(f"Error removing stale {lock}: {e}")
+            return False
+        logger.warning(f"Removed stale {lock} ({age:.0f}s old)")
+        return True
+
+    @PyQt6.QtCore.pyqtSlot(str, dict)
+    def do_commit(self, project_path: str, changes: Dict[str, str]) -> None:
+        """
+        Commit saved files in the background.
+
+        Args:
+            project_path: Path to the git repository
+            changes: File name -> "Add" or "Update"
+        """
+        repo = None
+        try:
+            repo = git.Repo(project_path)
+            logger.info(f"Committing {len(changes)} changed files")
+            head = self.commit_changes(repo, changes)
+            self.commit_finished.emit(head or "", list(changes))
+        except Exception as e:
+            logger.error(f"Error committing files {', '.join(changes)}: {e}")
+            self.commit_failed.emit(str(e))
+        finally:
+            if repo:
+                repo.close()
+
+    @staticmethod
+    def status(repo: git.Repo, file_names: Optional[List[str]] = None) -> List[str]:
+        """
+        List changed and untracked files, as git status does.
+
+        Args:
+            repo: Repository to inspect
+            file_names: Limit the check to these paths, None for the whole tree
+
+        Returns:
+            Paths relative to the project
+        """
+        args = ["--porcelain", "-z", "--untracked-files=all"]
+        if file_names is not None:
+            args += ["--", *file_names]
+
+        changed = []
+        fields = iter(repo.git.status(*args, env=LITERAL_PATHSPECS).split("\0"))
+        for field in fields:
+            if not field:
+                continue
+            changed.append(field[3:])
+            if field[0] in "RC":
+                next(fields, None)  # Source of a staged rename or copy
+        return changed
+
+    @staticmethod
+    def reconcile_changes(repo: git.Repo, file_names: Optional[List[str]] = None) -> Optional[str]:
+        """
+        Stage modified, deleted and untracked files in one index write and commit them at once.
+
+        Used to reconcile changes made outside the application, e.g. a restored backup.
+
+        Args:
+            repo: Repository
+            file_names: Limit staging to these changed paths, None for the whole tree
+
+        Returns:
+            New HEAD, None if nothing had to be committed
+        """
+        GitWorker.remove_stale_index_lock(repo)
+        if file_names is None:
+            repo.git.add(A=True)
+        else:
+            for start in range(0, len(file_names), MAX_STATUS_CANDIDATES):
+                repo.git.add(
+                    "-A", "--", *file_names[start:start + MAX_STATUS_CANDIDATES],
+                    env=LITERAL_PATHSPECS
+                )
+        changed = repo.git.diff("--cached", "--name-status", "--no-renames").splitlines()
+        if not changed:
+            return None
+
+        actions = {"A": "Add", "D": "Delete"}
+        lines = []
+        for line in changed[:MAX_COMMIT_MESSAGE_FILES]:
+            status, _, file_name = line.partition("\t")
+            lines.append(f"- {actions.get(status[:1], 'Update')} {file_name}")
+        if len(changed) > MAX_COMMIT_MESSAGE_FILES:
+            lines.append(f"- ... and {len(changed) - MAX_COMMIT_MESSAGE_FILES} more")
+
+        logger.info(f"Committing {len(changed)} files changed outside the application")
+        message = f"Reconcile {len(changed)} changed files\n\n" + "\n".join(lines)
+        return repo.index.commit(message).hexsha
+
+    @PyQt6.QtCore.pyqtSlot(str, object)
+    def do_reconcile(self, project_path: str, candidates: Optional[List[str]]) -> None:
+        """
+        Commit files changed outside the application.
+
+        Runs on the worker like commits and pulls, so it never touches the index
+        while they do.
+
+        Args:
+            project_path: Path to the git repository
+            candidates: Paths that may have changed, None to check the whole tree
+        """
+        repo = None
+        try:
+            repo = git.Repo(project_path)
+            if candidates is None or len(candidates) > MAX_STATUS_CANDIDATES:
+                changed = self.status(repo)
+            elif candidates:
+                changed = self.status(repo, candidates)
+            else:
+                changed = []
+
+            head = None
+            if changed:
+                logger.warning(f"Git repository has {len(changed)} uncommitted changes")
+                head = self.reconcile_changes(repo, changed)
+            self.reconcile_finished.emit(head or "", changed)
+        except Exception as e:
+            logger.error(f"Error checking dirty files: {e}")
+            self.reconcile_failed.emit(str(e))
+        finally:
+            if repo:
+                repo.close()
+
+    @PyQt6.QtCore.pyqtSlot(str)
+    def do_push(self, project_path: str) -> None:
+        """
+        Executes 'git push' for all remotes concurrently.
+
+        Args:
+            project_path: Path to the git repository
+        """
+        try:
+            # Commits made while pushing are not covered by this push
+            repo = git.Repo(project_path)
+            head = repo.head.commit.hexsha if repo.head.is_valid() else ""
+            repo.close()
+
+            results = self._run_on_remotes(
+                project_path, "push", lambda _repo, remote: remote.push().raise_if_error()
+            )
+            if not results:
+                logger.info("No remotes configured, skipping push")
+
+            errors = [
+                f"{remote_name}: {error}"
+                for remote_name, (_result, error) in results.items()
+                if error
+            ]
+
+            if errors:
+                self.push_failed.emit("\n".join(errors))
+            else:
+                self.push_finished.emit(head)
         except Exception as e:
             logger.error(f"Failed to run background push: {e}")
             self.push_failed.emit(str(e))
@@ -82,20 +730,55 @@ class NoteGit(PyQt6.QtCore.QObject):
     """
     Main Git wrapper class with thread-safe operations.
 
+    Saves return at once: they are recorded in the git journal, committed by
+    the worker thread after the quiet window and pushed afterwards. Whatever
+    did not finish before an exit is replayed at the next start.
+
     Signals:
+        trigger_commit: Triggers a background commit (str: project path,
+            dict: file name -> action)
         trigger_push: Triggers a background push operation
         trigger_pull: Triggers a background pull operation
+        trigger_sync: Triggers a background fetch, merging only if remote branches moved
+        files_changed: Emitted when files changed outside the editor (str: project path,
+            list: relative file paths)
+        remote_finished: Emitted per remote after a network operation (str: operation,
+            str: remote, bool: success, float: duration in seconds)
+        trigger_maintenance: Triggers packing and commit-graph maintenance
+        maintenance_finished: Emitted after a maintenance run (str: project path,
+            dict: object counts and step durations)
+        trigger_reconcile: Triggers a check and commit of files changed outside the
+            application (str: project path, list: candidate paths or None for all)
     """
     # Signals to trigger worker in other thread
+    trigger_commit = PyQt6.QtCore.pyqtSignal(str, dict)
     trigger_push = PyQt6.QtCore.pyqtSignal(str)
     trigger_pull = PyQt6.QtCore.pyqtSignal(str)
+    trigger_sync = PyQt6.QtCore.pyqtSignal(str)
+    trigger_maintenance = PyQt6.QtCore.pyqtSignal(str)
+    trigger_reconcile = PyQt6.QtCore.pyqtSignal(str, object)
+    files_changed = PyQt6.QtCore.pyqtSignal(str, list)
+    remote_finished = PyQt6.QtCore.pyqtSignal(str, str, bool, float)
+    maintenance_finished = PyQt6.QtCore.pyqtSignal(str, dict)
 
-    def __init__(self, project_path: str):
+    def __init__(
+            self,
+            project_path: str,
+            commit_delay_ms: int = COMMIT_DELAY_SECONDS * 1000,
+            sync_interval_ms: int = SYNC_INTERVAL_SECONDS * 1000,
+            maintenance_idle_ms: int = MAINTENANCE_IDLE_SECONDS * 1000
+    ):
         """
         Initialize Git wrapper for given project path.
 
         Args:
             project_path: Path to the project directory
+            commit_delay_ms: Quiet window in which changed files are collected
+                into one commit, 0 commits every change immediately
+            sync_interval_ms: Average time between background syncs with the remotes,
+                0 disables periodic syncing
+            maintenance_idle_ms: Quiet time after the last commit or pull before
+                maintenance runs, 0 disables maintenance
 
         Raises:
             ImportError: If repository cannot be initialized
@@ -117,132 +800,586 @@ class NoteGit(PyQt6.QtCore.QObject):
         if not self.repo:
             raise ImportError(f"Failed to initialize git repository at {project_path}")
 
+        # Let git status remember untracked directories that did not change
+        try:
+            if not self.repo.config_reader().has_option("core", "untrackedcache"):
+                with self.repo.config_writer() as writer:
+                    writer.set_value("core", "untrackedCache", "true")
+        except Exception as e:
+            logger.warning(f"Could not enable the untracked cache: {e}")
+
+        # Saved but not yet committed changes (file name -> action), journaled until committed
+        self.journal = gitjournal.GitJournal(self.repo.git_dir)
+        self.pending_changes: Dict[str, str] = {}
+        self.committing_changes: Dict[str, str] = {}
+        self.commit_timer = PyQt6.QtCore.QTimer(self)
+        self.commit_timer.setSingleShot(True)
+        self.commit_timer.setInterval(commit_delay_ms)
+        self.commit_timer.timeout.connect(self.flush_commits)
+
+        # Change detection: a stat snapshot of the work tree, refined by watcher events.
+        # While the watcher covers all text files, its events are the candidates between
+        # snapshot scans. Scans still run after pulls and periodically, the watcher does
+        # not see edits of other files or anything in hidden directories.
+        self.snapshot = treesnapshot.TreeSnapshot(project_path, self.repo.git_dir)
+        self.changed_candidates: Set[str] = set()
+        self.watch_complete = False
+        self.tree_verified = False
+        self.reconcile_in_progress = False
+        self.reconcile_scan: Optional[Dict[str, treesnapshot.FileStat]] = None
+        self.reconcile_candidates: Optional[Set[str]] = None
+        self.reconcile_start = 0.0
+        self.dirty_check_timer = PyQt6.QtCore.QTimer(self)
+        self.dirty_check_timer.setSingleShot(True)
+        self.dirty_check_timer.setInterval(commit_delay_ms)
+        self.dirty_check_timer.timeout.connect(self._check_dirty_git)
+        self.rescan_timer = PyQt6.QtCore.QTimer(self)
+        self.rescan_timer.setInterval(TREE_RESCAN_SECONDS * 1000)
+        self.rescan_timer.timeout.connect(self.rescan_tree)
+        self.rescan_timer.start()
+
+        # Tracked files, valid as long as the index file is unchanged
+        self.tracked_files: Optional[List[str]] = None
+        self.tracked_files_stamp: Optional[Tuple[int, int, int]] = None
+
+        # Periodic sync, started after the initial pull
+        self.sync_interval_ms = sync_interval_ms
+        self.sync_in_progress = False
+        self.sync_timer = PyQt6.QtCore.QTimer(self)
+        self.sync_timer.setSingleShot(True)
+        self.sync_timer.timeout.connect(self.sync)
+
+        # Maintenance runs once the repository was quiet for a while
+        self.maintenance_timer = PyQt6.QtCore.QTimer(self)
+        self.maintenance_timer.setSingleShot(True)
+        self.maintenance_timer.setInterval(maintenance_idle_ms)
+        self.maintenance_timer.timeout.connect(self.maintain)
+
+        # Push requests are collapsed: at most one push runs, one more may be pending
+        self.push_in_progress = False
+        self.push_requested = False
+        self.push_retry_seconds = 0
+        self.push_retry_timer = PyQt6.QtCore.QTimer(self)
+        self.push_retry_timer.setSingleShot(True)
+        self.push_retry_timer.timeout.connect(self._start_push)
+
         # Setup worker thread
         self.git_thread = PyQt6.QtCore.QThread()
         self.git_worker = GitWorker()
         self.git_worker.moveToThread(self.git_thread)
 
         # Connect trigger signals to worker slots
+        self.trigger_commit.connect(self.git_worker.do_commit)
         self.trigger_pull.connect(self.git_worker.do_pull)
         self.trigger_push.connect(self.git_worker.do_push)
+        self.trigger_sync.connect(self.git_worker.do_sync)
+        self.trigger_maintenance.connect(self.git_worker.do_maintenance)
+        self.trigger_reconcile.connect(self.git_worker.do_reconcile)
 
         # Connect result signals
-        self.git_worker.push_finished.connect(
-            lambda: logger.info("Background push finished")
-        )
-        self.git_worker.push_failed.connect(
-            lambda err: logger.error(f"Background push failed: {err}")
-        )
+        self.git_worker.commit_finished.connect(self.on_commit_finished)
+        self.git_worker.commit_failed.connect(self.on_commit_failed)
+        self.git_worker.push_finished.connect(self.on_push_finished)
+        self.git_worker.push_failed.connect(self.on_push_failed)
         self.git_worker.pull_finished.connect(self.on_pull_finished)
-        self.git_worker.pull_failed.connect(
-            lambda err: logger.error(f"Background pull failed: {err}")
+        self.git_worker.files_updated.connect(
+            lambda files: self.files_changed.emit(self.project_path, files)
         )
+        self.git_worker.pull_failed.connect(self.on_pull_failed)
+        self.git_worker.sync_finished.connect(self.on_sync_finished)
+        self.git_worker.sync_failed.connect(self.on_sync_failed)
+        self.git_worker.remote_finished.connect(self.remote_finished)
+        self.git_worker.maintenance_finished.connect(self.on_maintenance_finished)
+        self.git_worker.reconcile_finished.connect(self.on_reconcile_finished)
+        self.git_worker.reconcile_failed.connect(self.on_reconcile_failed)
 
         # Start thread
         self.git_thread.start()
 
+        # Commit and push what did not finish before the last exit, before pulling
+        self._replay_journal()
+
         if self.repo_load_ok:
             logger.info("Repository loaded successfully")
             # Start initial pull asynchronously
             self.trigger_pull.emit(self.project_path)
 
+    def _replay_journal(self) -> None:
+        """Resume commits and pushes recorded in the git journal."""
+        state = self.journal.state()
+        self.journal.compact()
+
+        if state.changes:
+            logger.info(f"{len(state.changes)} uncommitted saves from last session, committing")
+            self.pending_changes.update(state.changes)
+            self.flush_commits()
+
+        legacy_marker = pathlib.Path(self.repo.git_dir) / PUSH_PENDING_MARKER
+        if state.unpushed_head is not None or legacy_marker.exists():
+            logger.info("Unpushed commits from last session, scheduling push")
+            self.push()
+            legacy_marker.unlink(missing_ok=True)
+
     def on_pull_finished(self) -> None:
         """Called when background pull completes."""
         logger.info("Background pull finished")
+        self.tree_verified = False
         self._check_dirty_git()
+        self._schedule_sync()
+        self._schedule_maintenance()
 
-    def _check_dirty_git(self) -> None:
-        """Check if git repository has uncommitted changes and commit them."""
-        if not self.repo:
-            return
-
-        logger.info("Checking if git is dirty")
-        if self.repo.is_dirty():
-            logger.warning("Git repository has uncommitted changes")
-            try:
-                diffs = self.repo.index.diff(None)
-                for diff in diffs:
-                    if diff.a_path:
-                        self.update_file(diff.a_path)
-            except Exception as e:
-                logger.error(f"Error checking dirty files: {e}")
-
-    def init_git(self, project_path: str) -> None:
+    def on_pull_failed(self, error: str) -> None:
         """
-        Initialize a new git repository.
+        Called when background pull fails.
 
         Args:
-            project_path: Path where to initialize the repository
+            error: Error message
         """
-        logger.info(f"Initializing git in path {project_path}")
-        self.repo = git.Repo.init(project_path)
+        logger.error(f"Background pull failed: {error}")
+        self._schedule_sync()
+        self._schedule_maintenance()
 
-        # Copy template .gitignore
-        script_dir = pathlib.Path(__file__).parent.resolve()
-        template_gitignore = script_dir / "data" / "template_gitignore"
-        target_gitignore = pathlib.Path(project_path) / ".gitignore"
+    def _schedule_sync(self) -> None:
+        """Start the timer for the next sync, randomized so clients do not sync in lockstep."""
+        if self.sync_interval_ms <= 0 or not self.repo or not self.repo.remotes:
+            return
 
-        try:
-            if template_gitignore.exists():
-                logger.info(f"Copying gitignore {template_gitignore} -> {target_gitignore}")
-                shutil.copy(template_gitignore, target_gitignore)
-                self.repo.index.add([str(target_gitignore)])
-            else:
-                logger.warning(f"Template gitignore not found at {template_gitignore}")
+        jitter = self.sync_interval_ms * SYNC_JITTER_FRACTION
+        self.sync_timer.start(int(self.sync_interval_ms + random.uniform(-jitter, jitter)))
 
-            self.repo.index.commit("Initial commit")
-            self.repo_load_ok = True
-        except Exception as e:
-            logger.error(f"Error during git initialization: {e}")
-            raise
+    def sync(self) -> None:
+        """Trigger a background sync unless the repository is busy."""
+        busy = (self.sync_in_progress or self.push_in_progress or self.pending_changes
+                or self.committing_changes or self.commit_timer.isActive()
+                or self.reconcile_in_progress)
+        if busy:
+            logger.debug("Repository busy, postponing sync")
+            self._schedule_sync()
+            return
 
-    def add_file(self, file_name: str) -> None:
-        """
-        Add a new file to git and commit.
+        logger.debug("Triggering background sync...")
+        self.sync_in_progress = True
+        self.trigger_sync.emit(self.project_path)
 
-        Args:
-            file_name: Relative path of the file to add
+    def _schedule_maintenance(self) -> None:
+        """(Re)start the idle timer after which maintenance runs."""
+        if self.maintenance_timer.interval() > 0 and self.repo:
+            self.maintenance_timer.start()
+
+    def maintain(self) -> None:
+        """Trigger background maintenance unless the repository is busy."""
+        busy = (self.sync_in_progress or self.push_in_progress or self.pending_changes
+                or self.committing_changes or self.commit_timer.isActive()
+                or self.reconcile_in_progress)
+        if busy:
+            logger.debug("Repository busy, postponing maintenance")
+            self._schedule_maintenance()
+            return
+
+        logger.debug("Triggering background maintenance...")
+        self.trigger_maintenance.emit(self.project_path)
+
+    def on_maintenance_finished(self, report: Dict) -> None:
+        """
+        Called when background maintenance completes.
+
+        Args:
+            report: Object counts before and after, step durations in seconds
+        """
+        steps = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in report["steps"].items())
+        logger.info(
+            f"Maintenance of {self.project_path} took {report['seconds']:.2f}s "
+            f"({steps or 'nothing to do'}): loose objects {report['loose_before']} -> "
+            f"{report['loose_after']}, packs {report['packs_before']} -> {report['packs_after']}"
+        )
+        self.maintenance_finished.emit(self.project_path, report)
+
+    def on_sync_finished(self, merged: bool) -> None:
+        """
+        Called when background sync completes.
+
+        Args:
+            merged: Whether remote changes were merged
+        """
+        self.sync_in_progress = False
+        if merged:
+            logger.info("Background sync merged remote changes")
+            self.invalidate_file_list()
+            self._schedule_maintenance()
+            self.rescan_tree()
+        self._schedule_sync()
+
+    def on_sync_failed(self, error: str) -> None:
+        """
+        Called when background sync fails.
+
+        Args:
+            error: Error message
+        """
+        self.sync_in_progress = False
+        logger.error(f"Background sync failed: {error}")
+        self._schedule_sync()
+
+    def set_watched(self, complete: bool) -> None:
+        """
+        Tell the wrapper whether a file watcher reports all text file changes of its work tree.
+
+        Without a complete watcher every check scans the whole tree, with it only
+        the checks after a pull and the periodic rescans do.
+
+        Args:
+            complete: True while note_changed_paths receives every text file change
+        """
+        self.watch_complete = complete
+        if not complete:
+            self.tree_verified = False
+        elif not self.tree_verified:
+            self.dirty_check_timer.start()
+
+    def rescan_tree(self) -> None:
+        """Check the whole tree against the snapshot, for changes the watcher misses."""
+        self.tree_verified = False
+        self.dirty_check_timer.start()
+
+    def note_changed_paths(self, file_names: Iterable[str]) -> None:
+        """
+        Record files changed on disk and check them once changes settled.
+
+        Args:
+            file_names: Paths relative to the project
+        """
+        self.changed_candidates.update(
+            pathlib.PurePath(file_name).as_posix() for file_name in file_names
+        )
+        if self.changed_candidates:
+            self.dirty_check_timer.start()
+
+    def _check_dirty_git(self) -> None:
+        """
+        Commit files changed outside the application.
+
+        Candidates come from the file watcher or from comparing a fresh scan
+        with the persisted snapshot. Only they are passed to git status, which
+        compares contents where stat data differs. Without a snapshot git status
+        checks the whole tree, helped by the untracked cache. Status and commit
+        run on the worker thread, after any pull, sync or commit queued there.
         """
         if not self.repo:
-            logger.error("Repository not initialized")
             return
 
-        logger.info(f"Adding file {file_name} to git")
+        busy = (self.pending_changes or self.committing_changes or self.commit_timer.isActive()
+                or self.sync_in_progress or self.reconcile_in_progress)
+        if busy:
+            # Own saves or remote changes are still being handled, check once they are done
+            self.dirty_check_timer.start()
+            return
+
+        self.reconcile_start = time.monotonic()
+        candidates: Optional[Set[str]] = set(self.changed_candidates)
+        self.changed_candidates.clear()
+
+        scan = None
+        if not (self.tree_verified and self.watch_complete):
+            scan = self.snapshot.scan()
+            candidates = (self.snapshot.diff(scan) | candidates) if self.snapshot.load() else None
+
+        self.reconcile_scan = scan
+        self.reconcile_candidates = candidates
+        if candidates is not None and not candidates:
+            self._finish_reconcile(0)
+            return
+
+        self.reconcile_in_progress = True
         try:
-            self.repo.index.add([file_name])
-            self.repo.index.commit(f"Add file {file_name}")
+            self.journal.record_commit_start(())
+        except OSError as e:
+            logger.warning(f"Could not journal reconcile start: {e}")
+        self.trigger_reconcile.emit(
+            self.project_path, None if candidates is None else sorted(candidates)
+        )
+
+    def on_reconcile_finished(self, head: str, changed: List[str]) -> None:
+        """
+        Called when the worker checked and committed changes made outside the application.
+
+        Args:
+            head: New HEAD, empty if nothing was committed
+            changed: Files found changed
+        """
+        self.reconcile_in_progress = False
+        try:
+            self.journal.record_commit(head or None, ())
+        except OSError as e:
+            logger.warning(f"Could not journal reconcile: {e}")
+        if head:
+            self.invalidate_file_list()
+            self._schedule_maintenance()
             self.push()
+        self._finish_reconcile(len(changed))
+
+    def on_reconcile_failed(self, error: str) -> None:
+        """
+        Called when checking for changes made outside the application failed.
+
+        Args:
+            error: Error message
+        """
+        self.reconcile_in_progress = False
+        logger.error(f"Reconcile failed, checking again with the next change: {error}")
+        self.changed_candidates.update(self.reconcile_candidates or ())
+        self.reconcile_scan = None
+        self.reconcile_candidates = None
+
+    def _finish_reconcile(self, changed_count: int) -> None:
+        """
+        Record the checked state in the snapshot.
+
+        Args:
+            changed_count: Number of files found changed
+        """
+        scan, candidates = self.reconcile_scan, self.reconcile_candidates
+        self.reconcile_scan = None
+        self.reconcile_candidates = None
+        if scan is not None:
+            self.snapshot.replace(scan)
+            self.snapshot.save()
+        elif candidates:
+            self.snapshot.update(candidates)
+        self.tree_verified = True
+
+        checked = "all" if candidates is None else len(candidates)
+        logger.info(
+            f"Checked {checked} candidate files for changes in "
+            f"{time.monotonic() - self.reconcile_start:.3f}s, {changed_count} changed"
+        )
+
+    def init_git(self, project_path: str) -> None:
+        """
+        Initialize a new git repository.
+
+        Args:
+            project_path: Path where to initialize the repository
+        """
+        logger.info(f"Initializing git in path {project_path}")
+        self.repo = git.Repo.init(project_path)
+
+        # Copy template .gitignore
+        script_dir = pathlib.Path(__file__).parent.resolve()
+        template_gitignore = script_dir / "data" / "template_gitignore"
+        target_gitignore = pathlib.Path(project_path) / ".gitignore"
+
+        try:
+            if template_gitignore.exists():
+                logger.info(f"Copying gitignore {template_gitignore} -> {target_gitignore}")
+                shutil.copy(template_gitignore, target_gitignore)
+                self.repo.index.add([str(target_gitignore)])
+            else:
+                logger.warning(f"Template gitignore not found at {template_gitignore}")
+
+            self.repo.index.commit("Initial commit")
+            self.repo_load_ok = True
         except Exception as e:
-            logger.error(f"Error adding file {file_name}: {e}")
+            logger.error(f"Error during git initialization: {e}")
+            raise
+
+    def add_file(self, file_name: str) -> None:
+        """
+        Add a new file to git. The commit follows after the quiet window.
+
+        Args:
+            file_name: Relative path of the file to add
+        """
+        logger.info(f"Adding file {file_name} to git")
+        self._stage_file(file_name, "Add")
 
     def update_file(self, file_name: str) -> None:
         """
-        Update an existing file in git and commit.
+        Update an existing file in git. The commit follows after the quiet window.
 
         Args:
             file_name: Relative path of the file to update
         """
+        logger.info(f"Updating file {file_name}")
+        self._stage_file(file_name, "Update")
+
+    def _stage_file(self, file_name: str, action: str) -> None:
+        """
+        Journal a saved file and (re)start the commit timer.
+
+        Args:
+            file_name: Relative path of the file
+            action: "Add" or "Update", used in the commit message
+        """
         if not self.repo:
             logger.error("Repository not initialized")
             return
 
-        logger.info(f"Updating file {file_name}")
+        file_name = pathlib.PurePath(file_name).as_posix()
         try:
-            self.repo.index.add([file_name])
-            self.repo.index.commit(f"Update file {file_name}")
+            self.journal.record_change(file_name, action)
+        except OSError as e:
+            logger.warning(f"Could not journal change of {file_name}: {e}")
+
+        # A file added and then updated in the same window is still an addition
+        self.pending_changes.setdefault(file_name, action)
+
+        if self.commit_timer.interval() <= 0:
+            self.flush_commits()
+        else:
+            self.commit_timer.start()
+
+    def flush_commits(self) -> None:
+        """Hand all changes collected so far to the worker thread as one commit."""
+        self.commit_timer.stop()
+
+        if not self.pending_changes or not self.repo:
+            return
+        if self.committing_changes:
+            logger.debug("Commit running, collecting changes for the next one")
+            return
+
+        self.committing_changes = self.pending_changes
+        self.pending_changes = {}
+        try:
+            # Requests the push of the new HEAD even if the result never arrives
+            self.journal.record_commit_start(self.committing_changes)
+        except OSError as e:
+            logger.warning(f"Could not journal commit start: {e}")
+        self.trigger_commit.emit(self.project_path, dict(self.committing_changes))
+
+    def on_commit_finished(self, head: str, file_names: List[str]) -> None:
+        """
+        Called when a background commit completes.
+
+        Args:
+            head: New HEAD, empty if the files did not need a commit
+            file_names: Files handled by the commit
+        """
+        self.committing_changes = {}
+
+        # Files saved again while committing stay journaled for the next commit
+        try:
+            self.journal.record_commit(
+                head or None,
+                [file_name for file_name in file_names if file_name not in self.pending_changes]
+            )
+        except OSError as e:
+            logger.warning(f"Could not journal commit: {e}")
+
+        if head:
+            self.invalidate_file_list()
+            self._schedule_maintenance()
             self.push()
-        except Exception as e:
-            logger.error(f"Error updating file {file_name}: {e}")
+
+        if self.pending_changes and not self.commit_timer.isActive():
+            self.flush_commits()
+
+    def on_commit_failed(self, error: str) -> None:
+        """
+        Called when a background commit fails, the changes are retried later.
+
+        Args:
+            error: Error message
+        """
+        changes = self.committing_changes
+        self.committing_changes = {}
+        for file_name, action in self.pending_changes.items():
+            changes.setdefault(file_name, action)
+        self.pending_changes = changes
+
+        logger.error(f"Commit failed, retrying in {PUSH_RETRY_MIN_SECONDS} s: {error}")
+        PyQt6.QtCore.QTimer.singleShot(PUSH_RETRY_MIN_SECONDS * 1000, self.flush_commits)
 
     def push(self) -> None:
-        """Trigger background push operation."""
+        """
+        Request a background push.
+
+        Requests arriving while a push runs or waits for a retry are merged
+        into a single follow-up push of the then current HEAD.
+        """
+        try:
+            head = self.repo.head.commit.hexsha if self.repo.head.is_valid() else None
+            self.journal.record_push(head)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not journal push request: {e}")
+
+        self.push_requested = True
+        if self.push_in_progress or self.push_retry_timer.isActive():
+            logger.debug("Push already scheduled, merging request")
+            return
+        self._start_push()
+
+    def _start_push(self) -> None:
+        """Hand the pending push request to the worker thread."""
+        if not self.push_requested or self.push_in_progress:
+            return
+
         logger.debug("Triggering background push...")
+        self.push_requested = False
+        self.push_in_progress = True
         self.trigger_push.emit(self.project_path)
 
+    def on_push_finished(self, head: str) -> None:
+        """
+        Called when background push completes.
+
+        Args:
+            head: HEAD that was pushed
+        """
+        logger.info("Background push finished")
+        self.push_in_progress = False
+        self.push_retry_seconds = 0
+
+        try:
+            self.journal.record_pushed(head or None)
+        except OSError as e:
+            logger.warning(f"Could not journal push: {e}")
+
+        if self.push_requested:
+            self._start_push()
+            return
+
+        self.journal.compact()
+
+    def on_push_failed(self, error: str) -> None:
+        """
+        Called when background push fails, schedules a retry with exponential backoff.
+
+        Args:
+            error: Error message
+        """
+        self.push_in_progress = False
+        self.push_requested = True
+        self.push_retry_seconds = min(
+            max(self.push_retry_seconds * 2, PUSH_RETRY_MIN_SECONDS), PUSH_RETRY_MAX_SECONDS
+        )
+        logger.error(f"Background push failed, retrying in {self.push_retry_seconds} s: {error}")
+        self.push_retry_timer.start(self.push_retry_seconds * 1000)
+
+    def _index_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """
+        Get the stat data of the index file.
+
+        Returns:
+            Tuple of (mtime_ns, size, inode) or None if there is no index
+        """
+        try:
+            index_stat = (pathlib.Path(self.repo.git_dir) / "index").stat()
+        except OSError:
+            return None
+        return index_stat.st_mtime_ns, index_stat.st_size, index_stat.st_ino
+
+    def invalidate_file_list(self) -> None:
+        """Drop the cached list of tracked files."""
+        self.tracked_files = None
+        self.tracked_files_stamp = None
+
     def list_all_files(self) -> List[str]:
         """
         List all files tracked by git.
 
+        The list is cached until the index file changes.
+
         Returns:
             List of file paths relative to repository root
         """
@@ -250,63 +1387,561 @@ class NoteGit(PyQt6.QtCore.QObject):
             logger.error("Repository not initialized")
             return []
 
+        stamp = self._index_stamp()
+        if self.tracked_files is not None and stamp is not None and stamp == self.tracked_files_stamp:
+            return list(self.tracked_files)
+
         try:
-            files = self.repo.git.ls_files().split('\n')
-            return [f for f in files if f]  # Filter empty strings
+            self.tracked_files = self._read_index_paths()
         except Exception as e:
-            logger.error(f"Error listing files: {e}")
+            # GitPython cannot read index version 4 or a sparse index
+            logger.warning(f"Cannot parse the git index, using git ls-files: {e}")
+            try:
+                output = self.repo.git.ls_files("-z")
+            except Exception as e:
+                logger.error(f"Error listing files: {e}")
+                return []
+            self.tracked_files = sorted(set(filter(None, output.split("\0"))))
+
+        self.tracked_files_stamp = stamp
+        return list(self.tracked_files)
+
+    def _read_index_paths(self) -> List[str]:
+        """
+        Parse the index in-process instead of forking git ls-files.
+
+        Returns:
+            Sorted file paths relative to repository root
+
+        Raises:
+            Exception: If GitPython cannot read the index
+        """
+        index = git.IndexFile(self.repo)
+        paths = set()
+        for (path, _stage), entry in index.entries.items():
+            if stat.S_ISDIR(entry.mode):
+                raise ValueError(f"Sparse directory entry {path}")
+            paths.add(path)
+        return sorted(paths)
+
+    def _read_objects(self, reader: Callable[[], T]) -> T:
+        """
+        Run a read operation against the object database.
+
+        Objects are read through the long-lived git cat-file --batch processes
+        GitPython keeps per repository. If one of them died, they are restarted
+        and the operation is retried once.
+
+        Args:
+            reader: Function reading from self.repo
+
+        Returns:
+            Result of the reader
+        """
+        try:
+            return reader()
+        except (ValueError, OSError, git.exc.GitCommandError) as e:
+            logger.warning(f"Object reader failed, restarting git cat-file: {e}")
+            self.repo.git.clear_cache()
+            return reader()
+
+    def file_history(
+            self,
+            file_name: str,
+            max_count: int = FILE_HISTORY_MAX_COUNT
+    ) -> List[Tuple[str, str, str, str, str]]:
+        """
+        List the commits that changed a file, following renames.
+
+        Args:
+            file_name: Path relative to repository root
+            max_count: Maximum number of commits
+
+        Returns:
+            List of (sha, date, author, summary, path of the file in that commit)
+        """
+        if not self.repo_load_ok or not self.repo or not self.repo.head.is_valid():
             return []
 
-    def get_commit_log(self, max_count: int = 50) -> str:
+        output = self.repo.git.log(
+            "--follow",
+            f"-n{max_count}",
+            "--format=%x1e%H%x1f%ad%x1f%an%x1f%s",
+            "--date=format:%Y-%m-%d %H:%M",
+            "--name-only",
+            "--",
+            file_name,
+            env=LITERAL_PATHSPECS
+        )
+
+        history = []
+        for record in output.split("\x1e")[1:]:
+            header, _, names = record.partition("\n")
+            sha, date, author, summary = header.split("\x1f", 3)
+            paths = [name for name in names.splitlines() if name]
+            history.append((sha, date, author, summary, paths[-1] if paths else file_name))
+        return history
+
+    def read_revision(self, commit_sha: str, file_name: str) -> git.Blob:
         """
-        Get formatted commit log.
+        Get the blob of a file in a commit from the object database, without checkout.
 
         Args:
-            max_count: Maximum number of commits to retrieve
+            commit_sha: SHA of the commit
+            file_name: Path of the file in that commit
 
         Returns:
-            Formatted string with commit history
+            Blob object, its content is read lazily through data_stream
+
+        Raises:
+            KeyError: If the file does not exist in the commit
         """
-        if not self.repo_load_ok or not self.repo:
-            return "Git repository not loaded."
+        return self._read_objects(lambda: self.repo.commit(commit_sha).tree / file_name)
 
-        try:
-            log_format = "%h %ad | %s (%an)"
-            date_format = "%Y-%m-%d %H:%M"
-            log_string = self.repo.git.log(
-                f"--pretty=format:{log_format}",
-                f"--date=format:{date_format}",
-                f"-n{max_count}"
-            )
-            return log_string
-        except Exception as e:
-            logger.error(f"Error retrieving git log: {e}")
-            return f"Error retrieving log:\n{e}"
+    def read_head_file(self, file_name: str) -> git.Blob:
+        """
+        Get the committed version of a file that is not in the work tree.
+
+        In a partial clone or sparse checkout tracked files may be missing on
+        disk. Their content is read from the object database, which fetches
+        the blob from the remote on first access.
+
+        Args:
+            file_name: Path of the file relative to the project
+
+        Returns:
+            Blob object, its content is read lazily through data_stream
+
+        Raises:
+            KeyError: If the file is not tracked
+        """
+        return self.read_revision("HEAD", file_name)
 
     def cleanup(self) -> None:
         """
         Clean shutdown of git thread. Must be called when closing the application.
         """
+        self.stop()
+        self.wait_stopped()
+
+    def stop(self) -> None:
+        """
+        Stop timers and ask the git thread to quit, without waiting for it.
+
+        Must be called on the thread owning this object, finish the shutdown
+        with wait_stopped().
+        """
+        self.commit_timer.stop()
+        self.push_retry_timer.stop()
+        self.sync_timer.stop()
+        self.maintenance_timer.stop()
+        self.dirty_check_timer.stop()
+        self.rescan_timer.stop()
+        self.snapshot.save()
+
         logger.info("Shutting down Git thread...")
 
         # Disconnect all signals to prevent further operations
         try:
+            self.trigger_commit.disconnect()
             self.trigger_pull.disconnect()
             self.trigger_push.disconnect()
+            self.trigger_sync.disconnect()
+            self.trigger_maintenance.disconnect()
+            self.trigger_reconcile.disconnect()
         except TypeError:
             pass  # Already disconnected
 
+        # Results arriving now are handled by wait_stopped(), possibly on another thread
+        for signal in (
+                self.git_worker.commit_finished, self.git_worker.commit_failed,
+                self.git_worker.push_finished, self.git_worker.push_failed,
+                self.git_worker.pull_finished, self.git_worker.files_updated,
+                self.git_worker.pull_failed, self.git_worker.sync_finished,
+                self.git_worker.sync_failed, self.git_worker.remote_finished,
+                self.git_worker.maintenance_finished, self.git_worker.reconcile_finished,
+                self.git_worker.reconcile_failed
+        ):
+            try:
+                signal.disconnect()
+            except TypeError:
+                pass  # Already disconnected
+
         # Request thread to quit
         self.git_thread.quit()
 
+    def wait_stopped(self) -> None:
+        """
+        Wait for the git thread after stop(), commit what is left and close the repository.
+
+        May run on any thread, it blocks for up to a minute if a commit or a
+        network operation is still running.
+        """
         # Wait with timeout
-        if not self.git_thread.wait(5000):  # 5 seconds timeout
+        stopped = self.git_thread.wait(5000)  # 5 seconds timeout
+        if not stopped and self.committing_changes:
+            # Terminating a commit leaves index.lock behind, give it more time
+            logger.info("Waiting for the running commit...")
+            stopped = self.git_thread.wait(COMMIT_SHUTDOWN_WAIT_SECONDS * 1000)
+        if not stopped:
             logger.warning("Git thread did not stop gracefully, terminating...")
             self.git_thread.terminate()
             self.git_thread.wait(1000)  # Wait 1 more second after terminate
+            if self.repo:
+                GitWorker.remove_stale_index_lock(self.repo)
+
+        # Commit changes still waiting for the quiet window, or whose commit was cut off
+        self._commit_remaining()
+
+        # Stop the persistent cat-file processes
+        if self.repo:
+            self.repo.close()
 
         logger.info("Git thread shut down successfully")
 
+    def _commit_remaining(self) -> None:
+        """
+        Commit journaled changes on the calling thread once the worker stopped.
+
+        The push is left to the next start. Changes that cannot be committed
+        stay in the journal. A commit the worker finished after its result
+        could no longer be delivered leaves nothing to commit, so its HEAD is
+        recorded for the push as well.
+        """
+        in_flight = bool(self.committing_changes)
+        changes = self.committing_changes
+        for file_name, action in self.pending_changes.items():
+            changes.setdefault(file_name, action)
+        self.committing_changes = {}
+        self.pending_changes = {}
+        if not changes or not self.repo:
+            return
+
+        try:
+            head = GitWorker.commit_changes(self.repo, changes)
+            self.journal.record_commit(head, changes)
+            if not head and in_flight and self.repo.head.is_valid():
+                head = self.repo.head.commit.hexsha
+            if head:
+                self.journal.record_push(head)
+        except Exception as e:
+            logger.error(f"Error committing files {', '.join(changes)}, kept in journal: {e}")
+
+
+class CloneProgress(git.RemoteProgress):
+    """
+    Forwards clone progress to a callback.
+    """
+
+    def __init__(self, callback: Callable[[str, int], None]):
+        """
+        Initialize progress receiver.
+
+        Args:
+            callback: Called with a description and the percentage done
+        """
+        super().__init__()
+        self.callback = callback
+
+    def update(self, op_code, cur_count, max_count=None, message="") -> None:
+        """Report the progress of the current stage."""
+        line = (self._cur_line or "").removeprefix("remote:").strip()
+        stage = line.split(":")[0]
+        percent = int(100 * cur_count / max_count) if max_count else 0
+        self.callback(stage, percent)
+
+
+class CloneWorker(PyQt6.QtCore.QObject):
+    """
+    Worker that clones a project in a separate thread.
+
+    Signals:
+        progress: Emitted while cloning (str: stage, int: percentage of the stage)
+        clone_finished: Emitted when done (str: project path)
+        clone_failed: Emitted when cloning failed (str: error)
+    """
+    progress = PyQt6.QtCore.pyqtSignal(str, int)
+    clone_finished = PyQt6.QtCore.pyqtSignal(str)
+    clone_failed = PyQt6.QtCore.pyqtSignal(str)
+
+    def __init__(self, url: str, target_path: str, folders: Optional[List[str]] = None):
+        """
+        Initialize worker.
+
+        Args:
+            url: URL of the remote repository
+            target_path: Directory to clone into
+            folders: Folders to check out, None or empty for all
+        """
+        super().__init__()
+        self.url = url
+        self.target_path = target_path
+        self.folders = folders
+
+    @PyQt6.QtCore.pyqtSlot()
+    def run(self) -> None:
+        """Clone the project and report the result."""
+        try:
+            repo = clone_project(
+                self.url, self.target_path, self.folders, CloneProgress(self.progress.emit)
+            )
+            repo.close()
+            self.clone_finished.emit(self.target_path)
+        except Exception as e:
+            logger.error(f"Cloning {self.url} failed: {e}")
+            self.clone_failed.emit(str(e))
+
+
+class CommitLogLoader(PyQt6.QtCore.QObject):
+    """
+    Worker that reads the commit history page by page in a separate thread.
+
+    The history is streamed from git rev-list, so the first page is available
+    immediately regardless of the repository size.
+
+    Signals:
+        page_loaded: Emitted with the next page (int: generation, list: tuples of
+            (sha, date, author, summary), bool: more commits available)
+        load_failed: Emitted when reading failed (int: generation, str: error)
+    """
+    page_loaded = PyQt6.QtCore.pyqtSignal(int, list, bool)
+    load_failed = PyQt6.QtCore.pyqtSignal(int, str)
+
+    def __init__(self, project_path: str):
+        """
+        Initialize loader.
+
+        Args:
+            project_path: Path to the git repository
+        """
+        super().__init__()
+        self.project_path = project_path
+        self.repo: Optional[git.Repo] = None
+        self.commits: Optional[Iterator[git.Commit]] = None
+        self.generation = 0
+
+    @PyQt6.QtCore.pyqtSlot(int, str, str, str)
+    def start(self, generation: int, author: str, path: str, message: str) -> None:
+        """
+        Start reading the history with new filters, discarding the previous reader.
+
+        Args:
+            generation: Counter identifying this request
+            author: Only commits by matching authors, empty for all
+            path: Only commits touching this path, empty for all
+            message: Only commits with matching messages, empty for all
+        """
+        self.stop()
+        self.generation = generation
+        try:
+            self.repo = git.Repo(self.project_path)
+            if not self.repo.head.is_valid():
+                self.commits = iter(())
+                return
+
+            kwargs = {"regexp_ignore_case": True}
+            if author:
+                kwargs["author"] = author
+            if message:
+                kwargs["grep"] = message
+            self.commits = self.repo.iter_commits("HEAD", paths=path or "", **kwargs)
+        except Exception as e:
+            logger.error(f"Could not read commit history: {e}")
+            self.load_failed.emit(generation, str(e))
+
+    @PyQt6.QtCore.pyqtSlot(int, int)
+    def fetch(self, generation: int, count: int) -> None:
+        """
+        Read the next page of commits.
+
+        Args:
+            generation: Counter of the request the page belongs to
+            count: Maximum number of commits
+        """
+        if generation != self.generation or self.commits is None:
+            return
+
+        rows = []
+        try:
+            for commit in self.commits:
+                rows.append((
+                    commit.hexsha,
+                    f"{commit.authored_datetime:%Y-%m-%d %H:%M}",
+                    commit.author.name,
+                    commit.summary
+                ))
+                if len(rows) >= count:
+                    break
+        except Exception as e:
+            logger.error(f"Could not read commit history: {e}")
+            self.load_failed.emit(generation, str(e))
+            return
+
+        has_more = len(rows) >= count
+        if not has_more:
+            self.commits = None
+        self.page_loaded.emit(generation, rows, has_more)
+
+    @PyQt6.QtCore.pyqtSlot()
+    def stop(self) -> None:
+        """Discard the current reader and its git processes."""
+        if self.commits is not None and hasattr(self.commits, "close"):
+            self.commits.close()
+        self.commits = None
+        if self.repo:
+            self.repo.close()
+            self.repo = None
+
+
+class NoteGitPool(PyQt6.QtCore.QObject):
+    """
+    Keeps git wrappers of recently used projects alive for instant project switching.
+
+    The pool is bounded by size, the least recently used inactive wrapper is shut
+    down first. Inactive wrappers are also shut down after an idle timeout.
+    Evicted wrappers finish their shutdown on a background thread, waiting for
+    their git thread would block the GUI.
+    """
+
+    def __init__(
+            self,
+            factory: Callable[[str], NoteGit],
+            max_size: int = POOL_MAX_SIZE,
+            idle_seconds: int = POOL_IDLE_SECONDS,
+            parent: Optional[PyQt6.QtCore.QObject] = None
+    ):
+        """
+        Initialize pool.
+
+        Args:
+            factory: Function creating the git wrapper for a project path
+            max_size: Maximum number of live wrappers
+            idle_seconds: Time after which an inactive wrapper is shut down
+            parent: Parent object
+        """
+        super().__init__(parent)
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self.idle_seconds = idle_seconds
+        self.instances: Dict[str, NoteGit] = {}
+        self.last_used: Dict[str, float] = {}
+        self.active_path: Optional[str] = None
+        self.closing: Dict[str, concurrent.futures.Future] = {}
+        self.shutdown_executor = concurrent.futures.ThreadPoolExecutor(
+            thread_name_prefix="notegit-shutdown"
+        )
+
+        self.idle_timer = PyQt6.QtCore.QTimer(self)
+        self.idle_timer.setInterval(POOL_IDLE_CHECK_SECONDS * 1000)
+        self.idle_timer.timeout.connect(self.evict_idle)
+        self.idle_timer.start()
+
+    @staticmethod
+    def _key(project_path: str) -> str:
+        """
+        Get the pool key of a project path.
+
+        Args:
+            project_path: Path to the project directory
+
+        Returns:
+            Normalized absolute path
+        """
+        return str(pathlib.Path(project_path).resolve())
+
+    def activate(self, project_path: str) -> NoteGit:
+        """
+        Get the git wrapper of a project, creating it if necessary, and mark it active.
+
+        Changes of the previously active project are committed before switching.
+
+        Args:
+            project_path: Path to the project directory
+
+        Returns:
+            Git wrapper of the project
+
+        Raises:
+            ImportError: If the repository cannot be initialized
+        """
+        key = self._key(project_path)
+
+        previous = self.instances.get(self.active_path) if self.active_path else None
+        if previous and self.active_path != key:
+            previous.flush_commits()
+            self.last_used[self.active_path] = time.monotonic()
+
+        repo = self.instances.get(key)
+        if repo:
+            logger.info(f"Reusing git wrapper for {key}")
+        else:
+            closing = self.closing.pop(key, None)
+            if closing:
+                # Two wrappers must not work on the same repository
+                logger.info(f"Waiting for the previous git wrapper of {key} to shut down")
+                concurrent.futures.wait([closing])
+            repo = self.factory(project_path)
+            self.instances[key] = repo
+
+        self.active_path = key
+        self.last_used[key] = time.monotonic()
+        self._evict_overflow()
+        return repo
+
+    def _evict_overflow(self) -> None:
+        """Shut down least recently used inactive wrappers above the size limit."""
+        while len(self.instances) > self.max_size:
+            candidates = [key for key in self.instances if key != self.active_path]
+            if not candidates:
+                return
+            self._evict(min(candidates, key=lambda k: self.last_used.get(k, 0.0)))
+
+    def evict_idle(self) -> None:
+        """Shut down inactive wrappers that were not used within the idle timeout."""
+        now = time.monotonic()
+        for key in list(self.instances):
+            if key != self.active_path and now - self.last_used.get(key, now) > self.idle_seconds:
+                self._evict(key)
+
+    def _evict(self, key: str) -> None:
+        """
+        Remove a wrapper and shut it down in the background.
+
+        Args:
+            key: Pool key of the project
+        """
+        logger.info(f"Shutting down idle git wrapper for {key}")
+        repo = self.instances.pop(key)
+        self.last_used.pop(key, None)
+        repo.stop()
+        self.closing = {k: f for k, f in self.closing.items() if not f.done()}
+        self.closing[key] = self.shutdown_executor.submit(self._finish_shutdown, key, repo)
+
+    @staticmethod
+    def _finish_shutdown(key: str, repo: NoteGit) -> None:
+        """
+        Complete the shutdown of a stopped wrapper. Runs on a background thread.
+
+        Args:
+            key: Pool key of the project
+            repo: Stopped git wrapper
+        """
+        try:
+            repo.wait_stopped()
+        except Exception as e:
+            logger.error(f"Error shutting down git wrapper for {key}: {e}")
+        repo.deleteLater()
+
+    def cleanup(self) -> None:
+        """Shut down all wrappers. Must be called when closing the application."""
+        self.idle_timer.stop()
+        for key in list(self.instances):
+            self._evict(key)
+        self.active_path = None
+        # Wrappers shut down in parallel, the application must not exit before they are done
+        self.shutdown_executor.shutdown(wait=True)
+        self.closing.clear()
+
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
@@ -5,22 +5,69 @@
 Helper functions for AsciiDoc conversion and file searching.
 """
 import asciidoc
+import collections
 import logging
 import io
 import re
 import jaro
 import os
 import time
-from typing import List, Tuple, Dict, Optional
+from typing import Callable, List, Tuple, Dict, Optional, Set
 
 # Configuration
 MAX_FILE_KB = 300
 FILE_MATCH_WEIGHT = 1.5
 CACHE_EXPIRY_SECONDS = 300  # 5 minutes
+REVISION_CACHE_ENTRIES = 100
+RENDER_CACHE_ENTRIES = 500
+RENDER_CACHE_MB = 128
+
+INCLUDE_PATTERN = re.compile(r"(?m)^(include1?)::(\S+?)\[(.*?)\]$")
 
 logger = logging.getLogger(__name__)
 
 
+def _normalize_path(file_path: str) -> str:
+    """Normalize a path for use as cache key."""
+    return os.path.normpath(os.path.abspath(file_path))
+
+
+def _resolve_include(target: str, base_dir: str) -> Optional[str]:
+    """
+    Resolve an include target relative to the including file's directory.
+
+    Args:
+        target: Target of the include macro
+        base_dir: Directory of the including file
+
+    Returns:
+        Absolute path or None if the target uses attribute references
+    """
+    if "{" in target:
+        return None
+    target = os.path.expanduser(target)
+    return _normalize_path(os.path.join(base_dir, target))
+
+
+def find_includes(text: str, base_dir: str) -> List[str]:
+    """
+    Find all files directly included by AsciiDoc text.
+
+    Args:
+        text: AsciiDoc formatted text
+        base_dir: Directory of the file the text belongs to
+
+    Returns:
+        List of absolute paths of included files
+    """
+    includes = []
+    for _name, target, _attrs in INCLUDE_PATTERN.findall(text):
+        path = _resolve_include(target, base_dir)
+        if path and path not in includes:
+            includes.append(path)
+    return includes
+
+
 class SearchIndex:
     """
     Cache for file contents to improve search performance.
@@ -76,6 +123,18 @@ class SearchIndex:
         self.cache_time.clear()
         logger.info("Search cache cleared")
 
+    def invalidate(self, file_paths: List[str]) -> None:
+        """
+        Drop the cached contents of changed files.
+
+        Args:
+            file_paths: Paths to the files
+        """
+        changed = {_normalize_path(file_path) for file_path in file_paths}
+        for key in [key for key in self.cache if _normalize_path(key) in changed]:
+            self.cache.pop(key, None)
+            self.cache_time.pop(key, None)
+
     def remove_expired(self) -> None:
         """Remove expired entries from cache."""
         current_time = time.time()
@@ -92,16 +151,231 @@ class SearchIndex:
             logger.info(f"Removed {len(expired_keys)} expired cache entries")
 
 
+class RenderCache:
+    """
+    Cache for rendered HTML pages, validated against file modification data.
+
+    Every page records the files it includes, so that invalidating an included
+    file also drops exactly the pages depending on it. The least recently used
+    pages are dropped when the entry count or total size exceeds the limits,
+    the include dependencies are kept.
+    """
+
+    def __init__(self, max_entries: int = RENDER_CACHE_ENTRIES, max_mb: int = RENDER_CACHE_MB):
+        """
+        Initialize render cache.
+
+        Args:
+            max_entries: Maximum number of cached pages
+            max_mb: Maximum total size of cached HTML in megabytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_mb * 1024 * 1024
+        self.cache: "collections.OrderedDict[str, str]" = collections.OrderedDict()
+        self.cache_sizes: Dict[str, int] = {}
+        self.total_bytes = 0
+        self.cache_stamps: Dict[str, Dict[str, Optional[Tuple[int, int]]]] = {}
+        self.dependencies: Dict[str, Set[str]] = {}
+        self.dependents: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def file_stamp(file_path: str) -> Optional[Tuple[int, int]]:
+        """
+        Get the (mtime_ns, size) stamp used to validate cache entries.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Stamp tuple or None if the file cannot be accessed
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, file_path: str) -> Optional[str]:
+        """
+        Get rendered HTML for a file if the cached entry is still valid.
+
+        Args:
+            file_path: Path to the source file
+
+        Returns:
+            Cached HTML or None if the page or one of its includes changed
+        """
+        key = _normalize_path(file_path)
+        if key not in self.cache:
+            return None
+
+        for path, stamp in self.cache_stamps.get(key, {}).items():
+            if self.file_stamp(path) != stamp:
+                logger.debug(f"Render cache entry for {key} outdated by {path}")
+                self.invalidate(path)
+                return None
+
+        self.cache.move_to_end(key)
+        return self.cache[key]
+
+    def put(
+            self,
+            file_path: str,
+            html: str,
+            stamp: Optional[Tuple[int, int]] = None
+    ) -> None:
+        """
+        Store rendered HTML for a file.
+
+        Args:
+            file_path: Path to the source file
+            html: Rendered HTML
+            stamp: File stamp taken before reading the source, defaults to current stamp
+        """
+        key = _normalize_path(file_path)
+        if stamp is None:
+            stamp = self.file_stamp(key)
+        if stamp is None:
+            return
+
+        size = len(html.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        stamps = {key: stamp}
+        for dependency in self.all_dependencies(key):
+            stamps[dependency] = self.file_stamp(dependency)
+
+        self._drop(key)
+        self.cache[key] = html
+        self.cache_sizes[key] = size
+        self.total_bytes += size
+        self.cache_stamps[key] = stamps
+
+        while self.cache and (len(self.cache) > self.max_entries
+                              or self.total_bytes > self.max_bytes):
+            self._drop(next(iter(self.cache)))
+
+    def set_limits(self, max_entries: int, max_mb: int) -> None:
+        """
+        Change the cache limits, dropping the least recently used pages if needed.
+
+        Args:
+            max_entries: Maximum number of cached pages
+            max_mb: Maximum total size of cached HTML in megabytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_mb * 1024 * 1024
+        while self.cache and (len(self.cache) > self.max_entries
+                              or self.total_bytes > self.max_bytes):
+            self._drop(next(iter(self.cache)))
+
+    def _drop(self, key: str) -> None:
+        """Remove the rendered HTML of a page, keeping its include dependencies."""
+        if self.cache.pop(key, None) is not None:
+            self.total_bytes -= self.cache_sizes.pop(key)
+        self.cache_stamps.pop(key, None)
+
+    def is_current(self, file_path: str) -> bool:
+        """
+        Check whether a page is cached and was rendered from the file as it is now.
+
+        Args:
+            file_path: Path to the source file
+
+        Returns:
+            True if the cached entry matches the file on disk
+        """
+        key = _normalize_path(file_path)
+        stamps = self.cache_stamps.get(key)
+        return stamps is not None and stamps.get(key) == self.file_stamp(key)
+
+    def set_dependencies(self, file_path: str, dependencies: Set[str]) -> None:
+        """
+        Record the files directly included by a page.
+
+        Args:
+            file_path: Path to the page
+            dependencies: Absolute paths of included files
+        """
+        key = _normalize_path(file_path)
+        for old_dependency in self.dependencies.get(key, set()) - dependencies:
+            self.dependents.get(old_dependency, set()).discard(key)
+
+        self.dependencies[key] = set(dependencies)
+        for dependency in dependencies:
+            self.dependents.setdefault(dependency, set()).add(key)
+
+    def all_dependencies(self, file_path: str) -> Set[str]:
+        """
+        Get all files a page includes, directly or through other includes.
+
+        Args:
+            file_path: Path to the page
+
+        Returns:
+            Set of absolute paths
+        """
+        result: Set[str] = set()
+        pending = [_normalize_path(file_path)]
+        while pending:
+            for dependency in self.dependencies.get(pending.pop(), set()):
+                if dependency not in result:
+                    result.add(dependency)
+                    pending.append(dependency)
+        return result
+
+    def invalidate(self, file_path: str) -> Set[str]:
+        """
+        Remove a file and every page depending on it from the cache.
+
+        Args:
+            file_path: Path to the changed file
+
+        Returns:
+            Set of paths whose cache entries were dropped
+        """
+        invalidated: Set[str] = set()
+        pending = [_normalize_path(file_path)]
+        while pending:
+            key = pending.pop()
+            if key in invalidated:
+                continue
+            invalidated.add(key)
+            self._drop(key)
+            pending.extend(self.dependents.get(key, set()))
+
+        return invalidated
+
+    def clear_cache(self) -> None:
+        """Clear the entire cache."""
+        self.cache.clear()
+        self.cache_sizes.clear()
+        self.total_bytes = 0
+        self.cache_stamps.clear()
+        self.dependencies.clear()
+        self.dependents.clear()
+        logger.info("Render cache cleared")
+
+
 # Global search index instance
 _search_index = SearchIndex()
 
+# Global render cache instance
+_render_cache = RenderCache()
+
+# Rendered historical versions by (blob SHA, page directory), with the stamps of the
+# current files their includes resolved to
+_revision_cache: "collections.OrderedDict[Tuple[str, str], Tuple[str, Dict]]" = collections.OrderedDict()
+
 
-def text_2_html(text_in: str) -> str:
+def text_2_html(text_in: str, base_dir: Optional[str] = None) -> str:
     """
     Convert AsciiDoc text to HTML.
 
     Args:
         text_in: AsciiDoc formatted text
+        base_dir: Directory relative includes are resolved against
 
     Returns:
         HTML formatted text
@@ -109,6 +383,9 @@ def text_2_html(text_in: str) -> str:
     Raises:
         Exception: If AsciiDoc conversion fails
     """
+    if base_dir:
+        text_in = _absolute_includes(text_in, base_dir)
+
     try:
         text_out = io.StringIO()
         asciidoc_api = asciidoc.AsciiDocAPI()
@@ -119,6 +396,152 @@ def text_2_html(text_in: str) -> str:
         raise
 
 
+def _absolute_includes(text: str, base_dir: str) -> str:
+    """
+    Rewrite relative include targets to absolute paths.
+
+    AsciiDoc resolves includes of text read from a stream against the working
+    directory, so they are anchored to the file's directory here.
+
+    Args:
+        text: AsciiDoc formatted text
+        base_dir: Directory of the file the text belongs to
+
+    Returns:
+        Text with absolute include targets
+    """
+    def replace(match: re.Match) -> str:
+        path = _resolve_include(match.group(2), base_dir)
+        if not path:
+            return match.group(0)
+        return f"{match.group(1)}::{path}[{match.group(3)}]"
+
+    return INCLUDE_PATTERN.sub(replace, text)
+
+
+def collect_includes(text: str, file_path: str) -> Dict[str, Set[str]]:
+    """
+    Collect the include graph of a page and its included files.
+
+    Args:
+        text: AsciiDoc text of the page
+        file_path: Path to the page
+
+    Returns:
+        Dict mapping each file to the absolute paths it includes directly
+    """
+    graph: Dict[str, Set[str]] = {}
+    pending = [(_normalize_path(file_path), text)]
+    while pending:
+        path, content = pending.pop()
+        if path in graph:
+            continue
+
+        includes = find_includes(content, os.path.dirname(path))
+        graph[path] = set(includes)
+
+        for include in includes:
+            if include in graph:
+                continue
+            try:
+                with open(include, "r", encoding="utf-8", errors="ignore") as include_file:
+                    pending.append((include, include_file.read()))
+            except OSError:
+                # Missing includes are still tracked, so creating them invalidates the page
+                graph[include] = set()
+
+    return graph
+
+
+def render_text(text: str, file_path: str) -> str:
+    """
+    Render AsciiDoc text belonging to a file and record its include dependencies.
+
+    Args:
+        text: AsciiDoc formatted text
+        file_path: Path of the file the text belongs to
+
+    Returns:
+        HTML formatted text
+
+    Raises:
+        Exception: If AsciiDoc conversion fails
+    """
+    html = text_2_html(text, os.path.dirname(_normalize_path(file_path)))
+    for path, includes in collect_includes(text, file_path).items():
+        _render_cache.set_dependencies(path, includes)
+    return html
+
+
+def render_file(file_path: str) -> str:
+    """
+    Render an AsciiDoc file to HTML, using the render cache.
+
+    Args:
+        file_path: Path to the AsciiDoc file
+
+    Returns:
+        HTML formatted text
+
+    Raises:
+        OSError: If the file cannot be read
+        Exception: If AsciiDoc conversion fails
+    """
+    html = _render_cache.get(file_path)
+    if html is not None:
+        logger.debug(f"Render cache hit for {file_path}")
+        return html
+
+    stamp = RenderCache.file_stamp(file_path)
+    with open(file_path, "r", encoding="utf-8") as ascii_file:
+        text_in = ascii_file.read()
+
+    html = render_text(text_in, file_path)
+    _render_cache.put(file_path, html, stamp)
+    return html
+
+
+def cache_rendered_html(file_path: str, html: str) -> Set[str]:
+    """
+    Store already rendered HTML for a file, e.g. after the editor validated it.
+
+    Args:
+        file_path: Path to the AsciiDoc file
+        html: HTML rendered from the current file content with render_text()
+
+    Returns:
+        Set of paths whose previous renderings were invalidated
+    """
+    invalidated = _render_cache.invalidate(file_path)
+    _render_cache.put(file_path, html)
+    return invalidated
+
+
+def invalidate_paths(paths: List[str], only_stale: bool = False) -> Set[str]:
+    """
+    Invalidate cached contents and renderings of changed files and all pages including them.
+
+    Args:
+        paths: Paths of changed files
+        only_stale: Keep renderings that were made from the current file content,
+            e.g. by the editor right after saving
+
+    Returns:
+        Set of invalidated rendered paths
+    """
+    _search_index.invalidate(paths)
+
+    invalidated: Set[str] = set()
+    for path in paths:
+        if only_stale and _render_cache.is_current(path):
+            continue
+        invalidated |= _render_cache.invalidate(path)
+
+    if invalidated:
+        logger.debug(f"Invalidated {len(invalidated)} rendered pages")
+    return invalidated
+
+
 def search_files(
         search_text: str,
         files: List[str],
@@ -157,9 +580,10 @@ def search_files(
             continue
 
         try:
-            # Check file size
-            if os.path.getsize(file_path) > MAX_FILE_KB * 1024:
-                logger.debug(f"Skipping large file: {file}")
+            # Check file size, files not checked out (partial clone, sparse checkout)
+            # are matched by name, reading them would fetch every blob
+            if not os.path.exists(file_path) or os.path.getsize(file_path) > MAX_FILE_KB * 1024:
+                logger.debug(f"Skipping large or missing file: {file}")
                 score = _compute_filename_score(search_l, file)
                 if score > 0:
                     results.append((file, score))
@@ -304,6 +728,63 @@ def clear_search_cache() -> None:
     _search_index.clear_cache()
 
 
+def configure_render_cache(max_entries: int, max_mb: int) -> None:
+    """
+    Set the limits of the render cache.
+
+    Args:
+        max_entries: Maximum number of cached pages
+        max_mb: Maximum total size of cached HTML in megabytes
+    """
+    _render_cache.set_limits(max_entries, max_mb)
+
+
+def clear_render_cache() -> None:
+    """Clear the render cache."""
+    _render_cache.clear_cache()
+    _revision_cache.clear()
+
+
+def render_revision(blob_sha: str, read_text: Callable[[], str], base_dir: str) -> str:
+    """
+    Render a historical version of a page, cached by the SHA of its blob and its directory.
+
+    Includes are resolved against the current files of the project, so an entry
+    is only reused while the included files are unchanged.
+
+    Args:
+        blob_sha: SHA of the git blob holding the page
+        read_text: Function reading the blob content, only called on a cache miss
+        base_dir: Directory of the page in the work tree
+
+    Returns:
+        Rendered HTML
+    """
+    key = (blob_sha, _normalize_path(base_dir))
+    entry = _revision_cache.get(key)
+    if entry is not None:
+        html, stamps = entry
+        if all(RenderCache.file_stamp(path) == stamp for path, stamp in stamps.items()):
+            _revision_cache.move_to_end(key)
+            return html
+        logger.debug(f"Revision cache entry for {blob_sha} outdated by its includes")
+
+    text = read_text()
+
+    # The blob has no file of its own, includes resolve against its directory
+    dependencies: Set[str] = set()
+    for includes in collect_includes(text, os.path.join(key[1], blob_sha)).values():
+        dependencies |= includes
+    stamps = {path: RenderCache.file_stamp(path) for path in dependencies}
+
+    html = text_2_html(text, base_dir)
+    _revision_cache[key] = (html, stamps)
+    _revision_cache.move_to_end(key)
+    while len(_revision_cache) > REVISION_CACHE_ENTRIES:
+        _revision_cache.popitem(last=False)
+    return html
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.DEBUG)
     logger.info("Testing notehelper...")
@@ -0,0 +1,398 @@
+# Copyright [2025] [ecki]
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Custom note:// URL scheme serving project pages to the web view.
+
+Pages are addressed as note://<project>/<path>, AsciiDoc files are served
+rendered from the render cache, all other files are streamed from disk.
+Tracked files missing on disk (partial clone, sparse checkout) are served
+from git through an optional reader. Attachment pointer files are resolved
+to the content in the attachment store.
+"""
+import collections
+import hashlib
+import html
+import logging
+import mimetypes
+import pathlib
+import re
+from typing import Any, Callable, Dict, Optional
+
+import PyQt6.QtCore
+import PyQt6.QtWebEngineCore
+
+import attachments
+import navcache
+import notehelper
+
+# Configuration
+SCHEME = "note"
+MAX_VIRTUAL_PAGES = 20
+ASCIIDOC_EXTENSIONS = (".adoc", ".asciidoc")
+
+logger = logging.getLogger(__name__)
+
+
+def register_scheme() -> None:
+    """
+    Register the note:// scheme. Must be called before the QApplication is created.
+    """
+    scheme = PyQt6.QtWebEngineCore.QWebEngineUrlScheme(SCHEME.encode())
+    scheme.setSyntax(PyQt6.QtWebEngineCore.QWebEngineUrlScheme.Syntax.Host)
+    scheme.setFlags(
+        PyQt6.QtWebEngineCore.QWebEngineUrlScheme.Flag.SecureScheme |
+        PyQt6.QtWebEngineCore.QWebEngineUrlScheme.Flag.LocalScheme |
+        PyQt6.QtWebEngineCore.QWebEngineUrlScheme.Flag.LocalAccessAllowed
+    )
+    PyQt6.QtWebEngineCore.QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def project_host(project_name: str) -> str:
+    """
+    Get the URL host used for a project.
+
+    Args:
+        project_name: Name of the project
+
+    Returns:
+        Host name containing only lowercase letters, digits and dashes
+    """
+    return re.sub(r"[^a-z0-9-]+", "-", project_name.lower()).strip("-") or "project"
+
+
+class NoteSchemeHandler(PyQt6.QtWebEngineCore.QWebEngineUrlSchemeHandler):
+    """
+    Serves note:// URLs from the render cache and the project directories.
+
+    Signals:
+        attachment_missing: Emitted when a pointer file's content is not in the
+            attachment store (str: path of the pointer file)
+    """
+    attachment_missing = PyQt6.QtCore.pyqtSignal(str)
+
+    def __init__(
+            self,
+            projects: Callable[[], Dict[str, Dict]],
+            page_cache: Optional[navcache.NavigationCache] = None,
+            parent: Optional[PyQt6.QtCore.QObject] = None,
+            missing_file_reader: Optional[Callable[[pathlib.Path, str], Any]] = None
+    ):
+        """
+        Initialize scheme handler.
+
+        Args:
+            projects: Callable returning the project configuration by name
+            page_cache: Cache of recently viewed pages, served first if given
+            parent: Parent object
+            missing_file_reader: Callable receiving the project path and a relative
+                file name, returning the git blob of a tracked file that is not in the
+                work tree or None
+        """
+        super().__init__(parent)
+        self.projects = projects
+        self.page_cache = page_cache
+        self.missing_file_reader = missing_file_reader
+        self.virtual_pages: collections.OrderedDict[str, str] = collections.OrderedDict()
+
+    def page_url(self, project_name: str, file_name: str, query: str = "") -> PyQt6.QtCore.QUrl:
+        """
+        Build the URL of a project file.
+
+        Args:
+            project_name: Name of the project
+            file_name: Path relative to the project
+            query: Optional query string
+
+        Returns:
+            note:// URL
+        """
+        url = PyQt6.QtCore.QUrl()
+        url.setScheme(SCHEME)
+        url.setHost(project_host(project_name))
+        url.setPath("/" + pathlib.PurePath(file_name).as_posix().lstrip("/"))
+        if query:
+            url.setQuery(query)
+        return url
+
+    def set_virtual_page(self, url: PyQt6.QtCore.QUrl, html: str) -> None:
+        """
+        Serve generated HTML (e.g. search results) under a URL.
+
+        Args:
+            url: note:// URL of the page
+            html: HTML to serve
+        """
+        key = url.toString(PyQt6.QtCore.QUrl.UrlFormattingOption.RemoveFragment)
+        if self.page_cache:
+            self.page_cache.invalidate_url(key)
+        self.virtual_pages[key] = html
+        self.virtual_pages.move_to_end(key)
+        while len(self.virtual_pages) > MAX_VIRTUAL_PAGES:
+            self.virtual_pages.popitem(last=False)
+
+    def project_for_url(self, url: PyQt6.QtCore.QUrl) -> Optional[Dict]:
+        """
+        Get the configuration of the project a note:// URL refers to.
+
+        Args:
+            url: note:// URL
+
+        Returns:
+            Project configuration or None if no project with a path matches
+        """
+        host = url.host()
+        for project_name, project in self.projects().items():
+            if project_host(project_name) == host and project.get("path"):
+                return project
+        return None
+
+    def project_path_for_url(self, url: PyQt6.QtCore.QUrl) -> Optional[pathlib.Path]:
+        """
+        Get the project directory a note:// URL refers to.
+
+        Args:
+            url: note:// URL
+
+        Returns:
+            Resolved project path or None if no project matches
+        """
+        project = self.project_for_url(url)
+        return pathlib.Path(project["path"]).resolve() if project else None
+
+    def attachment_store_for_url(
+            self,
+            url: PyQt6.QtCore.QUrl
+    ) -> Optional[attachments.AttachmentStore]:
+        """
+        Get the attachment store of the project a note:// URL refers to.
+
+        Args:
+            url: note:// URL
+
+        Returns:
+            Attachment store or None if no project matches
+        """
+        project = self.project_for_url(url)
+        if not project:
+            return None
+        return attachments.AttachmentStore.for_project(project["path"], project)
+
+    def url_to_path(self, url: PyQt6.QtCore.QUrl) -> Optional[pathlib.Path]:
+        """
+        Map a note:// URL to a file inside its project.
+
+        Args:
+            url: note:// URL
+
+        Returns:
+            Resolved file path or None if the URL points outside a known project
+        """
+        project_path = self.project_path_for_url(url)
+        if not project_path:
+            return None
+
+        file_path = url.path(PyQt6.QtCore.QUrl.ComponentFormattingOption.FullyDecoded)
+        path = (project_path / file_path.lstrip("/")).resolve()
+
+        # Security check: ensure file is within project
+        try:
+            path.relative_to(project_path)
+        except ValueError:
+            logger.error(f"Security: URL {url.toString()} points outside project")
+            return None
+        return path
+
+    def requestStarted(self, job: PyQt6.QtWebEngineCore.QWebEngineUrlRequestJob) -> None:
+        """
+        Serve a note:// request.
+
+        Args:
+            job: Request job to answer
+        """
+        url = job.requestUrl()
+        logger.debug(f"Serving {url.toString()}")
+
+        key = url.toString(PyQt6.QtCore.QUrl.UrlFormattingOption.RemoveFragment)
+        if self.page_cache:
+            cached_html = self.page_cache.get_html(key)
+            if cached_html is not None:
+                logger.debug(f"Page cache hit for {key}")
+                self._reply_html(job, cached_html)
+                return
+
+        if key in self.virtual_pages:
+            size = self._reply_html(job, self.virtual_pages[key])
+            if self.page_cache:
+                self.page_cache.store(key, self.virtual_pages[key], size)
+            return
+
+        path = self.url_to_path(url)
+        if path is None:
+            job.fail(PyQt6.QtWebEngineCore.QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+
+        if not path.is_file():
+            if not self._reply_missing_file(job, path):
+                job.fail(PyQt6.QtWebEngineCore.QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+
+        if path.suffix.lower() in ASCIIDOC_EXTENSIONS:
+            try:
+                html_text = notehelper.render_file(str(path))
+            except Exception as e:
+                logger.error(f"Error converting {path} to HTML: {e}")
+                self._reply_html(job, f"<h1>Conversion Error</h1><pre>{html.escape(str(e))}</pre>")
+                return
+
+            size = self._reply_html(job, html_text)
+            if self.page_cache:
+                self.page_cache.store(key, html_text, size, str(path))
+            return
+
+        self._reply_file(job, path)
+
+    def _reply_missing_file(
+            self,
+            job: PyQt6.QtWebEngineCore.QWebEngineUrlRequestJob,
+            path: pathlib.Path
+    ) -> bool:
+        """
+        Reply with the committed content of a tracked file that is not checked out.
+
+        Pages are not stored in the page cache, their renderings are cached by
+        blob SHA instead, so checking the file out later does not serve stale HTML.
+
+        Args:
+            job: Request job
+            path: Resolved path of the missing file
+
+        Returns:
+            True if the file was served
+        """
+        project_path = self.project_path_for_url(job.requestUrl())
+        if not self.missing_file_reader or not project_path:
+            return False
+
+        file_name = path.relative_to(project_path).as_posix()
+        try:
+            blob = self.missing_file_reader(project_path, file_name)
+            if blob is None:
+                return False
+
+            if path.suffix.lower() in ASCIIDOC_EXTENSIONS:
+                html = notehelper.render_revision(
+                    blob.hexsha,
+                    lambda: blob.data_stream.read().decode("utf-8", errors="replace"),
+                    str(path.parent)
+                )
+                self._reply_html(job, html)
+                return True
+
+            data = blob.data_stream.read()
+        except Exception as e:
+            logger.error(f"Could not read {file_name} from git: {e}")
+            return False
+
+        pointer = attachments.parse_pointer(data)
+        if pointer:
+            store = self.attachment_store_for_url(job.requestUrl())
+            if store and store.contains(pointer):
+                self._reply_file(job, path, store.object_path(pointer.oid))
+            else:
+                self._reply_missing_attachment(job, path)
+            return True
+
+        logger.debug(f"Serving {file_name} from git, not checked out")
+        self._set_headers(job, f'"{blob.hexsha}"')
+        buffer = PyQt6.QtCore.QBuffer(job)
+        buffer.setData(data)
+        buffer.open(PyQt6.QtCore.QIODevice.OpenModeFlag.ReadOnly)
+        mime_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        job.reply(mime_type.encode(), buffer)
+        return True
+
+    @staticmethod
+    def _set_headers(job: PyQt6.QtWebEngineCore.QWebEngineUrlRequestJob, etag: str) -> None:
+        """
+        Attach caching headers to a reply, if supported by the Qt version.
+
+        Args:
+            job: Request job
+            etag: Entity tag of the content
+        """
+        if hasattr(job, "setAdditionalResponseHeaders"):
+            job.setAdditionalResponseHeaders({
+                PyQt6.QtCore.QByteArray(b"ETag"): PyQt6.QtCore.QByteArray(etag.encode()),
+                PyQt6.QtCore.QByteArray(b"Cache-Control"): PyQt6.QtCore.QByteArray(b"no-cache"),
+            })
+
+    def _reply_html(self, job: PyQt6.QtWebEngineCore.QWebEngineUrlRequestJob, html: str) -> int:
+        """
+        Reply with HTML content.
+
+        Args:
+            job: Request job
+            html: HTML to send
+
+        Returns:
+            Size of the sent data in bytes
+        """
+        data = html.encode("utf-8")
+        self._set_headers(job, f'"{hashlib.sha1(data).hexdigest()}"')
+
+        # The buffer is owned by the job and lives as long as the request
+        buffer = PyQt6.QtCore.QBuffer(job)
+        buffer.setData(data)
+        buffer.open(PyQt6.QtCore.QIODevice.OpenModeFlag.ReadOnly)
+        job.reply(b"text/html;charset=utf-8", buffer)
+        return len(data)
+
+    def _reply_missing_attachment(
+            self,
+            job: PyQt6.QtWebEngineCore.QWebEngineUrlRequestJob,
+            path: pathlib.Path
+    ) -> None:
+        """
+        Fail a request for a pointer file whose content is not in the store.
+
+        Args:
+            job: Request job
+            path: Pointer file
+        """
+        logger.warning(f"Content of attachment {path} is not in the attachment store")
+        self.attachment_missing.emit(str(path))
+        job.fail(PyQt6.QtWebEngineCore.QWebEngineUrlRequestJob.Error.UrlNotFound)
+
+    def _reply_file(
+            self,
+            job: PyQt6.QtWebEngineCore.QWebEngineUrlRequestJob,
+            path: pathlib.Path,
+            content_path: Optional[pathlib.Path] = None
+    ) -> None:
+        """
+        Reply with a file streamed from disk.
+
+        Args:
+            job: Request job
+            path: File to send, its name determines the MIME type
+            content_path: File holding the content, defaults to path. Attachment
+                pointers are resolved if not given.
+        """
+        if content_path is None:
+            store = self.attachment_store_for_url(job.requestUrl())
+            content_path = store.resolve(path) if store else path
+            if content_path == path and attachments.read_pointer(path):
+                self._reply_missing_attachment(job, path)
+                return
+
+        stat = content_path.stat()
+        self._set_headers(job, f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"')
+
+        file_device = PyQt6.QtCore.QFile(str(content_path), job)
+        if not file_device.open(PyQt6.QtCore.QIODevice.OpenModeFlag.ReadOnly):
+            job.fail(PyQt6.QtWebEngineCore.QWebEngineUrlRequestJob.Error.RequestFailed)
+            return
+
+        mime_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        job.reply(mime_type.encode(), file_device)
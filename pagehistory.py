@@ -0,0 +1,125 @@
+# Copyright [2025] [ecki]
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Page history dialog listing the commits that changed a page.
+"""
+from typing import List, Tuple
+
+import PyQt6.QtWidgets
+import PyQt6.QtCore
+import PyQt6.QtGui
+
+
+class PageHistoryDialog(PyQt6.QtWidgets.QDialog):
+    """
+    Non-modal dialog listing the versions of a page.
+
+    Selecting a version asks the main window to show it, so moving through the
+    list with the arrow keys scrubs through the history of the page.
+
+    Signals:
+        revision_selected: Emitted when a version is selected (str: commit SHA, empty for
+            the current file, str: path of the file in that commit)
+        compare_requested: Emitted to compare two versions (str: old SHA, str: old path,
+            str: new SHA, empty for the current file, str: new path)
+    """
+    revision_selected = PyQt6.QtCore.pyqtSignal(str, str)
+    compare_requested = PyQt6.QtCore.pyqtSignal(str, str, str, str)
+
+    def __init__(
+            self,
+            file_name: str,
+            history: List[Tuple[str, str, str, str, str]],
+            parent=None
+    ):
+        """
+        Initialize page history dialog.
+
+        Args:
+            file_name: Path of the page relative to the project
+            history: List of (sha, date, author, summary, path in that commit)
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.file_name = file_name
+        self.history = history
+        self.setWindowTitle(f"History of {file_name}")
+        self.setMinimumSize(600, 400)
+
+        main_layout = PyQt6.QtWidgets.QVBoxLayout(self)
+
+        self.list_widget = PyQt6.QtWidgets.QListWidget()
+        font = PyQt6.QtGui.QFontDatabase.systemFont(
+            PyQt6.QtGui.QFontDatabase.SystemFont.FixedFont
+        )
+        self.list_widget.setFont(font)
+
+        self.list_widget.addItem("Current version")
+        for sha, date, author, summary, path in history:
+            renamed = f" [{path}]" if path != file_name else ""
+            self.list_widget.addItem(f"{sha[:7]} {date} | {summary} ({author}){renamed}")
+
+        self.list_widget.setSelectionMode(
+            PyQt6.QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection
+        )
+        self.list_widget.currentRowChanged.connect(self.on_row_changed)
+        main_layout.addWidget(self.list_widget)
+
+        # Compare button, diffs two selected versions or one with its predecessor
+        compare_button = PyQt6.QtWidgets.QPushButton("Compare")
+        compare_button.clicked.connect(self.on_compare)
+
+        # Close button
+        close_button = PyQt6.QtWidgets.QPushButton("Close")
+        close_button.clicked.connect(self.accept)
+
+        self.button_layout = PyQt6.QtWidgets.QHBoxLayout()
+        self.button_layout.addWidget(compare_button)
+        self.button_layout.addStretch()
+        self.button_layout.addWidget(close_button)
+        main_layout.addLayout(self.button_layout)
+
+        # Important: Delete dialog instance when closed
+        self.setAttribute(PyQt6.QtCore.Qt.WidgetAttribute.WA_DeleteOnClose)
+
+    def selected_revision(self, row: int) -> Tuple[str, str]:
+        """
+        Get the version shown in a row.
+
+        Args:
+            row: Row of the list
+
+        Returns:
+            Tuple of (commit SHA or empty for the current file, path in that commit)
+        """
+        if row <= 0 or row > len(self.history):
+            return "", self.file_name
+        sha, _date, _author, _summary, path = self.history[row - 1]
+        return sha, path
+
+    def on_compare(self) -> None:
+        """Request a diff of the selected versions."""
+        rows = sorted(index.row() for index in self.list_widget.selectedIndexes())
+        if not rows:
+            return
+
+        if len(rows) == 1:
+            if rows[0] >= len(self.history):
+                return  # Oldest version has no predecessor
+            rows.append(rows[0] + 1)
+
+        # Newer versions are further up the list
+        new_sha, new_path = self.selected_revision(rows[0])
+        old_sha, old_path = self.selected_revision(rows[-1])
+        self.compare_requested.emit(old_sha, old_path, new_sha, new_path)
+
+    def on_row_changed(self, row: int) -> None:
+        """
+        Show the selected version.
+
+        Args:
+            row: Selected row
+        """
+        if row >= 0:
+            self.revision_selected.emit(*self.selected_revision(row))
@@ -0,0 +1,386 @@
+# Copyright [2025] [ecki]
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Batch PDF export of pages through off-screen web engine pages.
+
+Pages are rendered to HTML in worker processes, like the static site export,
+so the GUI thread only loads and prints the finished HTML.
+"""
+import concurrent.futures
+import html
+import logging
+import os
+import pathlib
+import re
+import shutil
+import tempfile
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import PyQt6.QtCore
+import PyQt6.QtWebEngineCore
+
+import attachments
+import notehelper
+
+# Configuration
+DEFAULT_MAX_CONCURRENT = 2
+
+# src/href attributes with a relative target
+RELATIVE_RESOURCE_PATTERN = re.compile(
+    r'(\b(?:src|href)=")(?![a-zA-Z][a-zA-Z0-9+.-]*:|#|/)([^"]+)"'
+)
+BODY_PATTERN = re.compile(r"<body[^>]*>(.*)</body>", re.DOTALL | re.IGNORECASE)
+
+logger = logging.getLogger(__name__)
+
+
+def absolute_resources(
+        html_text: str,
+        base_dir: str,
+        attachment_store: Optional[attachments.AttachmentStore] = None
+) -> str:
+    """
+    Rewrite relative resource and link targets to absolute file URLs.
+
+    Pages are printed from a temporary file, so relative images would not resolve.
+
+    Args:
+        html_text: Rendered HTML
+        base_dir: Directory of the page's source file
+        attachment_store: Store to resolve attachment pointers against
+
+    Returns:
+        HTML with absolute file URLs
+    """
+    def replace(match: re.Match) -> str:
+        target = html.unescape(match.group(2))
+        path = pathlib.Path(base_dir, target).resolve()
+        if attachment_store:
+            path = attachment_store.resolve(path)
+        url = path.as_uri()
+        return f'{match.group(1)}{html.escape(url)}"'
+
+    return RELATIVE_RESOURCE_PATTERN.sub(replace, html_text)
+
+
+def _render_page(
+        source_path: str,
+        attachment_store: Optional[attachments.AttachmentStore]
+) -> str:
+    """
+    Render one page for printing. Runs in a worker process.
+
+    Args:
+        source_path: Path to the AsciiDoc file
+        attachment_store: Store to resolve attachment pointers against
+
+    Returns:
+        HTML with absolute resource URLs
+    """
+    with open(source_path, "r", encoding="utf-8") as ascii_file:
+        text = ascii_file.read()
+
+    base_dir = os.path.dirname(source_path)
+    return absolute_resources(notehelper.text_2_html(text, base_dir), base_dir, attachment_store)
+
+
+def merge_pages(pages: List[str]) -> str:
+    """
+    Merge rendered pages into one HTML document with page breaks.
+
+    Args:
+        pages: Complete HTML documents, the first one provides the head
+
+    Returns:
+        Merged HTML document
+    """
+    bodies = []
+    for page in pages:
+        match = BODY_PATTERN.search(page)
+        bodies.append(match.group(1) if match else page)
+
+    separator = '\n<div style="page-break-after: always"></div>\n'
+    first_match = BODY_PATTERN.search(pages[0]) if pages else None
+    if not first_match:
+        return f"<html><body>{separator.join(bodies)}</body></html>"
+
+    start, end = first_match.span(1)
+    return pages[0][:start] + separator.join(bodies) + pages[0][end:]
+
+
+class _PdfJob:
+    """
+    One PDF to write, from one or more pages.
+    """
+
+    def __init__(self, sources: List[str], target: str, steps: int):
+        """
+        Initialize job.
+
+        Args:
+            sources: AsciiDoc source paths
+            target: PDF target path
+            steps: Progress steps the job accounts for
+        """
+        self.sources = sources
+        self.target = target
+        self.steps = steps
+        self.pages: List[Optional[str]] = [None] * len(sources)
+        self.remaining = len(sources)
+        self.web_page: Optional[PyQt6.QtWebEngineCore.QWebEnginePage] = None
+
+
+class PdfExportQueue(PyQt6.QtCore.QObject):
+    """
+    Exports pages to PDF with a bounded number of off-screen web engine pages.
+
+    Signals:
+        progress: Emitted after each rendered page and each finished PDF (int: done,
+            int: total)
+        job_failed: Emitted when a page could not be exported (str: source, str: error)
+        export_finished: Emitted when the queue is empty (list: written PDF files)
+    """
+    progress = PyQt6.QtCore.pyqtSignal(int, int)
+    job_failed = PyQt6.QtCore.pyqtSignal(str, str)
+    export_finished = PyQt6.QtCore.pyqtSignal(list)
+
+    # Emitted from the executor thread, delivered on the GUI thread
+    _page_rendered = PyQt6.QtCore.pyqtSignal(object, int, object)
+
+    def __init__(
+            self,
+            jobs: List[Tuple[str, str]],
+            max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+            merge: bool = False,
+            parent: Optional[PyQt6.QtCore.QObject] = None,
+            attachment_store: Optional[attachments.AttachmentStore] = None
+    ):
+        """
+        Initialize export queue.
+
+        Args:
+            jobs: List of (AsciiDoc source path, PDF target path). With merge enabled,
+                all sources go into the PDF target of the first job.
+            max_concurrent: Maximum number of pages rendered and printed at the same time
+            merge: Merge all sources into one PDF
+            parent: Parent object
+            attachment_store: Store to resolve attachment pointers against
+        """
+        super().__init__(parent)
+        self.merge = merge
+        self.attachment_store = attachment_store
+        self.max_concurrent = max(1, max_concurrent)
+        self.done = 0
+        self.cancelled = False
+        self.finished = False
+        self.written: List[str] = []
+
+        # A merged PDF counts one step per rendered page and one for printing
+        self.jobs: Deque[_PdfJob] = deque()
+        if merge and jobs:
+            self.jobs.append(_PdfJob([source for source, _ in jobs], jobs[0][1], len(jobs) + 1))
+        else:
+            self.jobs.extend(_PdfJob([source], target, 1) for source, target in jobs)
+        self.pdf_total = len(self.jobs)
+        self.total = sum(job.steps for job in self.jobs)
+
+        self.temp_dir = tempfile.mkdtemp(prefix="thanote-pdf-")
+        self.executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self.rendering: List[_PdfJob] = []
+        self.active: Dict[PyQt6.QtWebEngineCore.QWebEnginePage, _PdfJob] = {}
+        self._page_rendered.connect(self._on_page_rendered)
+
+    def start(self) -> None:
+        """Start exporting."""
+        logger.info(f"Starting PDF export of {self.pdf_total} jobs")
+        if not self.jobs:
+            self._finish()
+            return
+
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_concurrent)
+        for _ in range(min(self.max_concurrent, len(self.jobs))):
+            self._start_next(None)
+
+    def cancel(self) -> None:
+        """Cancel all jobs that have not been printed yet."""
+        logger.info("PDF export cancelled")
+        self.cancelled = True
+        self.jobs.clear()
+        for job in self.rendering:
+            if job.web_page is not None:
+                job.web_page.deleteLater()
+        self.rendering.clear()
+        if not self.active:
+            self._finish()
+
+    def _start_next(self, page: Optional[PyQt6.QtWebEngineCore.QWebEnginePage]) -> None:
+        """
+        Start rendering the next job, reusing a page that became free.
+
+        Args:
+            page: Free page or None to create a new one
+        """
+        if not self.jobs or self.cancelled:
+            if page is not None:
+                page.deleteLater()
+            if not self.active and not self.rendering:
+                self._finish()
+            return
+
+        job = self.jobs.popleft()
+
+        if page is None:
+            page = PyQt6.QtWebEngineCore.QWebEnginePage(self)
+            page.loadFinished.connect(lambda ok, p=page: self._on_load_finished(p, ok))
+            page.pdfPrintingFinished.connect(
+                lambda path, success, p=page: self._on_pdf_finished(p, path, success)
+            )
+        job.web_page = page
+
+        self.rendering.append(job)
+        for index, source in enumerate(job.sources):
+            future = self.executor.submit(_render_page, source, self.attachment_store)
+            future.add_done_callback(
+                lambda done, j=job, i=index: self._report_rendered(j, i, done)
+            )
+
+    def _report_rendered(self, job: _PdfJob, index: int, future: concurrent.futures.Future) -> None:
+        """
+        Pass a finished render task to the GUI thread. Runs in the executor thread.
+
+        Args:
+            job: Job the page belongs to
+            index: Position of the page in the job
+            future: Finished render task
+        """
+        if self.finished:
+            return
+        try:
+            self._page_rendered.emit(job, index, future)
+        except RuntimeError:
+            pass  # Queue was deleted after the export finished
+
+    def _on_page_rendered(
+            self,
+            job: _PdfJob,
+            index: int,
+            future: concurrent.futures.Future
+    ) -> None:
+        """
+        Collect a rendered page and load the job once all its pages are rendered.
+
+        Args:
+            job: Job the page belongs to
+            index: Position of the page in the job
+            future: Finished render task
+        """
+        if job not in self.rendering:
+            return  # Cancelled or failed already
+
+        try:
+            job.pages[index] = future.result()
+        except Exception as e:
+            logger.error(f"Could not render {job.sources[index]} for PDF export: {e}")
+            self.rendering.remove(job)
+            self.job_failed.emit(job.sources[index], str(e))
+            self._job_done(job, job.steps)
+            self._start_next(job.web_page)
+            return
+
+        job.remaining -= 1
+        if self.merge:
+            self._job_done(job)
+        if job.remaining:
+            return
+
+        self.rendering.remove(job)
+        try:
+            html_text = merge_pages(job.pages) if len(job.pages) > 1 else job.pages[0]
+
+            # Load from a file, setHtml() is limited to 2 MB
+            html_path = os.path.join(self.temp_dir, f"page{id(job.web_page)}.html")
+            with open(html_path, "w", encoding="utf-8") as html_file:
+                html_file.write(html_text)
+        except OSError as e:
+            logger.error(f"Could not write {job.sources[0]} for PDF export: {e}")
+            self.job_failed.emit(job.sources[0], str(e))
+            self._job_done(job, job.steps)
+            self._start_next(job.web_page)
+            return
+
+        self.active[job.web_page] = job
+        job.web_page.load(PyQt6.QtCore.QUrl.fromLocalFile(html_path))
+
+    def _on_load_finished(self, page: PyQt6.QtWebEngineCore.QWebEnginePage, ok: bool) -> None:
+        """
+        Print a loaded page.
+
+        Args:
+            page: Page that finished loading
+            ok: Whether loading succeeded
+        """
+        if page not in self.active:
+            return
+
+        job = self.active[page]
+        if not ok:
+            self.active.pop(page)
+            self.job_failed.emit(job.sources[0], "Page could not be loaded")
+            self._job_done(job, job.steps)
+            self._start_next(page)
+            return
+
+        os.makedirs(os.path.dirname(job.target), exist_ok=True)
+        page.printToPdf(job.target)
+
+    def _on_pdf_finished(
+            self,
+            page: PyQt6.QtWebEngineCore.QWebEnginePage,
+            file_path: str,
+            success: bool
+    ) -> None:
+        """
+        Record a finished PDF and continue with the next job.
+
+        Args:
+            page: Page that was printed
+            file_path: Written PDF file
+            success: Whether printing succeeded
+        """
+        job = self.active.pop(page, None)
+        if success:
+            logger.debug(f"Exported {file_path}")
+            self.written.append(file_path)
+        elif job:
+            self.job_failed.emit(job.sources[0], f"Could not write {file_path}")
+
+        if job:
+            self._job_done(job, job.steps)
+        self._start_next(page)
+
+    def _job_done(self, job: _PdfJob, steps: int = 1) -> None:
+        """
+        Count finished steps of a job and report progress.
+
+        Args:
+            job: Job that made progress
+            steps: Steps finished, at most the steps the job has left
+        """
+        steps = min(steps, job.steps)
+        job.steps -= steps
+        self.done += steps
+        self.progress.emit(self.done, self.total)
+
+    def _finish(self) -> None:
+        """Clean up and report the written files."""
+        if self.finished:
+            return
+        self.finished = True
+
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        logger.info(f"PDF export finished, {len(self.written)} files written")
+        self.export_finished.emit(self.written)
@@ -0,0 +1,384 @@
+# Copyright [2025] [ecki]
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Static HTML export of a whole project with incremental rebuilds.
+"""
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import re
+import shutil
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import PyQt6.QtCore
+
+import attachments
+import notehelper
+
+# Configuration
+MANIFEST_NAME = ".build-manifest.json"
+MANIFEST_VERSION = 1
+ASCIIDOC_EXTENSIONS = (".adoc", ".asciidoc")
+
+# link:target.adoc[...] without URL scheme, optionally with an anchor
+INTERNAL_LINK_PATTERN = re.compile(r"link:([^\[\s:]+?)\.(?:adoc|asciidoc)(#[^\[\s]*)?\[")
+
+logger = logging.getLogger(__name__)
+
+
+def rewrite_internal_links(text: str) -> str:
+    """
+    Rewrite internal AsciiDoc link targets to the exported HTML files.
+
+    Args:
+        text: AsciiDoc formatted text
+
+    Returns:
+        Text with link:page.adoc[] replaced by link:page.html[]
+    """
+    return INTERNAL_LINK_PATTERN.sub(
+        lambda match: f"link:{match.group(1)}.html{match.group(2) or ''}[", text
+    )
+
+
+def _file_hash(file_path: str) -> str:
+    """
+    Compute the SHA-256 hash of a file.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _render_page(source_path: str) -> Tuple[str, List[str]]:
+    """
+    Render one page for the static site. Runs in a worker process.
+
+    Args:
+        source_path: Absolute path to the AsciiDoc file
+
+    Returns:
+        Tuple of (HTML, absolute paths of all included files)
+    """
+    with open(source_path, "r", encoding="utf-8") as ascii_file:
+        text = ascii_file.read()
+
+    html = notehelper.text_2_html(
+        rewrite_internal_links(text), os.path.dirname(source_path)
+    )
+
+    dependencies = set()
+    for path, includes in notehelper.collect_includes(text, source_path).items():
+        dependencies |= includes
+    return html, sorted(dependencies)
+
+
+class SiteBuilder:
+    """
+    Renders all AsciiDoc files of a project to a static HTML tree.
+
+    A manifest in the output directory records content hashes of every source
+    and its includes, so unchanged pages are skipped on the next build.
+    """
+
+    def __init__(
+            self,
+            project_path: str,
+            output_dir: str,
+            max_workers: Optional[int] = None,
+            attachment_store: Optional[attachments.AttachmentStore] = None
+    ):
+        """
+        Initialize site builder.
+
+        Args:
+            project_path: Path to the project directory
+            output_dir: Directory to write the HTML tree to
+            max_workers: Number of render processes, defaults to CPU count
+            attachment_store: Store to resolve attachment pointers against, the
+                site gets the stored content instead of the pointer files
+        """
+        self.project_path = os.path.normpath(os.path.abspath(project_path))
+        self.output_dir = os.path.normpath(os.path.abspath(output_dir))
+        self.max_workers = max_workers
+        self.attachment_store = attachment_store
+        self.manifest_path = os.path.join(self.output_dir, MANIFEST_NAME)
+        self.manifest: Dict[str, Dict] = {}
+
+    def _load_manifest(self) -> None:
+        """Load the manifest of the previous build."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as manifest_file:
+                data = json.load(manifest_file)
+            if data.get("version") == MANIFEST_VERSION:
+                self.manifest = data.get("files", {})
+            else:
+                logger.info("Build manifest has old version, doing full build")
+                self.manifest = {}
+        except FileNotFoundError:
+            self.manifest = {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Build manifest unreadable, doing full build: {e}")
+            self.manifest = {}
+
+    def _write_manifest(self) -> None:
+        """Write the manifest of the current build."""
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump({"version": MANIFEST_VERSION, "files": self.manifest}, manifest_file)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def _fingerprint(path: str, previous: Optional[Dict]) -> Optional[Dict]:
+        """
+        Fingerprint a file, reusing the previous hash if its stat data is unchanged.
+
+        Args:
+            path: Path to the file
+            previous: Fingerprint from the last build
+
+        Returns:
+            Dict with mtime_ns, size and hash, or None if the file is missing
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        if (previous and previous.get("mtime_ns") == stat.st_mtime_ns
+                and previous.get("size") == stat.st_size):
+            return previous
+
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "hash": _file_hash(path)}
+
+    def _output_path(self, file_name: str) -> str:
+        """
+        Get the output path for a source file.
+
+        Args:
+            file_name: Path relative to the project
+
+        Returns:
+            Absolute output path
+        """
+        output_path = os.path.join(self.output_dir, file_name)
+        if file_name.lower().endswith(ASCIIDOC_EXTENSIONS):
+            output_path = os.path.splitext(output_path)[0] + ".html"
+        return output_path
+
+    def _is_unchanged(self, file_name: str, source: Dict) -> bool:
+        """
+        Check whether a file and all its includes are unchanged since the last build.
+
+        Args:
+            file_name: Path relative to the project
+            source: Current fingerprint of the file
+
+        Returns:
+            True if the output can be reused
+        """
+        previous = self.manifest.get(file_name)
+        if not previous or previous.get("source", {}).get("hash") != source["hash"]:
+            return False
+
+        if not os.path.exists(self._output_path(file_name)):
+            return False
+
+        for dependency, dep_previous in previous.get("dependencies", {}).items():
+            current = self._fingerprint(dependency, dep_previous)
+            if (current or {}).get("hash") != (dep_previous or {}).get("hash"):
+                return False
+
+        return True
+
+    def build(
+            self,
+            files: List[str],
+            progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict:
+        """
+        Build the static site.
+
+        Args:
+            files: File paths relative to the project
+            progress: Optional callback receiving (done, total)
+
+        Returns:
+            Dict with counts of rendered, copied, skipped, removed and failed files
+        """
+        start_time = time.monotonic()
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._load_manifest()
+
+        result = {"rendered": 0, "copied": 0, "skipped": 0, "removed": 0, "failed": 0}
+        new_manifest: Dict[str, Dict] = {}
+        to_render: List[Tuple[str, Dict]] = []
+
+        # Copy assets and find pages that need rendering
+        for file_name in files:
+            source_path = os.path.join(self.project_path, file_name)
+            source = self._fingerprint(
+                source_path, self.manifest.get(file_name, {}).get("source")
+            )
+            if source is None:
+                continue
+
+            if self._is_unchanged(file_name, source):
+                new_manifest[file_name] = self.manifest[file_name]
+                result["skipped"] += 1
+                continue
+
+            if file_name.lower().endswith(ASCIIDOC_EXTENSIONS):
+                to_render.append((file_name, source))
+                continue
+
+            try:
+                output_path = self._output_path(file_name)
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                if self.attachment_store:
+                    source_path = str(self.attachment_store.resolve(source_path))
+                shutil.copy2(source_path, output_path)
+                new_manifest[file_name] = {"source": source}
+                result["copied"] += 1
+            except OSError as e:
+                logger.error(f"Could not copy {file_name}: {e}")
+                result["failed"] += 1
+
+        total = len(to_render)
+        logger.info(f"Rendering {total} pages, {result['skipped']} unchanged")
+
+        for done, (file_name, source, outcome) in enumerate(self._render_all(to_render), 1):
+            if isinstance(outcome, Exception):
+                logger.error(f"Could not render {file_name}: {outcome}")
+                result["failed"] += 1
+            else:
+                html, dependencies = outcome
+                output_path = self._output_path(file_name)
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                with open(output_path, "w", encoding="utf-8") as html_file:
+                    html_file.write(html)
+
+                new_manifest[file_name] = {
+                    "source": source,
+                    "dependencies": {
+                        dependency: self._fingerprint(dependency, None)
+                        for dependency in dependencies
+                    }
+                }
+                result["rendered"] += 1
+
+            if progress:
+                progress(done, total)
+
+        # Remove output of files that no longer exist in the project
+        for file_name in set(self.manifest) - set(files):
+            try:
+                os.remove(self._output_path(file_name))
+                result["removed"] += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove stale output for {file_name}: {e}")
+
+        self.manifest = new_manifest
+        self._write_manifest()
+
+        result["seconds"] = round(time.monotonic() - start_time, 3)
+        logger.info(f"Site build finished: {result}")
+        return result
+
+    def _render_all(self, to_render: List[Tuple[str, Dict]]):
+        """
+        Render pages in parallel across processes.
+
+        Pages are never rendered in this process, the asciidoc module keeps
+        global state and the GUI thread renders at the same time.
+
+        Args:
+            to_render: List of (file name, source fingerprint)
+
+        Yields:
+            Tuples of (file name, source fingerprint, render result or exception)
+        """
+        if not to_render:
+            return
+
+        workers = min(self.max_workers or os.cpu_count() or 1, len(to_render))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_render_page, os.path.join(self.project_path, file_name)):
+                    (file_name, source)
+                for file_name, source in to_render
+            }
+            for future in concurrent.futures.as_completed(futures):
+                file_name, source = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    outcome = e
+                yield file_name, source, outcome
+
+
+class SiteBuildWorker(PyQt6.QtCore.QObject):
+    """
+    Worker that runs a site build in a separate thread.
+    """
+    progress = PyQt6.QtCore.pyqtSignal(int, int)
+    build_finished = PyQt6.QtCore.pyqtSignal(dict)
+    build_failed = PyQt6.QtCore.pyqtSignal(str)
+
+    def __init__(
+            self,
+            project_path: str,
+            output_dir: str,
+            files: List[str],
+            attachment_store: Optional[attachments.AttachmentStore] = None
+    ):
+        """
+        Initialize site build worker.
+
+        Args:
+            project_path: Path to the project directory
+            output_dir: Directory to write the HTML tree to
+            files: File paths relative to the project
+            attachment_store: Store to resolve attachment pointers against
+        """
+        super().__init__()
+        self.builder = SiteBuilder(project_path, output_dir, attachment_store=attachment_store)
+        self.files = files
+
+    @PyQt6.QtCore.pyqtSlot()
+    def run(self) -> None:
+        """Build the site and report the result."""
+        try:
+            result = self.builder.build(self.files, self.progress.emit)
+            self.build_finished.emit(result)
+        except Exception as e:
+            logger.error(f"Site build failed: {e}")
+            self.build_failed.emit(str(e))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    logger.info("Testing SiteBuilder...")
+
+    test_path = "/tmp/test_notebook"
+    test_files = [
+        str(path.relative_to(test_path))
+        for path in pathlib.Path(test_path).rglob("*")
+        if path.is_file() and ".git" not in path.parts
+    ]
+    print(SiteBuilder(test_path, "/tmp/test_notebook_site").build(test_files))
@@ -0,0 +1,165 @@
+# Copyright [2025] [ecki]
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Persisted stat snapshot of a project work tree.
+
+The snapshot records (size, mtime, inode) of every file after the last change
+check. Comparing it with a fresh scan, or with the paths reported by the file
+watcher, yields the few candidates git has to look at instead of the whole tree.
+"""
+import json
+import logging
+import os
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+# Configuration
+SNAPSHOT_FILE_NAME = "thanote-snapshot.json"  # Inside .git
+SNAPSHOT_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+FileStat = Tuple[int, int, int]
+
+
+def _file_stat(stat: os.stat_result) -> FileStat:
+    """
+    Reduce a stat result to the fields compared by the snapshot.
+
+    Args:
+        stat: Result of os.stat
+
+    Returns:
+        Tuple of (size, mtime in ns, inode)
+    """
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+class TreeSnapshot:
+    """
+    Stat data of all files of a work tree, stored inside the git directory.
+    """
+
+    def __init__(self, project_path: str, git_dir: str):
+        """
+        Initialize snapshot.
+
+        Args:
+            project_path: Path to the work tree
+            git_dir: Path to the git directory, holds the snapshot file
+        """
+        self.project_path = os.path.normpath(os.path.abspath(project_path))
+        self.git_dir = os.path.normpath(os.path.abspath(git_dir))
+        self.snapshot_path = os.path.join(self.git_dir, SNAPSHOT_FILE_NAME)
+        self.entries: Optional[Dict[str, FileStat]] = None
+        self.modified = False
+
+    def load(self) -> bool:
+        """
+        Load the snapshot of the last session, once.
+
+        Returns:
+            True if a snapshot is available
+        """
+        if self.entries is not None:
+            return True
+
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as snapshot_file:
+                data = json.load(snapshot_file)
+            if data.get("version") != SNAPSHOT_VERSION:
+                logger.info("Work tree snapshot has old version, ignoring it")
+                return False
+            self.entries = {path: tuple(stat) for path, stat in data.get("files", {}).items()}
+            return True
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Work tree snapshot unreadable, ignoring it: {e}")
+            return False
+
+    def save(self) -> None:
+        """Write the snapshot if it changed since it was loaded."""
+        if self.entries is None or not self.modified:
+            return
+
+        tmp_path = self.snapshot_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as snapshot_file:
+                json.dump({"version": SNAPSHOT_VERSION, "files": self.entries}, snapshot_file)
+            os.replace(tmp_path, self.snapshot_path)
+            self.modified = False
+        except OSError as e:
+            logger.warning(f"Could not write work tree snapshot: {e}")
+
+    def scan(self) -> Dict[str, FileStat]:
+        """
+        Stat all files of the work tree.
+
+        Returns:
+            Relative POSIX paths mapped to (size, mtime in ns, inode)
+        """
+        result: Dict[str, FileStat] = {}
+        pending = [("", self.project_path)]
+        while pending:
+            prefix, dir_path = pending.pop()
+            try:
+                entries = list(os.scandir(dir_path))
+            except OSError:
+                continue
+
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name != ".git" and entry.path != self.git_dir:
+                            pending.append((f"{prefix}{entry.name}/", entry.path))
+                    else:
+                        result[prefix + entry.name] = _file_stat(entry.stat(follow_symlinks=False))
+                except OSError:
+                    continue
+        return result
+
+    def diff(self, current: Dict[str, FileStat]) -> Set[str]:
+        """
+        Compare a scan with the snapshot.
+
+        Args:
+            current: Result of scan()
+
+        Returns:
+            Paths that were added, removed or whose stat data changed
+        """
+        previous = self.entries or {}
+        changed = {path for path, stat in current.items() if previous.get(path) != stat}
+        changed.update(path for path in previous if path not in current)
+        return changed
+
+    def replace(self, current: Dict[str, FileStat]) -> None:
+        """
+        Make a scan the new snapshot.
+
+        Args:
+            current: Result of scan()
+        """
+        if current != self.entries:
+            self.entries = current
+            self.modified = True
+
+    def update(self, paths: Iterable[str]) -> None:
+        """
+        Refresh the stat data of some files.
+
+        Args:
+            paths: Relative POSIX paths, missing files are removed
+        """
+        if self.entries is None:
+            return
+
+        for path in paths:
+            try:
+                self.entries[path] = _file_stat(
+                    os.stat(os.path.join(self.project_path, path), follow_symlinks=False)
+                )
+            except OSError:
+                self.entries.pop(path, None)
+        self.modified = True